@@ -1 +1,2 @@
 from .parser import BaseParser, ParserPool, parser_pool
+from .sitemap import SitemapEntry, SitemapReader
@@ -1 +1,6 @@
-from .core import get_web_driver, BaseParser, By, ParserPool, parser_pool
+from .antibot import BlockedPageError, PageState
+from .core import get_web_driver, BaseParser, ParserPool, parser_pool
+from .locators import By, Locator, Locators, SnapshotFields
+from .performance import record_page_performance
+from .playwright_backend import PlaywrightParser, PlaywrightRuntime
+from .workers import ParserWorkerClient
@@ -0,0 +1,124 @@
+"""
+Detection of anti-bot challenges and block pages.
+"""
+from enum import Enum
+from typing import Callable, Optional
+
+from common.errors import ClientError
+from common.metrics import metrics
+
+PAGE_TEXT_LIMIT = 2000  # symbols of page text enough for recognizing stub pages
+
+# single round trip for getting title, beginning of page text and response status
+PAGE_STATE_SCRIPT = f"""
+const navigation = performance.getEntriesByType('navigation')[0];
+return {{
+    title: document.title || '',
+    text: document.body ? document.body.innerText.slice(0, {PAGE_TEXT_LIMIT}) : '',
+    status: navigation && navigation.responseStatus ? navigation.responseStatus : null,
+}};
+"""
+
+CHALLENGE_MARKERS = (
+    'captcha',
+    'challenge-platform',
+    'checking your browser',
+    'ddos-guard',
+    'qrator',
+    'проверка браузера',
+    'подтвердите, что вы не робот',
+    'вы робот',
+)
+BLOCK_MARKERS = (
+    'access denied',
+    'request blocked',
+    '403 forbidden',
+    'too many requests',
+    'доступ ограничен',
+    'доступ запрещен',
+    'слишком много запросов',
+)
+ERROR_MARKERS = (
+    '502 bad gateway',
+    '503 service',
+    '504 gateway',
+    'err_proxy_connection_failed',
+    'err_tunnel_connection_failed',
+    'err_connection',
+    'err_timed_out',
+    'this site can’t be reached',
+)
+BLOCK_STATUSES = (401, 403, 429)
+ERROR_STATUS_MIN = 500
+
+NAVIGATION_TOTAL_METRIC = 'parser.navigation.total'
+NAVIGATION_BLOCKED_METRIC = 'parser.navigation.blocked'
+NAVIGATION_BLOCK_RATE_METRIC = 'parser.navigation.block_rate'
+
+
+class PageState(Enum):
+    OK = 'ok'
+    CHALLENGE = 'challenge'  # captcha or js challenge instead of page
+    BLOCKED = 'blocked'  # access denied or rate limited
+    ERROR = 'error'  # server, proxy or network error page
+
+
+PageClassifier = Callable[[str, str, Optional[int]], PageState]
+
+
+class BlockedPageError(ClientError):
+    """
+    Marketplace served challenge, block or error page instead of requested one.
+    """
+
+    default_message = 'Page is blocked'
+
+    def __init__(self, state: PageState, url: str):
+        super().__init__(f'Get {state.value} page for {url}')
+        self.state = state
+        self.url = url
+
+    def __reduce__(self):  # for passing from parser worker process
+        return self.__class__, (self.state, self.url)
+
+
+def _has_marker(text: str, markers: tuple[str, ...]) -> bool:
+    return any(marker in text for marker in markers)
+
+
+def classify_page(title: str, text: str, status: Optional[int] = None) -> PageState:
+    """
+    Recognize challenge and error pages by response status, title and page text markers.
+    """
+    if status in BLOCK_STATUSES:
+        return PageState.BLOCKED
+    if status is not None and status >= ERROR_STATUS_MIN:
+        return PageState.ERROR
+
+    page_text = f'{title}\n{text[:PAGE_TEXT_LIMIT]}'.lower()
+    if _has_marker(page_text, CHALLENGE_MARKERS):
+        return PageState.CHALLENGE
+    if _has_marker(page_text, BLOCK_MARKERS):
+        return PageState.BLOCKED
+    if _has_marker(page_text, ERROR_MARKERS):
+        return PageState.ERROR
+    return PageState.OK
+
+
+def record_page_state(state: PageState):
+    """
+    Count navigations by page state and refresh block rate.
+    """
+    metrics.increment(NAVIGATION_TOTAL_METRIC)
+    if state != PageState.OK:
+        metrics.increment(NAVIGATION_BLOCKED_METRIC)
+        metrics.increment(f'{NAVIGATION_BLOCKED_METRIC}.{state.value}')
+    refresh_block_rate()
+
+
+def refresh_block_rate():
+    if total := metrics.get_counter(NAVIGATION_TOTAL_METRIC):
+        metrics.set_gauge(
+            NAVIGATION_BLOCK_RATE_METRIC,
+            metrics.get_counter(NAVIGATION_BLOCKED_METRIC) / total,
+        )
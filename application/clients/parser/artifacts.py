@@ -0,0 +1,163 @@
+"""
+Debug artifacts of browser pages written off the browser lease with retention.
+"""
+import gzip
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from common.metrics import metrics
+from config.client import ParserSettings
+
+DEFAULT_MAX_SIZE = 500 * 1024 * 1024  # bytes
+DEFAULT_MAX_AGE = 7 * 24 * 3600.0  # sec
+DEFAULT_MAX_PENDING = 20  # artifacts waiting for writing, the rest are dropped
+RETENTION_INTERVAL = 60.0  # sec
+NAME_LIMIT = 80
+
+
+def get_artifact_name(reason: str, url: str) -> str:
+    parsed_url = urlparse(url)
+    page_name = Path(parsed_url.path).name or parsed_url.netloc or 'page'
+    return re.sub(r'[^\w.-]+', '_', f'{reason}-{page_name}')[:NAME_LIMIT]
+
+
+class ArtifactStore:
+    """
+    Gzip compressed screenshots and html of pages on failure or for sampled share of loads.
+
+    Files are written by one background thread, the oldest files are removed
+    when folder exceeds max_size or files are older than max_age.
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        sample_rate: float = 0.0,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ):
+        self.folder = folder
+        self.sample_rate = sample_rate
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='artifacts'
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._cleaned_at = 0.0
+
+    def should_capture(self, failed: bool = False) -> bool:
+        return failed or random.random() < self.sample_rate
+
+    def save(
+        self,
+        reason: str,
+        url: str,
+        screenshot: Optional[bytes] = None,
+        html: Optional[str] = None,
+        trace: Optional[str] = None,
+    ):
+        """
+        Queue artifacts of page for writing, nothing is written in caller thread.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.increment('parser.artifacts.dropped')
+                return
+            self._pending += 1
+        self._executor.submit(
+            self._write, get_artifact_name(reason, url), screenshot, html, trace
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def clean(self):
+        """
+        Remove expired files and the oldest files above folder size limit.
+        """
+        self._cleaned_at = time.monotonic()
+        if not self.folder.exists():
+            return
+        now = time.time()
+        files = sorted(
+            (path.stat().st_mtime, path.stat().st_size, path)
+            for path in self.folder.glob('*.gz')
+        )
+        total_size = sum(size for _, size, _ in files)
+        for modified_at, size, path in files:
+            if now - modified_at < self.max_age and total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError as err:
+                logger.warning(f'Cannot remove artifact {path}: {err}')
+                continue
+            total_size -= size
+            metrics.increment('parser.artifacts.removed')
+
+    def _write(
+        self,
+        name: str,
+        screenshot: Optional[bytes],
+        html: Optional[str],
+        trace: Optional[str],
+    ):
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            prefix = self.folder.joinpath(f'{datetime.utcnow():%Y%m%dT%H%M%S%f}-{name}')
+            if screenshot is not None:
+                Path(f'{prefix}.png.gz').write_bytes(gzip.compress(screenshot))
+            if html is not None:
+                Path(f'{prefix}.html.gz').write_bytes(gzip.compress(html.encode()))
+            if trace is not None:  # opened by chrome devtools performance panel
+                Path(f'{prefix}.trace.json.gz').write_bytes(
+                    gzip.compress(trace.encode())
+                )
+            metrics.increment('parser.artifacts.saved')
+            if time.monotonic() - self._cleaned_at > RETENTION_INTERVAL:
+                self.clean()
+        except OSError as err:
+            logger.warning(f'Cannot save artifact {name}: {err}')
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+artifact_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store(config: ParserSettings) -> Optional[ArtifactStore]:
+    """
+    Get artifact store shared by parsers of process, None if artifacts are disabled.
+    """
+    global artifact_store
+    if not config.has_artifacts:
+        return None
+    if artifact_store is None:
+        artifact_store = ArtifactStore(
+            folder=Path(config.artifact_folder),
+            sample_rate=config.artifact_sample_rate,
+            max_size=config.artifact_max_size * 1024 * 1024,
+            max_age=config.artifact_max_age,
+        )
+    return artifact_store
+
+
+def shutdown_artifact_store():
+    global artifact_store
+    if artifact_store is not None:
+        artifact_store.close()
+        artifact_store = None
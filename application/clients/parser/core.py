@@ -1,5 +1,6 @@
+import random
+import time
 from enum import Enum
-from datetime import datetime
 from queue import Queue
 from pathlib import Path
 from typing import Optional
@@ -8,22 +9,60 @@ import undetected_chromedriver as uc
 from loguru import logger
 from pydantic import HttpUrl
 from selenium.common.exceptions import WebDriverException, TimeoutException
-from selenium.webdriver.common.by import By as SeleniumBy
+from selenium.webdriver import Chrome, ChromeOptions
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
-
-from clients.parser.proxies import get_proxy
+from selenium.webdriver.support.wait import WebDriverWait
+
+from clients.parser.antibot import (
+    PAGE_STATE_SCRIPT,
+    BlockedPageError,
+    PageClassifier,
+    PageState,
+    classify_page,
+    record_page_state,
+)
+from clients.parser.artifacts import (
+    ArtifactStore,
+    get_artifact_store,
+    shutdown_artifact_store,
+)
+from clients.parser.locators import By, Locator, Locators, SnapshotFields
+from clients.parser.performance import (
+    NAVIGATION_TIMING_SCRIPT,
+    TRACE_CATEGORIES,
+    get_page_cdp_metrics,
+    get_trace,
+)
+from clients.parser.playwright_backend import PlaywrightParser, PlaywrightRuntime
+from clients.parser.proxies import get_proxy, taint_proxy
+from clients.parser.rate_control import AdaptiveRateController
+from clients.parser.remote import (
+    get_debugger_address,
+    is_remote_browser_available,
+    load_remote_browsers,
+)
+from clients.parser.snapshot import (
+    READY_SCRIPT as SNAPSHOT_READY_SCRIPT,
+    SNAPSHOT_SCRIPT,
+)
+from clients.parser.spa import (
+    MARK_STALE_SCRIPT,
+    PUSH_ROUTE_SCRIPT,
+    READY_SCRIPT,
+    get_app_path,
+    is_same_app,
+)
 from clients.parser.useragent import get_useragent
+from clients.parser.workers import ParserWorkerClient
 from common.errors import ClientError
+from common.metrics import metrics
 from common.utils import retry_by_exception
 from config.client import ParserSettings
 
 DEFAULT_TIME_TO_WAIT = 3
-
-
-class By(Enum):  # could be rewritten by Enum from dict
-    CLASS_NAME = SeleniumBy.CLASS_NAME
-    XPATH = SeleniumBy.XPATH
-    ID = SeleniumBy.ID
+PLAYWRIGHT_BACKEND = 'playwright'
+SPA_POLL_FREQUENCY = 0.2  # sec
 
 
 class LoadStrategies(Enum):
@@ -40,8 +79,11 @@ def get_web_driver(
     proxy: Optional[str] = None,
     experimental_options: bool = False,
     chrome_version_main: Optional[int] = None,
+    page_trace: bool = False,
 ) -> uc.Chrome:
     options = uc.ChromeOptions()
+    if page_trace:
+        set_page_trace_options(options)
 
     if headless:
         options.add_argument('--headless')
@@ -79,6 +121,36 @@ def get_web_driver(
     return chrome
 
 
+def get_remote_web_driver(
+    debugger_address: str,
+    page_load_strategy: Optional[LoadStrategies] = None,
+    page_trace: bool = False,
+) -> Chrome:
+    """
+    Attach driver to already started chrome, browser options are set by its launcher.
+    """
+    options = ChromeOptions()
+    if page_trace:
+        set_page_trace_options(options)
+    options.debugger_address = debugger_address
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy.value
+
+    chrome = Chrome(options=options)
+    chrome.implicitly_wait(time_to_wait=DEFAULT_TIME_TO_WAIT)
+    return chrome
+
+
+def set_page_trace_options(options: ChromeOptions):
+    """
+    Collect chrome trace events into driver performance log.
+    """
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option(
+        'perfLoggingPrefs', {'traceCategories': TRACE_CATEGORIES}
+    )
+
+
 class BaseParser:
     """
     Base wrapper on undetectable chromium.
@@ -87,7 +159,23 @@ class BaseParser:
     RETRY_COUNT = 3
 
     config: Optional[ParserSettings] = None
-    client: Optional[uc.Chrome] = None
+    client: Optional[Chrome] = None
+    proxy: Optional[str] = None
+    is_tainted: bool = False
+    rate_controller: Optional[AdaptiveRateController] = None
+    artifact_store: Optional[ArtifactStore] = None
+
+    def __init__(
+        self,
+        remote_browser: Optional[str] = None,
+        page_classifier: PageClassifier = classify_page,
+    ):
+        # remote debugging endpoint of external chrome
+        self.remote_browser = remote_browser
+        self.page_classifier = page_classifier
+        self.page_performance: dict = {}  # navigation and waits of current page
+        self._is_in_app_page = False
+        self._tab_metrics: dict = {}
 
     @property
     def is_inited(self):
@@ -102,19 +190,42 @@ class BaseParser:
             return
         logger.info('Start initialising chrome client.....')
         self.config = config
-        client = get_web_driver(
-            headless=config.has_headless,
-            page_load_strategy=(
-                LoadStrategies.NONE if config.has_fast_load_strategy else None
-            ),
-            useragent=get_useragent() if config.has_random_useragent else None,
-            proxy=get_proxy() if config.has_proxies else None,
-            experimental_options=config.has_experimental_options,
-            chrome_version_main=config.chrome_version,
-            user_data_dir=config.chrome_data_dir,
+        self.artifact_store = get_artifact_store(config)
+        page_load_strategy = (
+            LoadStrategies.NONE if config.has_fast_load_strategy else None
         )
+        if self.remote_browser:
+            client = self._attach_remote_browser(page_load_strategy)
+            logger.info(f'Chrome client attached to {self.remote_browser}')
+        else:
+            self.proxy = get_proxy() if config.has_proxies else None
+            client = get_web_driver(
+                headless=config.has_headless,
+                page_load_strategy=page_load_strategy,
+                useragent=get_useragent() if config.has_random_useragent else None,
+                proxy=self.proxy,
+                experimental_options=config.has_experimental_options,
+                chrome_version_main=config.chrome_version,
+                user_data_dir=config.chrome_data_dir,
+                page_trace=config.has_page_trace,
+            )
+            logger.info('Chrome client ready')
         self.client = client
-        logger.info('Chrome client ready')
+        if config.has_page_metrics:
+            client.execute_cdp_cmd('Performance.enable', {})
+            self._tab_metrics = {}
+
+    def _attach_remote_browser(
+        self, page_load_strategy: Optional[LoadStrategies]
+    ) -> Chrome:
+        assert self.remote_browser is not None
+        if not is_remote_browser_available(self.remote_browser):
+            raise ClientError(f'Remote browser {self.remote_browser} is not available')
+        return get_remote_web_driver(
+            get_debugger_address(self.remote_browser),
+            page_load_strategy,
+            page_trace=self.config.has_page_trace,  # type: ignore[union-attr]
+        )
 
     @retry_by_exception(
         exceptions=(WebDriverException, TimeoutException, TimeoutError), max_tries=3
@@ -125,8 +236,10 @@ class BaseParser:
             return
         logger.info('Start closing client...')
         try:
-            if isinstance(self.client, uc.Chrome):
-                self.client.close()
+            if isinstance(self.client, Chrome):
+                # window of remote browser is kept for next session
+                if not self.remote_browser:
+                    self.client.close()
                 self.client.quit()
         except WebDriverException as err:
             logger.warning(f'Get problem with closing chrome driver: {str(err)}')
@@ -139,26 +252,128 @@ class BaseParser:
         self.close_client()
         self.init(self.config)
 
-    def get_page(self, url: HttpUrl) -> uc.Chrome:
+    def taint(self, reason: str):
+        """
+        Mark browser session and its proxy as detected by marketplace.
+        """
+        logger.warning(f'Taint chrome client: {reason}')
+        self.is_tainted = True
+        if self.proxy:
+            taint_proxy(self.proxy)
+
+    def reset_session(self):
+        """
+        Drop cookies of tainted session and restart browser with new proxy and useragent.
+        """
+        logger.info('Start resetting tainted chrome client session...')
+        try:
+            if isinstance(self.client, Chrome):
+                self.client.delete_all_cookies()
+        except WebDriverException as err:
+            logger.warning(f'Get problem with deleting cookies: {str(err)}')
+        self.restart()
+        self.is_tainted = False
+
+    def check_page_state(self) -> PageState:
+        """
+        Classify current page for challenge, block and error pages.
+        """
+        page_state_data = self.client.execute_script(PAGE_STATE_SCRIPT)  # type: ignore[union-attr]
+        return self.page_classifier(
+            page_state_data.get('title') or '',
+            page_state_data.get('text') or '',
+            page_state_data.get('status'),
+        )
+
+    def get_page(self, url: HttpUrl) -> Chrome:
         if not self.is_inited:
             raise ClientError(f'{self.__class__.__name__} is not inited')
-        assert isinstance(self.client, uc.Chrome)
+        assert isinstance(self.client, Chrome)
 
         logger.debug(f'Get page {url}')
         for i in range(self.RETRY_COUNT + 1):
+            if self.rate_controller:
+                self.rate_controller.acquire()
+            self._reset_page_performance()
+            started_at = time.monotonic()
             try:
                 self.client.get(url)
-                logger.debug(
-                    f'Current page is {self.client.current_url} with source {self.client.page_source}'
-                )
+                logger.debug(f'Current page is {self.client.current_url}')
+                self.page_performance['navigation'] = time.monotonic() - started_at
+                page_state = self.check_page_state()
+                record_page_state(page_state)
+                self._record_navigation(started_at, blocked=page_state != PageState.OK)
+                if page_state != PageState.OK:
+                    self.save_artifacts(page_state.value)
+                    self.taint(f'get {page_state.value} page for {url}')
+                    raise BlockedPageError(page_state, str(url))
+                self.save_artifacts('sample', failed=False)
                 return self.client
             except (WebDriverException, TimeoutException, TimeoutError) as err:
                 logger.warning(
                     f'Get webdriver exception {str(err)} try to restart client'
                 )
+                self._record_navigation(started_at, error=True)
                 if i == self.RETRY_COUNT:
                     raise err
                 self.restart()
+        raise ClientError(f'Cannot get page {url}')
+
+    def navigate(self, url: HttpUrl, ready_paths: Locators) -> Chrome:
+        """
+        Navigate by router of already loaded application with fallback to full page load.
+
+        Application page is ready when one of ready_paths elements is rendered again.
+        """
+        if not self.is_inited:
+            raise ClientError(f'{self.__class__.__name__} is not inited')
+        if self.config.has_spa_navigation and self._navigate_in_app(url, ready_paths):  # type: ignore[union-attr]
+            assert isinstance(self.client, Chrome)
+            return self.client
+        return self.get_page(url)
+
+    def _navigate_in_app(self, url: HttpUrl, ready_paths: Locators) -> bool:
+        assert isinstance(self.client, Chrome)
+        previous_url = self.client.current_url
+        if not is_same_app(previous_url, str(url)):
+            return False
+
+        logger.debug(f'Navigate in app to {url}')
+        locators = [[by.value, name] for by, name in ready_paths]
+        if self.rate_controller:
+            self.rate_controller.acquire()
+        self._reset_page_performance(is_in_app=True)
+        started_at = time.monotonic()
+        try:
+            self.client.execute_script(MARK_STALE_SCRIPT, locators)
+            self.client.execute_script(PUSH_ROUTE_SCRIPT, get_app_path(str(url)))
+            WebDriverWait(
+                self.client,
+                timeout=self.config.spa_navigation_timeout,  # type: ignore[union-attr]
+                poll_frequency=SPA_POLL_FREQUENCY,
+            ).until(
+                lambda client: client.execute_script(
+                    READY_SCRIPT, locators, previous_url
+                )
+            )
+        except (WebDriverException, TimeoutException) as err:
+            logger.info(
+                f'Cannot navigate in app to {url}: {str(err)}, fallback to page load'
+            )
+            metrics.increment('parser.navigation.in_app.fallback')
+            return False
+        self.page_performance['navigation'] = time.monotonic() - started_at
+        self._record_navigation(started_at)
+        metrics.increment('parser.navigation.in_app')
+        return True
+
+    def _record_navigation(
+        self, started_at: float, error: bool = False, blocked: bool = False
+    ):
+        if self.rate_controller:
+            self.rate_controller.record(
+                time.monotonic() - started_at, error=error, blocked=blocked
+            )
 
     def get_elements(self, by: By, name: str) -> list[WebElement]:
         if not self.is_inited:
@@ -182,25 +397,189 @@ class BaseParser:
                 self.restart()
         return []
 
-    def get_screenshot(self):
-        log_folder_path = Path(self.config.log_folder)  # type: ignore[union-attr]
-        if not log_folder_path.exists():
-            log_folder_path.mkdir(parents=True)
-        name = Path(self.client.current_url).name  # type: ignore[union-attr]
-        self.client.save_screenshot(  # type: ignore[union-attr]
-            f'{log_folder_path.absolute()}/{name}-{datetime.utcnow()}.png'
-        )
+    def wait_ready(self, ready_paths: list[Locators], timeout: float) -> bool:
+        """
+        Wait until every group of locators has element on page.
+        """
+        if not self.is_inited:
+            raise ClientError(f'{self.__class__.__name__} is not inited')
+        locators = [
+            [[by.value, name] for by, name in locators] for locators in ready_paths
+        ]
+        started_at = time.monotonic()
+        try:
+            WebDriverWait(
+                self.client, timeout=timeout, poll_frequency=SPA_POLL_FREQUENCY
+            ).until(
+                lambda client: client.execute_script(SNAPSHOT_READY_SCRIPT, locators)
+            )
+        except TimeoutException:
+            current_url = self.client.current_url  # type: ignore[union-attr]
+            logger.warning(f'Page {current_url} is not ready after {timeout} sec')
+            self.save_artifacts('not_ready')
+            return False
+        finally:
+            self.page_performance['wait_ready'] = time.monotonic() - started_at
+        return True
+
+    def capture(self, fields: SnapshotFields) -> dict:
+        """
+        Capture texts and properties of fields elements by one script call.
+        """
+        if not self.is_inited:
+            raise ClientError(f'{self.__class__.__name__} is not inited')
+        fields_spec = {
+            field: {
+                'locators': [[by.value, name] for by, name in locators],
+                'properties': list(properties),
+            }
+            for field, (locators, properties) in fields.items()
+        }
+        snapshot = self.client.execute_script(SNAPSHOT_SCRIPT, fields_spec)  # type: ignore[union-attr]
+        logger.debug(f'Capture snapshot of {snapshot["url"]}')
+        if self.config.has_page_metrics:  # type: ignore[union-attr]
+            snapshot['performance'] = self.get_page_performance()
+        return snapshot
+
+    def get_page_performance(self) -> dict:
+        """
+        Get navigation and wait durations, navigation timing and CDP metrics of current page.
+
+        Trace of slow page is saved for sampled share of pages.
+        """
+        performance = dict(self.page_performance)
+        try:
+            if not self._is_in_app_page:  # navigation entry belongs to first app page
+                performance['timing'] = self.client.execute_script(  # type: ignore[union-attr]
+                    NAVIGATION_TIMING_SCRIPT
+                )
+            performance['cdp'], self._tab_metrics = get_page_cdp_metrics(
+                self.client.execute_cdp_cmd('Performance.getMetrics', {}),  # type: ignore[union-attr]
+                self._tab_metrics,
+            )
+        except WebDriverException as err:
+            logger.warning(f'Cannot get page performance: {str(err)}')
+        self._save_trace(performance)
+        return performance
+
+    def _reset_page_performance(self, is_in_app: bool = False):
+        self.page_performance = {}
+        self._is_in_app_page = is_in_app
+        if self.config.has_page_trace:  # type: ignore[union-attr]
+            self._get_performance_log()  # events of previous page are dropped
+
+    def _get_performance_log(self) -> list[dict]:
+        try:
+            return self.client.get_log('performance')  # type: ignore[union-attr]
+        except WebDriverException as err:
+            logger.warning(f'Cannot get performance log: {str(err)}')
+            return []
+
+    def _save_trace(self, performance: dict):
+        config = self.config
+        if not config.has_page_trace:  # type: ignore[union-attr]
+            return
+        performance_log = self._get_performance_log()
+        load_time = performance.get('navigation', 0.0)
+        load_time += performance.get('wait_ready', 0.0)
+        if (
+            not self.artifact_store
+            or load_time < config.page_trace_slow_time  # type: ignore[union-attr]
+            or random.random() >= config.page_trace_sample_rate  # type: ignore[union-attr]
+        ):
+            return
+        if trace := get_trace(performance_log):
+            self.artifact_store.save('trace', self.client.current_url, trace=trace)  # type: ignore[union-attr]
+
+    @property
+    def current_url(self) -> str:
+        if not self.is_inited:
+            raise ClientError(f'{self.__class__.__name__} is not inited')
+        return self.client.current_url  # type: ignore[union-attr]
+
+    def fill_search(self, locators: Locators, text: str) -> Optional[int]:
+        """
+        Clear the first found search field and type text, return index of its locator.
+        """
+        for index, (by, name) in enumerate(locators):
+            if elements := self.get_elements(by=by, name=name):
+                search_field = elements[0]
+                search_field.clear()
+                if data := search_field.get_attribute('value'):
+                    search_field.send_keys(Keys.BACKSPACE * len(data))
+                if max_length := search_field.get_attribute('maxlength'):
+                    search_field.send_keys(Keys.BACKSPACE * int(max_length))
+                search_field.send_keys(text)
+                return index
+        return None
+
+    def submit_search(self, locator: Locator):
+        """
+        Submit search form, it loads result page like navigation so it is throttled too.
+        """
+        by, name = locator
+        if not (elements := self.get_elements(by=by, name=name)):
+            raise ClientError(f'Cannot find search field by {by} with value {name}')
+        if self.rate_controller:
+            self.rate_controller.acquire()
+        started_at = time.monotonic()
+        try:
+            elements[0].send_keys(Keys.RETURN)
+            elements[0].submit()
+        except (WebDriverException, TimeoutException):
+            self._record_navigation(started_at, error=True)
+            raise
+        self._record_navigation(started_at)
+
+    def save_artifacts(self, reason: str, failed: bool = True):
+        """
+        Take screenshot and html of current page for artifact store, it writes them in background.
+        """
+        if not (
+            self.is_inited
+            and self.artifact_store
+            and self.artifact_store.should_capture(failed)
+        ):
+            return
+        try:
+            self.artifact_store.save(
+                reason,
+                self.client.current_url,  # type: ignore[union-attr]
+                screenshot=self.client.get_screenshot_as_png(),  # type: ignore[union-attr]
+                html=self.client.page_source,  # type: ignore[union-attr]
+            )
+        except WebDriverException as err:
+            logger.warning(f'Cannot take page artifacts: {str(err)}')
 
 
 class ParserPool:
     config: Optional[ParserSettings] = None
     pool: Optional[Queue] = None
+    rate_controller: Optional[AdaptiveRateController] = None
+    runtime: Optional[PlaywrightRuntime] = None
+    parsers: list[BaseParser] = []
 
     @property
     def is_inited(self):
-        return (
-            self.config is not None and self.pool is not None and not self.pool.empty()
-        )
+        return self.config is not None and self.pool is not None
+
+    @property
+    def size(self) -> int:
+        return self.pool.maxsize if self.pool is not None else 0
+
+    @property
+    def has_async_parsers(self) -> bool:
+        """
+        Parsers have *_async methods awaited without executor threads.
+        """
+        return self.runtime is not None
+
+    @property
+    def available(self) -> int:
+        """
+        Count of idle parsers in pool.
+        """
+        return self.pool.qsize() if self.pool is not None else 0
 
     def init(self, config: ParserSettings):
         if self.is_inited:
@@ -208,12 +587,38 @@ class ParserPool:
             return
 
         self.config = config
-        self.pool = Queue(maxsize=self.config.pool_size)
-
-        for _ in range(self.pool.maxsize):
-            parser = BaseParser()
-            parser.init(self.config)
+        remote_browsers = load_remote_browsers(
+            config.remote_browsers, config.remote_browser_registry
+        )
+        if remote_browsers:  # one session per remote browser, they share active tab
+            logger.info(f'Use remote browsers: {", ".join(remote_browsers)}')
+        self.pool = Queue(maxsize=len(remote_browsers) or self.config.pool_size)
+        if config.has_rate_control:  # shared by all browsers of pool
+            self.rate_controller = AdaptiveRateController(
+                rate=config.rate_limit,
+                min_rate=config.min_rate_limit,
+                max_rate=config.max_rate_limit,
+                latency_target=config.latency_target,
+            )
+
+        if config.browser_backend == PLAYWRIGHT_BACKEND:
+            self.runtime = PlaywrightRuntime()
+            self.runtime.start()
+
+        self.parsers = []
+        for index in range(self.pool.maxsize):
+            parser = self._create_parser(
+                remote_browsers[index] if remote_browsers else None
+            )
+            parser.rate_controller = self.rate_controller
+            try:
+                parser.init(self.config)
+            except ClientError as err:
+                if not parser.remote_browser:
+                    raise
+                logger.warning(f'Parser is left for attaching on demand: {str(err)}')
 
+            self.parsers.append(parser)
             self.pool.put(parser)  # type: ignore[union-attr]
 
     def close(self):
@@ -224,18 +629,75 @@ class ParserPool:
         while not self.pool.empty():  # type: ignore[union-attr]
             parser = self.pool.get()  # type: ignore[union-attr]
             parser.close_client()
+        if self.runtime is not None:
+            self.runtime.close()
+            self.runtime = None
+        shutdown_artifact_store()
 
     def get(self) -> BaseParser:
         if not self.is_inited:
             raise ClientError('Pool is not inited')
 
-        return self.pool.get()  # type: ignore[union-attr]
+        parser = self.pool.get()  # type: ignore[union-attr]
+        if not parser.is_inited:
+            try:
+                if parser.remote_browser:
+                    self._assign_remote_browser(parser)
+                parser.init(self.config)
+            except Exception:
+                self.pool.put(parser)  # type: ignore[union-attr]
+                raise
+        return parser
 
     def put(self, parser: BaseParser):
         if self.pool is None:
             raise ClientError('Pool is not inited')
 
+        if parser.is_tainted:
+            try:
+                parser.reset_session()
+            except (
+                WebDriverException,
+                TimeoutException,
+                TimeoutError,
+                ClientError,
+            ) as err:
+                logger.warning(f'Cannot reset tainted parser session: {str(err)}')
         return self.pool.put(parser)  # type: ignore[union-attr]
 
+    def _create_parser(self, remote_browser: Optional[str] = None) -> BaseParser:
+        if self.runtime is not None:
+            return PlaywrightParser(self.runtime, remote_browser=remote_browser)  # type: ignore[return-value]
+        if self.config.has_process_workers:  # type: ignore[union-attr]
+            return ParserWorkerClient(  # type: ignore[return-value]
+                parser_class=BaseParser,
+                call_timeout=self.config.worker_call_timeout,  # type: ignore[union-attr]
+                remote_browser=remote_browser,
+            )
+        return BaseParser(remote_browser=remote_browser)
+
+    def _assign_remote_browser(self, parser: BaseParser):
+        """
+        Move parser to free browser from registry if its browser is gone.
+        """
+        remote_browsers = load_remote_browsers(
+            self.config.remote_browsers,  # type: ignore[union-attr]
+            self.config.remote_browser_registry,  # type: ignore[union-attr]
+        )
+        if parser.remote_browser in remote_browsers and is_remote_browser_available(
+            parser.remote_browser  # type: ignore[arg-type]
+        ):
+            return
+        used_remote_browsers = {
+            pool_parser.remote_browser for pool_parser in self.parsers
+        }
+        for remote_browser in remote_browsers:
+            if remote_browser not in used_remote_browsers:
+                logger.info(
+                    f'Move parser from remote browser {parser.remote_browser} to {remote_browser}'
+                )
+                parser.remote_browser = remote_browser
+                return
+
 
 parser_pool = ParserPool()
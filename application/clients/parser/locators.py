@@ -0,0 +1,19 @@
+"""
+Element locators shared by browser parsers and their workers.
+"""
+from enum import Enum
+
+from selenium.webdriver.common.by import By as SeleniumBy
+
+
+class By(Enum):  # could be rewritten by Enum from dict
+    CLASS_NAME = SeleniumBy.CLASS_NAME
+    XPATH = SeleniumBy.XPATH
+    ID = SeleniumBy.ID
+
+
+# candidate element locators in order of trying
+Locator = tuple[By, str]
+Locators = list[Locator]
+# field name to its element locators and captured element properties
+SnapshotFields = dict[str, tuple[Locators, tuple[str, ...]]]
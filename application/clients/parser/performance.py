@@ -0,0 +1,90 @@
+"""
+Browser performance of page loads: navigation timing, CDP metrics and traces.
+"""
+import json
+from typing import Optional
+
+from common.metrics import metrics
+
+# seconds of navigation phases, null for not finished phases
+NAVIGATION_TIMING_SCRIPT = """
+const entry = performance.getEntriesByType('navigation')[0];
+if (!entry) return null;
+const since = (end, start) => end > 0 && start >= 0 ? Math.max(end - start, 0) / 1000 : null;
+return {
+    redirect: since(entry.redirectEnd, entry.redirectStart),
+    dns: since(entry.domainLookupEnd, entry.domainLookupStart),
+    connect: since(entry.connectEnd, entry.connectStart),
+    tls: entry.secureConnectionStart > 0 ? since(entry.connectEnd, entry.secureConnectionStart) : null,
+    ttfb: since(entry.responseStart, entry.requestStart),
+    download: since(entry.responseEnd, entry.responseStart),
+    dom_interactive: since(entry.domInteractive, entry.responseEnd),
+    dom_content_loaded: since(entry.domContentLoadedEventEnd, entry.startTime),
+    load_event: since(entry.loadEventEnd, entry.startTime),
+};
+"""
+
+# cumulative for browser tab, page value is difference with previous page
+CUMULATIVE_CDP_METRICS = (
+    'TaskDuration',
+    'ScriptDuration',
+    'LayoutDuration',
+    'RecalcStyleDuration',
+)
+CDP_METRICS = CUMULATIVE_CDP_METRICS + ('JSHeapUsedSize', 'Nodes')
+
+TRACE_CATEGORIES = 'devtools.timeline,blink.user_timing,loading,netlog,v8.execute'
+TRACE_EVENTS_METHOD = 'Tracing.dataCollected'
+
+
+def get_page_cdp_metrics(
+    raw_metrics: dict, previous_metrics: Optional[dict] = None
+) -> tuple[dict, dict]:
+    """
+    Get page metrics from Performance.getMetrics result and current tab values for next page.
+    """
+    tab_metrics = {
+        metric['name']: metric['value']
+        for metric in raw_metrics.get('metrics', [])
+        if metric['name'] in CDP_METRICS
+    }
+    previous_metrics = previous_metrics or {}
+    page_metrics = {
+        name: (
+            max(value - previous_metrics.get(name, 0.0), 0.0)
+            if name in CUMULATIVE_CDP_METRICS
+            else value
+        )
+        for name, value in tab_metrics.items()
+    }
+    return page_metrics, tab_metrics
+
+
+def get_trace(performance_log: list[dict]) -> Optional[str]:
+    """
+    Get chrome trace json from chromedriver performance log entries.
+    """
+    trace_events = []
+    for entry in performance_log:
+        message = json.loads(entry['message'])['message']
+        if message.get('method') == TRACE_EVENTS_METHOD:
+            trace_events.append(message['params'])
+    if not trace_events:
+        return None
+    return json.dumps({'traceEvents': trace_events})
+
+
+def record_page_performance(performance: Optional[dict]):
+    """
+    Aggregate page load stages and browser work of one page.
+    """
+    if not performance:
+        return
+    for stage in ('navigation', 'wait_ready'):
+        if performance.get(stage) is not None:
+            metrics.observe(f'parser.page.{stage}', performance[stage])
+    for phase, duration in (performance.get('timing') or {}).items():
+        if duration is not None:
+            metrics.observe(f'parser.page.timing.{phase}', duration)
+    for name, value in (performance.get('cdp') or {}).items():
+        metrics.observe(f'parser.page.cdp.{name}', value)
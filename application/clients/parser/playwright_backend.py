@@ -0,0 +1,521 @@
+"""
+Chromium driven by asyncio native playwright, alternative backend of parser pool.
+
+All pages of pool are awaited on one event loop in its own thread, sync methods
+mirror BaseParser for provider code running in executor threads and *_async methods
+are awaited from application event loop without thread per browser operation.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Coroutine, Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+from pydantic import HttpUrl
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    from playwright.async_api import async_playwright
+except ImportError:  # optional dependency, selenium backend works without it
+    async_playwright = None
+    PlaywrightError = PlaywrightTimeoutError = Exception
+
+from clients.parser.antibot import (
+    PAGE_STATE_SCRIPT,
+    BlockedPageError,
+    PageClassifier,
+    PageState,
+    classify_page,
+    record_page_state,
+)
+from clients.parser.artifacts import ArtifactStore, get_artifact_store
+from clients.parser.locators import By, Locator, Locators, SnapshotFields
+from clients.parser.performance import NAVIGATION_TIMING_SCRIPT, get_page_cdp_metrics
+from clients.parser.proxies import get_proxy, taint_proxy
+from clients.parser.rate_control import AdaptiveRateController
+from clients.parser.remote import get_debugger_address
+from clients.parser.snapshot import (
+    READY_SCRIPT as SNAPSHOT_READY_SCRIPT,
+    SNAPSHOT_SCRIPT,
+)
+from clients.parser.spa import (
+    MARK_STALE_SCRIPT,
+    PUSH_ROUTE_SCRIPT,
+    READY_SCRIPT,
+    get_app_path,
+    is_same_app,
+)
+from clients.parser.useragent import get_useragent
+from common.errors import ClientError
+from common.metrics import metrics
+from config.client import ParserSettings
+
+RETRY_COUNT = 3
+POLL_FREQUENCY = 200  # ms
+VIEWPORT = {'width': 1920, 'height': 1080}
+
+
+def get_page_function(script: str) -> str:
+    """
+    Wrap selenium style script with arguments and return into page function.
+    """
+    return f'(args) => (function () {{ {script} }}).apply(null, args)'
+
+
+def get_selector(locator: Locator) -> str:
+    by, value = locator
+    if by == By.XPATH:
+        return f'xpath={value}'
+    if by == By.ID:
+        return f'id={value}'
+    return f'.{value}'
+
+
+def get_cdp_url(remote_browser: str) -> str:
+    if urlparse(remote_browser).scheme in ('ws', 'wss'):
+        return remote_browser
+    return f'http://{get_debugger_address(remote_browser)}'
+
+
+class PlaywrightRuntime:
+    """
+    Event loop thread with playwright driver and browser shared by parsers of pool.
+    """
+
+    def __init__(self):
+        if async_playwright is None:
+            raise ClientError('Playwright is not installed, install playwright extra')
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name='playwright-loop', daemon=True
+        )
+        self.playwright: Any = None
+        self.browser: Any = None
+        self._browser_lock = asyncio.Lock()
+
+    def start(self):
+        self.thread.start()
+
+    def close(self):
+        if not self.thread.is_alive():
+            return
+        try:
+            self.run(self._close())
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    def run(self, coroutine: Coroutine) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def run_async(self, coroutine: Coroutine) -> Any:
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        )
+
+    async def get_browser(self, config: ParserSettings) -> Any:
+        """
+        Launch browser once, every parser gets own context with separate cookies.
+        """
+        async with self._browser_lock:
+            if self.browser is not None and self.browser.is_connected():
+                return self.browser
+            chromium = (await self._get_playwright()).chromium
+            self.browser = await chromium.launch(
+                headless=config.has_headless,
+                proxy={'server': 'per-context'} if config.has_proxies else None,
+                args=(
+                    ['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu']
+                    if config.has_experimental_options
+                    else []
+                ),
+            )
+            logger.info('Playwright chromium is launched')
+            return self.browser
+
+    async def connect_browser(self, remote_browser: str) -> Any:
+        chromium = (await self._get_playwright()).chromium
+        return await chromium.connect_over_cdp(get_cdp_url(remote_browser))
+
+    async def _get_playwright(self) -> Any:
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        return self.playwright
+
+    async def _close(self):
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+
+class PlaywrightParser:
+    """
+    Page in own browser context, same calls as BaseParser.
+
+    Page elements are not exposed, product data is taken by snapshot capture.
+    """
+
+    config: Optional[ParserSettings] = None
+    proxy: Optional[str] = None
+    is_tainted: bool = False
+    rate_controller: Optional[AdaptiveRateController] = None
+    artifact_store: Optional[ArtifactStore] = None
+
+    def __init__(
+        self,
+        runtime: PlaywrightRuntime,
+        remote_browser: Optional[str] = None,
+        page_classifier: PageClassifier = classify_page,
+    ):
+        self.runtime = runtime
+        self.remote_browser = remote_browser
+        self.page_classifier = page_classifier
+        self.browser: Any = None  # own connection to remote browser
+        self.context: Any = None
+        self.page: Any = None
+        self.cdp_session: Any = None
+        self.page_performance: dict = {}  # navigation and waits of current page
+        self._is_in_app_page = False
+        self._tab_metrics: dict = {}
+
+    @property
+    def is_inited(self) -> bool:
+        return (
+            self.config is not None
+            and self.page is not None
+            and not self.page.is_closed()
+        )
+
+    @property
+    def current_url(self) -> str:
+        self._check_inited()
+        return self.page.url
+
+    def init(self, config: ParserSettings):
+        self._run(self._init(config))
+
+    def close_client(self):
+        self._run(self._close_client())
+
+    def restart(self):
+        self._run(self._restart())
+
+    def taint(self, reason: str):
+        """
+        Mark browser context and its proxy as detected by marketplace.
+        """
+        logger.warning(f'Taint playwright page: {reason}')
+        self.is_tainted = True
+        if self.proxy:
+            taint_proxy(self.proxy)
+
+    def reset_session(self):
+        """
+        Replace tainted context by new one with new proxy and useragent.
+        """
+        self._run(self._restart())
+        self.is_tainted = False
+
+    def check_page_state(self) -> PageState:
+        return self._run(self._check_page_state())
+
+    def get_page(self, url: HttpUrl):
+        return self._run(self._get_page(url))
+
+    def navigate(self, url: HttpUrl, ready_paths: Locators):
+        return self._run(self._navigate(url, ready_paths))
+
+    def wait_ready(self, ready_paths: list[Locators], timeout: float) -> bool:
+        return self._run(self._wait_ready(ready_paths, timeout))
+
+    def capture(self, fields: SnapshotFields) -> dict:
+        return self._run(self._capture(fields))
+
+    def fill_search(self, locators: Locators, text: str) -> Optional[int]:
+        return self._run(self._fill_search(locators, text))
+
+    def submit_search(self, locator: Locator):
+        return self._run(self._submit_search(locator))
+
+    def save_artifacts(self, reason: str, failed: bool = True):
+        self._run(self._save_artifacts(reason, failed))
+
+    def get_elements(self, by: By, name: str) -> list:
+        raise ClientError(
+            'Page elements are not available from playwright parser, use snapshot extraction'
+        )
+
+    async def get_page_async(self, url: HttpUrl):
+        return await self._run_async(self._get_page(url))
+
+    async def navigate_async(self, url: HttpUrl, ready_paths: Locators):
+        return await self._run_async(self._navigate(url, ready_paths))
+
+    async def wait_ready_async(
+        self, ready_paths: list[Locators], timeout: float
+    ) -> bool:
+        return await self._run_async(self._wait_ready(ready_paths, timeout))
+
+    async def capture_async(self, fields: SnapshotFields) -> dict:
+        return await self._run_async(self._capture(fields))
+
+    def _run(self, coroutine: Coroutine) -> Any:
+        try:
+            return self.runtime.run(coroutine)
+        except PlaywrightError as err:
+            raise ClientError(f'Playwright error: {str(err)}') from err
+
+    async def _run_async(self, coroutine: Coroutine) -> Any:
+        try:
+            return await self.runtime.run_async(coroutine)
+        except PlaywrightError as err:
+            raise ClientError(f'Playwright error: {str(err)}') from err
+
+    def _check_inited(self):
+        if not self.is_inited:
+            raise ClientError(f'{self.__class__.__name__} is not inited')
+
+    async def _init(self, config: ParserSettings):
+        if self.is_inited:
+            logger.info('Already inited')
+            return
+        logger.info('Start initialising playwright page.....')
+        self.config = config
+        self.artifact_store = get_artifact_store(config)
+        if self.remote_browser:
+            self.browser = await self.runtime.connect_browser(self.remote_browser)
+            self.context = await self.browser.new_context(viewport=VIEWPORT)
+        else:
+            browser = await self.runtime.get_browser(config)
+            self.proxy = get_proxy() if config.has_proxies else None
+            self.context = await browser.new_context(
+                viewport=VIEWPORT,
+                user_agent=get_useragent() if config.has_random_useragent else None,
+                proxy={'server': self.proxy} if self.proxy else None,
+            )
+        self.page = await self.context.new_page()
+        if config.has_page_metrics:
+            self.cdp_session = await self.context.new_cdp_session(self.page)
+            await self.cdp_session.send('Performance.enable')
+            self._tab_metrics = {}
+        logger.info('Playwright page ready')
+
+    async def _close_client(self):
+        if self.context is None:
+            logger.warning('Playwright page is not inited')
+            return
+        logger.info('Start closing playwright page...')
+        try:
+            await self.context.close()
+            if self.browser is not None:  # only disconnects from remote browser
+                await self.browser.close()
+        except PlaywrightError as err:
+            logger.warning(f'Get problem with closing playwright page: {str(err)}')
+        self.browser = self.context = self.page = self.cdp_session = None
+        logger.info('Playwright page closed')
+
+    async def _restart(self):
+        await self._close_client()
+        await self._init(self.config)  # type: ignore[arg-type]
+
+    async def _check_page_state(self, status: Optional[int] = None) -> PageState:
+        page_state_data = await self.page.evaluate(
+            get_page_function(PAGE_STATE_SCRIPT), []
+        )
+        return self.page_classifier(
+            page_state_data.get('title') or '',
+            page_state_data.get('text') or '',
+            status or page_state_data.get('status'),
+        )
+
+    async def _get_page(self, url: HttpUrl):
+        self._check_inited()
+        logger.debug(f'Get page {url}')
+        for i in range(RETRY_COUNT + 1):
+            if self.rate_controller:
+                await self.rate_controller.acquire_async()
+            self._reset_page_performance()
+            started_at = time.monotonic()
+            try:
+                response = await self.page.goto(
+                    str(url),
+                    wait_until=(
+                        'commit' if self.config.has_fast_load_strategy else 'load'  # type: ignore[union-attr]
+                    ),
+                )
+                self.page_performance['navigation'] = time.monotonic() - started_at
+                page_state = await self._check_page_state(
+                    response.status if response else None
+                )
+                record_page_state(page_state)
+                self._record_navigation(started_at, blocked=page_state != PageState.OK)
+                if page_state != PageState.OK:
+                    await self._save_artifacts(page_state.value)
+                    self.taint(f'get {page_state.value} page for {url}')
+                    raise BlockedPageError(page_state, str(url))
+                await self._save_artifacts('sample', failed=False)
+                return
+            except PlaywrightError as err:
+                logger.warning(
+                    f'Get playwright exception {str(err)} try to restart page'
+                )
+                self._record_navigation(started_at, error=True)
+                if i == RETRY_COUNT:
+                    raise
+                await self._restart()
+
+    async def _navigate(self, url: HttpUrl, ready_paths: Locators):
+        self._check_inited()
+        if self.config.has_spa_navigation and await self._navigate_in_app(url, ready_paths):  # type: ignore[union-attr]
+            return
+        await self._get_page(url)
+
+    async def _navigate_in_app(self, url: HttpUrl, ready_paths: Locators) -> bool:
+        previous_url = self.page.url
+        if not is_same_app(previous_url, str(url)):
+            return False
+
+        logger.debug(f'Navigate in app to {url}')
+        locators = [[by.value, name] for by, name in ready_paths]
+        if self.rate_controller:
+            await self.rate_controller.acquire_async()
+        self._reset_page_performance(is_in_app=True)
+        started_at = time.monotonic()
+        try:
+            await self.page.evaluate(get_page_function(MARK_STALE_SCRIPT), [locators])
+            await self.page.evaluate(
+                get_page_function(PUSH_ROUTE_SCRIPT), [get_app_path(str(url))]
+            )
+            await self.page.wait_for_function(
+                get_page_function(READY_SCRIPT),
+                arg=[locators, previous_url],
+                timeout=self.config.spa_navigation_timeout * 1000,  # type: ignore[union-attr]
+                polling=POLL_FREQUENCY,
+            )
+        except PlaywrightError as err:
+            logger.info(
+                f'Cannot navigate in app to {url}: {str(err)}, fallback to page load'
+            )
+            metrics.increment('parser.navigation.in_app.fallback')
+            return False
+        self.page_performance['navigation'] = time.monotonic() - started_at
+        self._record_navigation(started_at)
+        metrics.increment('parser.navigation.in_app')
+        return True
+
+    def _record_navigation(
+        self, started_at: float, error: bool = False, blocked: bool = False
+    ):
+        if self.rate_controller:
+            self.rate_controller.record(
+                time.monotonic() - started_at, error=error, blocked=blocked
+            )
+
+    async def _wait_ready(self, ready_paths: list[Locators], timeout: float) -> bool:
+        self._check_inited()
+        locators = [
+            [[by.value, name] for by, name in locators] for locators in ready_paths
+        ]
+        started_at = time.monotonic()
+        try:
+            await self.page.wait_for_function(
+                get_page_function(SNAPSHOT_READY_SCRIPT),
+                arg=[locators],
+                timeout=timeout * 1000,
+                polling=POLL_FREQUENCY,
+            )
+        except PlaywrightTimeoutError:
+            logger.warning(f'Page {self.page.url} is not ready after {timeout} sec')
+            await self._save_artifacts('not_ready')
+            return False
+        finally:
+            self.page_performance['wait_ready'] = time.monotonic() - started_at
+        return True
+
+    async def _capture(self, fields: SnapshotFields) -> dict:
+        self._check_inited()
+        fields_spec = {
+            field: {
+                'locators': [[by.value, name] for by, name in locators],
+                'properties': list(properties),
+            }
+            for field, (locators, properties) in fields.items()
+        }
+        snapshot = await self.page.evaluate(
+            get_page_function(SNAPSHOT_SCRIPT), [fields_spec]
+        )
+        logger.debug(f'Capture snapshot of {snapshot["url"]}')
+        if self.cdp_session is not None:
+            snapshot['performance'] = await self._get_page_performance()
+        return snapshot
+
+    def _reset_page_performance(self, is_in_app: bool = False):
+        self.page_performance = {}
+        self._is_in_app_page = is_in_app
+
+    async def _get_page_performance(self) -> dict:
+        performance = dict(self.page_performance)
+        try:
+            if not self._is_in_app_page:  # navigation entry belongs to first app page
+                performance['timing'] = await self.page.evaluate(
+                    get_page_function(NAVIGATION_TIMING_SCRIPT), []
+                )
+            performance['cdp'], self._tab_metrics = get_page_cdp_metrics(
+                await self.cdp_session.send('Performance.getMetrics'), self._tab_metrics
+            )
+        except PlaywrightError as err:
+            logger.warning(f'Cannot get page performance: {str(err)}')
+        return performance
+
+    async def _fill_search(self, locators: Locators, text: str) -> Optional[int]:
+        self._check_inited()
+        for index, locator in enumerate(locators):
+            search_field = self.page.locator(get_selector(locator)).first
+            if await search_field.count():
+                await search_field.fill(text)  # field is cleared before typing
+                return index
+        return None
+
+    async def _submit_search(self, locator: Locator):
+        self._check_inited()
+        search_field = self.page.locator(get_selector(locator)).first
+        if not await search_field.count():
+            raise ClientError(
+                f'Cannot find search field by {locator[0]} with value {locator[1]}'
+            )
+        if self.rate_controller:
+            await self.rate_controller.acquire_async()
+        started_at = time.monotonic()
+        try:
+            async with self.page.expect_navigation(wait_until='commit'):
+                await search_field.press('Enter')
+        except PlaywrightTimeoutError:
+            logger.warning(f'Search submit did not navigate from {self.page.url}')
+            self._record_navigation(started_at, error=True)
+            return
+        except PlaywrightError:
+            self._record_navigation(started_at, error=True)
+            raise
+        self._record_navigation(started_at)
+
+    async def _save_artifacts(self, reason: str, failed: bool = True):
+        if not (
+            self.is_inited
+            and self.artifact_store
+            and self.artifact_store.should_capture(failed)
+        ):
+            return
+        try:
+            self.artifact_store.save(
+                reason,
+                self.page.url,
+                screenshot=await self.page.screenshot(),
+                html=await self.page.content(),
+            )
+        except PlaywrightError as err:
+            logger.warning(f'Cannot take page artifacts: {str(err)}')
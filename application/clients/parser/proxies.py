@@ -1,13 +1,30 @@
 import random
+import time
 from loguru import logger
 
+TAINT_TIMEOUT = 30 * 60  # sec
+
+tainted_proxies: dict[str, float] = {}
+
 
 def get_proxy() -> str:
-    proxy = random.choice(proxies)
+    now = time.monotonic()
+    clean_proxies = [
+        proxy for proxy in proxies if tainted_proxies.get(proxy, 0.0) < now
+    ]
+    proxy = random.choice(clean_proxies or proxies)
     logger.debug(f'Get proxy {proxy}')
     return proxy
 
 
+def taint_proxy(proxy: str, timeout: float = TAINT_TIMEOUT):
+    """
+    Exclude proxy from choice for timeout after getting block pages through it.
+    """
+    logger.warning(f'Taint proxy {proxy} for {timeout} seconds')
+    tainted_proxies[proxy] = time.monotonic() + timeout
+
+
 proxies = (
     'http://1be90c75da143eedd3d8fe4165447dcea11f669a:js_render=true&antibot=true&window_width=1920&window_height=1080&premium_proxy=true@proxy.zenrows.com:8001',  # noqa
 )
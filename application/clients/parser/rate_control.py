@@ -0,0 +1,124 @@
+"""
+Adaptive rate control of outbound marketplace requests.
+"""
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from loguru import logger
+
+from common.metrics import metrics
+
+DEFAULT_RATE = 1.0  # requests per second
+DEFAULT_MIN_RATE = 0.1
+DEFAULT_MAX_RATE = 10.0
+DEFAULT_LATENCY_TARGET = 10.0  # sec
+DEFAULT_INCREASE_STEP = 0.1  # requests per second added after rate successful requests
+DEFAULT_DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN = 1.0  # sec, concurrent failures of one burst decrease rate once
+
+RATE_METRIC = 'parser.rate_control.rate'
+WAIT_METRIC = 'parser.rate_control.wait'
+LATENCY_METRIC = 'parser.rate_control.latency'
+
+
+class AdaptiveRateController:
+    """
+    Token bucket with rate adjusted by AIMD.
+
+    Successful fast requests additively increase rate, errors, blocks and slow responses
+    multiplicatively decrease it, so throughput converges to the highest sustainable rate.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        min_rate: float = DEFAULT_MIN_RATE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        latency_target: float = DEFAULT_LATENCY_TARGET,
+        increase_step: float = DEFAULT_INCREASE_STEP,
+        decrease_factor: float = DEFAULT_DECREASE_FACTOR,
+        burst: Optional[float] = None,
+    ):
+        if not 0 < min_rate <= max_rate:
+            raise ValueError(f'Wrong rate bounds: {min_rate} - {max_rate}')
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.latency_target = latency_target
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.burst = burst
+
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._updated_at = time.monotonic()
+        self._decreased_at = 0.0
+        metrics.set_gauge(RATE_METRIC, self.rate)
+
+    @property
+    def capacity(self) -> float:
+        return self.burst if self.burst is not None else max(1.0, self.rate)
+
+    def acquire(self) -> float:
+        """
+        Block until request is allowed, return waited time.
+        """
+        waited = 0.0
+        while wait_time := self._take_token():
+            time.sleep(wait_time)
+            waited += wait_time
+        metrics.observe(WAIT_METRIC, waited)
+        return waited
+
+    async def acquire_async(self) -> float:
+        """
+        Wait without blocking event loop until request is allowed, return waited time.
+        """
+        waited = 0.0
+        while wait_time := self._take_token():
+            await asyncio.sleep(wait_time)
+            waited += wait_time
+        metrics.observe(WAIT_METRIC, waited)
+        return waited
+
+    def _take_token(self) -> float:
+        """
+        Take token if it is available, otherwise return time until it is refilled.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def record(self, latency: float, error: bool = False, blocked: bool = False):
+        """
+        Adjust rate by result of request.
+        """
+        metrics.observe(LATENCY_METRIC, latency)
+        with self._lock:
+            if error or blocked or latency > self.latency_target:
+                self._decrease()
+            else:
+                self.rate = min(
+                    self.max_rate, self.rate + self.increase_step / max(self.rate, 1.0)
+                )
+            metrics.set_gauge(RATE_METRIC, self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._decreased_at < max(DECREASE_COOLDOWN, 1 / self.rate):
+            return
+        self._decreased_at = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        logger.info(f'Decrease outbound rate to {self.rate:.3f} requests/sec')
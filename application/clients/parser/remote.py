@@ -0,0 +1,68 @@
+"""
+Externally started chrome instances attached over remote debugging endpoints.
+"""
+import json
+import socket
+from pathlib import Path
+from typing import Optional
+from urllib.error import URLError
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+from loguru import logger
+
+DEFAULT_DEBUGGING_PORT = 9222
+DEFAULT_CHECK_TIMEOUT = 3.0  # sec
+
+
+def get_debugger_address(endpoint: str) -> str:
+    """
+    Get host:port of browser from ws://host:port/devtools/browser/<id>, http://host:port or host:port.
+
+    Host name is resolved to ip, chrome accepts remote debugging requests only with ip or localhost host.
+    """
+    endpoint = endpoint.strip()
+    parsed_endpoint = urlparse(endpoint if '://' in endpoint else f'//{endpoint}')
+    if not parsed_endpoint.hostname:
+        raise ValueError(f'Wrong remote browser endpoint {endpoint}')
+    host = parsed_endpoint.hostname
+    if host != 'localhost':
+        host = socket.gethostbyname(host)
+    return f'{host}:{parsed_endpoint.port or DEFAULT_DEBUGGING_PORT}'
+
+
+def load_remote_browsers(
+    endpoints: str = '', registry_file: Optional[Path] = None
+) -> list[str]:
+    """
+    Get remote browser endpoints from comma separated string and registry file with endpoint per line.
+    """
+    raw_endpoints = endpoints.split(',')
+    # empty env value gives current dir
+    if registry_file and not registry_file.is_dir():
+        try:
+            raw_endpoints.extend(registry_file.read_text().splitlines())
+        except OSError as err:
+            logger.warning(
+                f'Cannot read remote browser registry {registry_file}: {err}'
+            )
+    remote_browsers: list[str] = []
+    for endpoint in raw_endpoints:
+        endpoint = endpoint.split('#')[0].strip()
+        if endpoint and endpoint not in remote_browsers:
+            remote_browsers.append(endpoint)
+    return remote_browsers
+
+
+def is_remote_browser_available(
+    endpoint: str, timeout: float = DEFAULT_CHECK_TIMEOUT
+) -> bool:
+    try:
+        debugger_address = get_debugger_address(endpoint)
+        with urlopen(
+            f'http://{debugger_address}/json/version', timeout=timeout
+        ) as response:
+            return 'Browser' in json.loads(response.read())
+    except (URLError, OSError, ValueError) as err:
+        logger.warning(f'Remote browser {endpoint} is not available: {err}')
+        return False
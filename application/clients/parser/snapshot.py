@@ -0,0 +1,55 @@
+"""
+Capture of rendered page data in one browser call.
+"""
+FIND_ELEMENTS_JS = """
+const findElements = (by, value) => {
+    if (by === 'class name') return Array.from(document.getElementsByClassName(value));
+    if (by === 'id') return [document.getElementById(value)].filter(Boolean);
+    if (by === 'xpath') {
+        const nodes = document.evaluate(
+            value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        return Array.from({length: nodes.snapshotLength}, (_, i) => nodes.snapshotItem(i));
+    }
+    return Array.from(document.querySelectorAll(value));
+};
+"""
+
+# every group of locators has element on page
+READY_SCRIPT = (
+    FIND_ELEMENTS_JS
+    + """
+return arguments[0].every(
+    (locators) => locators.some(([by, value]) => findElements(by, value).length > 0)
+);
+"""
+)
+
+# fields data by first found locator of each field: {field: {locator, elements: [{text, ...properties}]}}
+SNAPSHOT_SCRIPT = (
+    FIND_ELEMENTS_JS
+    + """
+const fields = {};
+for (const [field, spec] of Object.entries(arguments[0])) {
+    fields[field] = {locator: null, elements: []};
+    for (const [index, [by, value]] of spec.locators.entries()) {
+        const elements = findElements(by, value);
+        if (!elements.length) continue;
+        fields[field] = {
+            locator: index,
+            elements: elements.map((element) => {
+                const data = {text: (element.innerText || element.textContent || '').trim()};
+                for (const property of spec.properties) {
+                    const value = element[property];
+                    data[property] = value === undefined || value === null
+                        ? element.getAttribute(property) : String(value);
+                }
+                return data;
+            }),
+        };
+        break;
+    }
+}
+return {url: window.location.href, fields: fields};
+"""
+)
@@ -0,0 +1,77 @@
+"""
+Navigation inside already loaded single page application.
+"""
+from urllib.parse import urlparse
+
+STALE_ATTRIBUTE = 'data-parser-stale'
+
+# shared helper for finding first element by selenium locator strategy
+FIND_ELEMENT_JS = """
+const findElement = (by, value) => {
+    if (by === 'class name') return document.getElementsByClassName(value)[0] || null;
+    if (by === 'id') return document.getElementById(value);
+    if (by === 'xpath') return document.evaluate(
+        value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    return document.querySelector(value);
+};
+"""
+
+# mark elements of current page for distinguishing them from rendered after navigation
+MARK_STALE_SCRIPT = (
+    FIND_ELEMENT_JS
+    + f"""
+for (const [by, value] of arguments[0]) {{
+    const element = findElement(by, value);
+    if (element) element.setAttribute('{STALE_ATTRIBUTE}', element.textContent);
+}}
+"""
+)
+
+# push route by application router, history api with popstate is used as fallback
+PUSH_ROUTE_SCRIPT = """
+const path = arguments[0];
+const root = document.querySelector('#__nuxt') || document.querySelector('#app');
+const router = (window.$nuxt && window.$nuxt.$router)
+    || (root && root.__vue__ && root.__vue__.$router)
+    || (root && root.__vue_app__ && root.__vue_app__.config.globalProperties.$router);
+if (router) {
+    Promise.resolve(router.push(path)).catch(() => {});
+    return 'router';
+}
+window.history.pushState({}, '', path);
+window.dispatchEvent(new PopStateEvent('popstate', {state: {}}));
+return 'history';
+"""
+
+# new page is ready when url changed and one of ready elements is rendered again
+READY_SCRIPT = (
+    FIND_ELEMENT_JS
+    + f"""
+const [locators, previousHref] = arguments;
+if (window.location.href === previousHref) return false;
+for (const [by, value] of locators) {{
+    const element = findElement(by, value);
+    if (!element || !element.textContent.trim()) continue;
+    const staleText = element.getAttribute('{STALE_ATTRIBUTE}');
+    if (staleText === null || staleText !== element.textContent) return true;
+}}
+return false;
+"""
+)
+
+
+def get_app_path(url: str) -> str:
+    """
+    Get path with query for application router.
+    """
+    parsed_url = urlparse(url)
+    return parsed_url.path + (f'?{parsed_url.query}' if parsed_url.query else '')
+
+
+def is_same_app(current_url: str, url: str) -> bool:
+    current, target = urlparse(current_url), urlparse(url)
+    return target.scheme in ('http', 'https') and (current.scheme, current.netloc) == (
+        target.scheme,
+        target.netloc,
+    )
@@ -0,0 +1,263 @@
+"""
+Browsers in dedicated worker processes controlled over local pipe.
+"""
+import multiprocessing
+import pickle
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Optional
+
+from loguru import logger
+from pydantic import HttpUrl
+
+from clients.parser.antibot import (
+    NAVIGATION_TOTAL_METRIC,
+    BlockedPageError,
+    refresh_block_rate,
+)
+from clients.parser.artifacts import shutdown_artifact_store
+from clients.parser.locators import By, Locator, Locators, SnapshotFields
+from clients.parser.rate_control import AdaptiveRateController
+from common.errors import ClientError
+from common.metrics import metrics
+from config.client import ParserSettings
+
+DEFAULT_CALL_TIMEOUT = 300.0  # sec, hung browser call after it
+STOP_TIMEOUT = 10.0  # sec
+
+STOP_COMMAND = 'stop'
+# parser members available over pipe, all of them take and return plain data
+WORKER_METHODS = frozenset(
+    (
+        'init',
+        'close_client',
+        'restart',
+        'taint',
+        'reset_session',
+        'check_page_state',
+        'get_page',
+        'navigate',
+        'wait_ready',
+        'capture',
+        'current_url',
+        'fill_search',
+        'submit_search',
+        'save_artifacts',
+    )
+)
+NAVIGATION_METHODS = frozenset(('get_page', 'navigate'))
+
+
+def run_parser_worker(
+    connection: Connection, parser_class: type, remote_browser: Optional[str] = None
+):
+    """
+    Worker process loop, owns one browser and executes calls from pipe.
+    """
+    parser = parser_class(remote_browser=remote_browser)
+    sent_counters: dict[str, float] = {}
+    while True:
+        try:
+            method, args, kwargs = connection.recv()
+        except (EOFError, OSError):  # client process is gone
+            break
+        if method == STOP_COMMAND:
+            break
+        try:
+            if method not in WORKER_METHODS:
+                raise ClientError(f'Unknown parser worker method {method}')
+            member = getattr(parser, method)
+            result = member(*args, **kwargs) if callable(member) else member
+            response: tuple[str, Any] = (
+                'ok',
+                None if method in NAVIGATION_METHODS else result,  # driver stays here
+            )
+        except Exception as err:
+            response = ('error', _get_picklable_error(err))
+
+        counters = metrics.snapshot()['counters']
+        state = {
+            'is_inited': parser.is_inited,
+            'is_tainted': parser.is_tainted,
+            'counters': {
+                name: value - sent_counters.get(name, 0.0)
+                for name, value in counters.items()
+                if value != sent_counters.get(name, 0.0)
+            },
+        }
+        sent_counters = counters
+        try:
+            connection.send((*response, state))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            connection.send(('error', ClientError(repr(response[1])), state))
+        except (EOFError, OSError):
+            break
+
+    try:
+        parser.close_client()
+    except Exception as err:
+        logger.warning(f'Cannot close browser of parser worker: {str(err)}')
+    shutdown_artifact_store()
+
+
+def _get_picklable_error(err: Exception) -> Exception:
+    try:
+        pickle.loads(pickle.dumps(err))
+    except Exception:
+        return ClientError(f'{err.__class__.__name__}: {str(err)}')
+    return err
+
+
+class ParserWorkerClient:
+    """
+    Thin client of browser parser living in worker process.
+
+    Hung or crashed worker is killed and started again on next init.
+    """
+
+    rate_controller: Optional[AdaptiveRateController] = None
+
+    def __init__(
+        self,
+        parser_class: type,
+        call_timeout: float = DEFAULT_CALL_TIMEOUT,
+        remote_browser: Optional[str] = None,
+    ):
+        self.parser_class = parser_class
+        self.call_timeout = call_timeout
+        self.remote_browser = remote_browser
+        self._worker_remote_browser: Optional[str] = None
+        self.config: Optional[ParserSettings] = None
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.connection: Optional[Connection] = None
+        self.is_tainted = False
+        self._is_inited = False
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    @property
+    def is_inited(self) -> bool:
+        return self.is_alive and self._is_inited
+
+    def init(self, config: ParserSettings):
+        self.config = config
+        if self.is_alive and self._worker_remote_browser != self.remote_browser:
+            self._kill()  # parser is moved to other remote browser
+        if not self.is_alive:
+            self._start()
+        self._call('init', config)
+
+    def close_client(self):
+        if not self.is_alive:
+            logger.warning('Parser worker is not started')
+            return
+        try:
+            self.connection.send((STOP_COMMAND, (), {}))  # type: ignore[union-attr]
+        except (EOFError, OSError) as err:
+            logger.warning(f'Cannot stop parser worker: {str(err)}')
+        self.process.join(STOP_TIMEOUT)  # type: ignore[union-attr]
+        self._kill()
+
+    def restart(self):
+        self._call('restart')
+
+    def taint(self, reason: str):
+        self._call('taint', reason)
+
+    def reset_session(self):
+        self._call('reset_session')
+
+    def get_page(self, url: HttpUrl):
+        return self._call_navigation('get_page', url)
+
+    def navigate(self, url: HttpUrl, ready_paths: Locators):
+        return self._call_navigation('navigate', url, ready_paths)
+
+    def wait_ready(self, ready_paths: list[Locators], timeout: float) -> bool:
+        return self._call('wait_ready', ready_paths, timeout)
+
+    def capture(self, fields: SnapshotFields) -> dict:
+        return self._call('capture', fields)
+
+    @property
+    def current_url(self) -> str:
+        return self._call('current_url')
+
+    def fill_search(self, locators: Locators, text: str) -> Optional[int]:
+        return self._call('fill_search', locators, text)
+
+    def submit_search(self, locator: Locator):
+        return self._call_navigation('submit_search', locator)
+
+    def save_artifacts(self, reason: str, failed: bool = True):
+        return self._call('save_artifacts', reason, failed)
+
+    def get_elements(self, by: By, name: str) -> list:
+        raise ClientError(
+            'Page elements are not available from parser worker, use snapshot extraction'
+        )
+
+    def _start(self):
+        context = multiprocessing.get_context('spawn')
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(
+            target=run_parser_worker,
+            args=(worker_connection, self.parser_class, self.remote_browser),
+            name='parser-worker',
+        )
+        self._worker_remote_browser = self.remote_browser
+        self.process.start()
+        worker_connection.close()
+        logger.info(f'Start parser worker process {self.process.pid}')
+
+    def _kill(self):
+        if self.process is not None and self.process.is_alive():
+            logger.warning(f'Kill parser worker process {self.process.pid}')
+            self.process.kill()
+            self.process.join(STOP_TIMEOUT)
+        if self.connection is not None:
+            self.connection.close()
+        self.process = None
+        self.connection = None
+        self._is_inited = False
+
+    def _call_navigation(self, method: str, *args):
+        if not self.rate_controller:
+            return self._call(method, *args)
+        self.rate_controller.acquire()  # shared by workers of pool
+        started_at = time.monotonic()
+        try:
+            result = self._call(method, *args)
+        except BlockedPageError:
+            self.rate_controller.record(time.monotonic() - started_at, blocked=True)
+            raise
+        except Exception:
+            self.rate_controller.record(time.monotonic() - started_at, error=True)
+            raise
+        self.rate_controller.record(time.monotonic() - started_at)
+        return result
+
+    def _call(self, method: str, *args, **kwargs):
+        if not self.is_alive:
+            raise ClientError(f'{self.__class__.__name__} is not started')
+        assert self.connection is not None
+        try:
+            self.connection.send((method, args, kwargs))
+            if not self.connection.poll(self.call_timeout):
+                raise TimeoutError(f'no answer after {self.call_timeout} sec')
+            status, result, state = self.connection.recv()
+        except (EOFError, OSError, TimeoutError) as err:
+            self._kill()  # crash or hang stays in worker process
+            raise ClientError(f'Parser worker failed on {method}: {str(err)}') from err
+
+        self._is_inited = state['is_inited']
+        self.is_tainted = state['is_tainted']
+        for name, value in state['counters'].items():
+            metrics.increment(name, value)
+        if NAVIGATION_TOTAL_METRIC in state['counters']:
+            refresh_block_rate()
+        if status == 'error':
+            raise result
+        return result
@@ -0,0 +1,129 @@
+"""
+Streaming reader for sitemap indexes and url sitemaps.
+"""
+import gzip
+import io
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Generator, Iterator, NamedTuple, Optional
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import ParseError, iterparse
+
+from loguru import logger
+
+from common.errors import ClientError
+
+DEFAULT_TIMEOUT = 60
+GZIP_MAGIC = b'\x1f\x8b'
+
+SITEMAP_TAG = 'sitemap'  # entry of sitemap index
+URL_TAG = 'url'  # entry of url sitemap
+
+
+class SitemapEntry(NamedTuple):
+    loc: str
+    lastmod: Optional[datetime] = None
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse W3C datetime of sitemap lastmod, naive values are treated as UTC.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        lastmod = datetime.fromisoformat(value)
+    except ValueError:
+        logger.warning(f'Cannot parse sitemap lastmod {value}')
+        return None
+    if lastmod.tzinfo is None:
+        lastmod = lastmod.replace(tzinfo=timezone.utc)
+    return lastmod
+
+
+class SitemapReader:
+    """
+    Walk sitemap index down to url sitemaps without loading whole files in memory.
+
+    Sources could be http(s) urls, file urls or local paths, gzip compressed or not.
+    """
+
+    def __init__(self, timeout: int = DEFAULT_TIMEOUT, useragent: Optional[str] = None):
+        self.timeout = timeout
+        self.useragent = useragent
+
+    def iter_entries(self, source: str) -> Iterator[SitemapEntry]:
+        """
+        Yield url entries of sitemap and all nested sitemaps.
+        """
+        for tag, entry in self._iter_source_entries(source):
+            if tag == SITEMAP_TAG:
+                yield from self.iter_entries(self._resolve(source, entry.loc))
+            elif tag == URL_TAG:
+                yield entry
+
+    def _iter_source_entries(
+        self, source: str
+    ) -> Generator[tuple[str, SitemapEntry], None, None]:
+        logger.info(f'Start reading sitemap {source}')
+        with self._open(source) as stream:
+            context = iterparse(stream, events=('start', 'end'))
+            try:
+                _, root = next(context)
+                for event, element in context:
+                    if event != 'end':
+                        continue
+                    tag = _local_name(element.tag)
+                    if tag not in (SITEMAP_TAG, URL_TAG):
+                        continue
+                    values = {
+                        _local_name(child.tag): (child.text or '').strip()
+                        for child in element
+                    }
+                    root.clear()  # drop already processed entries
+                    if not values.get('loc'):
+                        continue
+                    yield tag, SitemapEntry(
+                        loc=values['loc'], lastmod=parse_lastmod(values.get('lastmod'))
+                    )
+            except (ParseError, OSError, EOFError) as err:
+                raise ClientError(f'Cannot read sitemap {source}: {err}') from err
+
+    @staticmethod
+    def _resolve(parent_source: str, loc: str) -> str:
+        if urlparse(loc).scheme or Path(loc).is_absolute():
+            return loc
+        return urljoin(parent_source, loc)
+
+    @contextmanager
+    def _open(self, source: str) -> Generator[IO[bytes], None, None]:
+        parsed_source = urlparse(source)
+        try:
+            if parsed_source.scheme in ('http', 'https'):
+                headers = {'User-Agent': self.useragent} if self.useragent else {}
+                raw_stream = urllib.request.urlopen(  # noqa: S310
+                    urllib.request.Request(source, headers=headers),
+                    timeout=self.timeout,
+                )
+            else:
+                path = parsed_source.path if parsed_source.scheme == 'file' else source
+                raw_stream = open(Path(path), 'rb')
+        except OSError as err:
+            raise ClientError(f'Cannot open sitemap {source}: {err}') from err
+
+        with raw_stream:
+            stream = io.BufferedReader(raw_stream)  # type: ignore[arg-type]
+            if stream.peek(len(GZIP_MAGIC))[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+                with gzip.GzipFile(fileobj=stream) as gzip_stream:
+                    yield gzip_stream  # type: ignore[misc]
+                return
+            yield stream
@@ -0,0 +1,78 @@
+"""
+In-process application metrics.
+"""
+import threading
+from collections import defaultdict
+from typing import Optional
+
+
+class Observation:
+    """
+    Aggregate of observed values.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.last: Optional[float] = None
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.last = value
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0.0,
+            'min': self.min or 0.0,
+            'max': self.max or 0.0,
+            'last': self.last or 0.0,
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread safe registry of counters, gauges and observations.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+        self._observations: dict[str, Observation] = defaultdict(Observation)
+
+    def increment(self, name: str, value: float = 1) -> float:
+        with self._lock:
+            self._counters[name] += value
+            return self._counters[name]
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self._observations[name].add(value)
+
+    def get_counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0.0)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'observations': {
+                    name: observation.as_dict()
+                    for name, observation in self._observations.items()
+                },
+            }
+
+
+metrics = MetricsRegistry()
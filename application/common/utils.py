@@ -3,10 +3,12 @@ Collection for common help function in project.
 """
 import asyncio
 import contextvars
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import time
 from functools import partial, wraps
-from typing import Callable, Coroutine, List
+from typing import Callable, Coroutine, List, Optional
 
 import pytz
 from aiomisc import asyncretry, cancel_tasks
@@ -37,6 +39,37 @@ def async_wrapper(func: Callable) -> Callable:
     return run
 
 
+process_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Get shared process pool for cpu bound tasks.
+    """
+    global process_executor
+    if process_executor is None:
+        process_executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')
+        )
+    return process_executor
+
+
+def shutdown_process_executor():
+    global process_executor
+    if process_executor is not None:
+        process_executor.shutdown(cancel_futures=True)
+        process_executor = None
+
+
+async def run_in_process(func: Callable, *args, executor=None):
+    """
+    Run picklable func in process pool, func context is not copied.
+    """
+    if executor is None:
+        executor = get_process_executor()
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
 def duration_measure(func: Callable) -> Callable:
     """
     Decorator for logging execution time of the func.
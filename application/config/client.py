@@ -1,10 +1,46 @@
 """Config for external clients"""
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseSettings, Field, HttpUrl
 
 SBER_DEFAULT_URL = 'https://sbermegamarket.ru'
+SBER_DEFAULT_SITEMAP_URL = 'https://sbermegamarket.ru/sitemap.xml'
 DEFAULT_POOL_SIZE = 1
+DEFAULT_RATE_LIMIT = 1.0  # requests per second
+DEFAULT_MIN_RATE_LIMIT = 0.1
+DEFAULT_MAX_RATE_LIMIT = 10.0
+DEFAULT_LATENCY_TARGET = 10.0  # sec
+DEFAULT_NAVIGATION_EXPLORATION_RATE = 0.1
+DEFAULT_HEDGE_PERCENTILE = 0.9
+DEFAULT_HEDGE_MAX_RATE = 0.1
+DEFAULT_HEDGE_DELAY = 30.0  # sec
+DEFAULT_SPA_NAVIGATION_TIMEOUT = 10.0  # sec
+DEFAULT_READY_TIMEOUT = 10.0  # sec
+DEFAULT_PARSE_WORKERS = 0
+DEFAULT_PIPELINE_QUEUE_SIZE = 10
+DEFAULT_PIPELINE_BATCH_SIZE = 20
+DEFAULT_EXTRACTION_BREAKER_WINDOW = 50
+DEFAULT_EXTRACTION_BREAKER_MIN_HIT_RATE = 0.05
+DEFAULT_EXTRACTION_BREAKER_COOLDOWN = 300.0  # sec
+DEFAULT_WORKER_CALL_TIMEOUT = 300.0  # sec
+DEFAULT_ARTIFACT_MAX_SIZE = 500  # MB
+DEFAULT_ARTIFACT_MAX_AGE = 7 * 24 * 3600.0  # sec
+DEFAULT_PAGE_TRACE_SAMPLE_RATE = 0.1
+DEFAULT_PAGE_TRACE_SLOW_TIME = 10.0  # sec
+DEFAULT_CANARY_INTERVAL = 300.0  # sec
+DEFAULT_CANARY_HISTORY_SIZE = 50
+DEFAULT_SEED_JOB_POLL_INTERVAL = 5.0  # sec
+DEFAULT_SEED_JOB_LEASE_TIME = 300.0  # sec
+DEFAULT_RETRY_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 60.0  # sec
+DEFAULT_RETRY_MAX_DELAY = 6 * 3600.0  # sec
+DEFAULT_REFRESH_MAX_AGE = 24 * 3600.0  # sec
+DEFAULT_REFRESH_SHARE = 0.5
+DEFAULT_REFRESH_INTERVAL = 60.0  # sec
+DEFAULT_REFRESH_BATCH_SIZE = 100
+DEFAULT_REVISIT_MIN_INTERVAL = 3600.0  # sec
+DEFAULT_REVISIT_MAX_INTERVAL = 30 * 24 * 3600.0  # sec
+BrowserBackend = Literal['selenium', 'playwright']
 
 
 class ParserSettings:
@@ -20,6 +56,43 @@ class ParserSettings:
     has_random_useragent: bool = True
     has_experimental_options: bool = False
     log_folder: str
+    has_rate_control: bool = True
+    rate_limit: float = DEFAULT_RATE_LIMIT
+    min_rate_limit: float = DEFAULT_MIN_RATE_LIMIT
+    max_rate_limit: float = DEFAULT_MAX_RATE_LIMIT
+    latency_target: float = DEFAULT_LATENCY_TARGET
+    navigation_exploration_rate: float = DEFAULT_NAVIGATION_EXPLORATION_RATE
+    has_hedging: bool = False
+    hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE
+    hedge_max_rate: float = DEFAULT_HEDGE_MAX_RATE
+    hedge_delay: float = DEFAULT_HEDGE_DELAY
+    has_spa_navigation: bool = True
+    spa_navigation_timeout: float = DEFAULT_SPA_NAVIGATION_TIMEOUT
+    has_snapshot_extraction: bool = True
+    ready_timeout: float = DEFAULT_READY_TIMEOUT
+    parse_workers: int = DEFAULT_PARSE_WORKERS
+    pipeline_queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE
+    pipeline_batch_size: int = DEFAULT_PIPELINE_BATCH_SIZE
+    has_extraction_breaker: bool = True
+    extraction_breaker_window: int = DEFAULT_EXTRACTION_BREAKER_WINDOW
+    extraction_breaker_min_hit_rate: float = DEFAULT_EXTRACTION_BREAKER_MIN_HIT_RATE
+    extraction_breaker_cooldown: float = DEFAULT_EXTRACTION_BREAKER_COOLDOWN
+    selector_stats_file: Optional[Path] = None
+    has_variant_extraction: bool = True
+    has_process_workers: bool = False
+    worker_call_timeout: float = DEFAULT_WORKER_CALL_TIMEOUT
+    remote_browsers: str = ''
+    remote_browser_registry: Optional[Path] = None
+    browser_backend: BrowserBackend = 'selenium'
+    has_artifacts: bool = True
+    artifact_folder: str
+    artifact_sample_rate: float = 0.0
+    artifact_max_size: int = DEFAULT_ARTIFACT_MAX_SIZE
+    artifact_max_age: float = DEFAULT_ARTIFACT_MAX_AGE
+    has_page_metrics: bool = True
+    has_page_trace: bool = False
+    page_trace_sample_rate: float = DEFAULT_PAGE_TRACE_SAMPLE_RATE
+    page_trace_slow_time: float = DEFAULT_PAGE_TRACE_SLOW_TIME
 
 
 class SberMegaMarketParserSettings(BaseSettings):
@@ -43,3 +116,168 @@ class SberMegaMarketParserSettings(BaseSettings):
         default=False, env='SBER_PARSER_EXPERIMENTAL'
     )
     log_folder: str = Field(default='var/log', env='SBER_PARSER_LOG_FOLDER')
+    has_rate_control: bool = Field(default=True, env='SBER_PARSER_RATE_CONTROL')
+    rate_limit: float = Field(default=DEFAULT_RATE_LIMIT, env='SBER_PARSER_RATE_LIMIT')
+    min_rate_limit: float = Field(
+        default=DEFAULT_MIN_RATE_LIMIT, env='SBER_PARSER_MIN_RATE_LIMIT'
+    )
+    max_rate_limit: float = Field(
+        default=DEFAULT_MAX_RATE_LIMIT, env='SBER_PARSER_MAX_RATE_LIMIT'
+    )
+    latency_target: float = Field(
+        default=DEFAULT_LATENCY_TARGET, env='SBER_PARSER_LATENCY_TARGET'
+    )
+    navigation_exploration_rate: float = Field(
+        default=DEFAULT_NAVIGATION_EXPLORATION_RATE,
+        env='SBER_PARSER_NAVIGATION_EXPLORATION_RATE',
+    )  # share of requests for checking not the best navigation strategy
+    has_hedging: bool = Field(default=False, env='SBER_PARSER_HEDGING')
+    hedge_percentile: float = Field(
+        default=DEFAULT_HEDGE_PERCENTILE, env='SBER_PARSER_HEDGE_PERCENTILE'
+    )  # percentile of recent scrape latencies for launching hedge attempt
+    hedge_max_rate: float = Field(
+        default=DEFAULT_HEDGE_MAX_RATE, env='SBER_PARSER_HEDGE_MAX_RATE'
+    )  # max share of hedged requests
+    hedge_delay: float = Field(
+        default=DEFAULT_HEDGE_DELAY, env='SBER_PARSER_HEDGE_DELAY'
+    )  # delay before hedge attempt until enough latencies are observed
+    has_spa_navigation: bool = Field(default=True, env='SBER_PARSER_SPA_NAVIGATION')
+    spa_navigation_timeout: float = Field(
+        default=DEFAULT_SPA_NAVIGATION_TIMEOUT, env='SBER_PARSER_SPA_NAVIGATION_TIMEOUT'
+    )
+    has_snapshot_extraction: bool = Field(default=True, env='SBER_PARSER_SNAPSHOT')
+    ready_timeout: float = Field(
+        default=DEFAULT_READY_TIMEOUT, env='SBER_PARSER_READY_TIMEOUT'
+    )  # waiting of product data rendering before snapshot capture
+    parse_workers: int = Field(
+        default=DEFAULT_PARSE_WORKERS, env='SBER_PARSER_PARSE_WORKERS'
+    )  # processes for parsing snapshots, 0 for parsing in event loop
+    pipeline_queue_size: int = Field(
+        default=DEFAULT_PIPELINE_QUEUE_SIZE, env='SBER_PARSER_PIPELINE_QUEUE_SIZE'
+    )  # max goods waiting between batch scraping stages
+    pipeline_batch_size: int = Field(
+        default=DEFAULT_PIPELINE_BATCH_SIZE, env='SBER_PARSER_PIPELINE_BATCH_SIZE'
+    )  # products saved in one transaction
+    has_extraction_breaker: bool = Field(
+        default=True, env='SBER_PARSER_EXTRACTION_BREAKER'
+    )
+    extraction_breaker_window: int = Field(
+        default=DEFAULT_EXTRACTION_BREAKER_WINDOW,
+        env='SBER_PARSER_EXTRACTION_BREAKER_WINDOW',
+    )  # last product pages for counting field selector hit rate
+    extraction_breaker_min_hit_rate: float = Field(
+        default=DEFAULT_EXTRACTION_BREAKER_MIN_HIT_RATE,
+        env='SBER_PARSER_EXTRACTION_BREAKER_MIN_HIT_RATE',
+    )  # field selector is considered broken below this hit rate
+    extraction_breaker_cooldown: float = Field(
+        default=DEFAULT_EXTRACTION_BREAKER_COOLDOWN,
+        env='SBER_PARSER_EXTRACTION_BREAKER_COOLDOWN',
+    )  # delay before probing broken field again
+    selector_stats_file: Optional[Path] = Field(
+        default=Path('var/selector_stats.json'), env='SBER_PARSER_SELECTOR_STATS_FILE'
+    )  # keeping of selectors ordering across restarts
+    has_variant_extraction: bool = Field(
+        default=True, env='SBER_PARSER_VARIANTS'
+    )  # saving of product variants listed on product page while batch scraping
+    has_process_workers: bool = Field(
+        default=False, env='SBER_PARSER_PROCESS_WORKERS'
+    )  # every browser of pool is driven from own worker process
+    worker_call_timeout: float = Field(
+        default=DEFAULT_WORKER_CALL_TIMEOUT, env='SBER_PARSER_WORKER_CALL_TIMEOUT'
+    )  # worker process is killed if browser call hangs longer
+    remote_browsers: str = Field(
+        default='', env='SBER_PARSER_REMOTE_BROWSERS'
+    )  # comma separated remote debugging endpoints of external chromes
+    remote_browser_registry: Optional[Path] = Field(
+        default=None, env='SBER_PARSER_REMOTE_BROWSER_REGISTRY'
+    )  # file with remote debugging endpoint per line, re-read when browser is gone
+    browser_backend: BrowserBackend = Field(
+        default='selenium', env='SBER_PARSER_BACKEND'
+    )  # playwright awaits pages on event loop, needs playwright extra
+    has_artifacts: bool = Field(
+        default=True, env='SBER_PARSER_ARTIFACTS'
+    )  # screenshots and html of failed pages
+    artifact_folder: str = Field(
+        default='var/log/artifacts', env='SBER_PARSER_ARTIFACT_FOLDER'
+    )
+    artifact_sample_rate: float = Field(
+        default=0.0, env='SBER_PARSER_ARTIFACT_SAMPLE_RATE'
+    )  # share of successful page loads saved too
+    artifact_max_size: int = Field(
+        default=DEFAULT_ARTIFACT_MAX_SIZE, env='SBER_PARSER_ARTIFACT_MAX_SIZE'
+    )  # MB, the oldest artifacts are removed above it
+    artifact_max_age: float = Field(
+        default=DEFAULT_ARTIFACT_MAX_AGE, env='SBER_PARSER_ARTIFACT_MAX_AGE'
+    )
+    has_page_metrics: bool = Field(
+        default=True, env='SBER_PARSER_PAGE_METRICS'
+    )  # navigation timing and CDP performance metrics of every captured page
+    has_page_trace: bool = Field(
+        default=False, env='SBER_PARSER_PAGE_TRACE'
+    )  # chrome trace of slow pages into artifact folder, selenium backend only
+    page_trace_sample_rate: float = Field(
+        default=DEFAULT_PAGE_TRACE_SAMPLE_RATE, env='SBER_PARSER_PAGE_TRACE_SAMPLE_RATE'
+    )  # share of slow pages with saved trace
+    page_trace_slow_time: float = Field(
+        default=DEFAULT_PAGE_TRACE_SLOW_TIME, env='SBER_PARSER_PAGE_TRACE_SLOW_TIME'
+    )  # navigation with readiness waiting longer it is slow
+    canary_goods_ids: str = Field(
+        default='', env='SBER_PARSER_CANARY_GOODS_IDS'
+    )  # comma separated known goods ids scraped by canary, empty disables it
+    canary_interval: float = Field(
+        default=DEFAULT_CANARY_INTERVAL, env='SBER_PARSER_CANARY_INTERVAL'
+    )  # delay between canary rounds
+    canary_history_size: int = Field(
+        default=DEFAULT_CANARY_HISTORY_SIZE, env='SBER_PARSER_CANARY_HISTORY_SIZE'
+    )  # last canary results kept for health report
+    has_seed_job_runner: bool = Field(
+        default=True, env='SBER_PARSER_SEED_JOB_RUNNER'
+    )  # scraping of submitted seed jobs inside api process
+    seed_job_concurrency: int = Field(
+        default=0, env='SBER_PARSER_SEED_JOB_CONCURRENCY'
+    )  # seed job tasks scraped at once, 0 for pool size
+    seed_job_poll_interval: float = Field(
+        default=DEFAULT_SEED_JOB_POLL_INTERVAL, env='SBER_PARSER_SEED_JOB_POLL_INTERVAL'
+    )  # waiting of new tasks when queue is empty
+    seed_job_lease_time: float = Field(
+        default=DEFAULT_SEED_JOB_LEASE_TIME, env='SBER_PARSER_SEED_JOB_LEASE_TIME'
+    )  # running task of worker without heartbeats is taken by other workers after it
+    retry_max_attempts: int = Field(
+        default=DEFAULT_RETRY_MAX_ATTEMPTS, env='SBER_PARSER_RETRY_MAX_ATTEMPTS'
+    )  # failed goods id stays in dead-letter set after it
+    retry_delay: float = Field(
+        default=DEFAULT_RETRY_DELAY, env='SBER_PARSER_RETRY_DELAY'
+    )  # delay after the first failure, doubled after every next one
+    retry_max_delay: float = Field(
+        default=DEFAULT_RETRY_MAX_DELAY, env='SBER_PARSER_RETRY_MAX_DELAY'
+    )
+    retry_hours: str = Field(
+        default='', env='SBER_PARSER_RETRY_HOURS'
+    )  # off-peak utc hours window for retries like 0-6 or 22-4, empty for any time
+    has_refresh_scheduler: bool = Field(
+        default=False, env='SBER_PARSER_REFRESH_SCHEDULER'
+    )  # background re-scraping of stale products inside api process
+    refresh_max_age: float = Field(
+        default=DEFAULT_REFRESH_MAX_AGE, env='SBER_PARSER_REFRESH_MAX_AGE'
+    )  # product is stale after it without own target
+    refresh_targets: str = Field(
+        default='', env='SBER_PARSER_REFRESH_TARGETS'
+    )  # comma separated category name or goods id = max age[:priority]
+    refresh_share: float = Field(
+        default=DEFAULT_REFRESH_SHARE, env='SBER_PARSER_REFRESH_SHARE'
+    )  # share of pool taken by re-scraping
+    refresh_interval: float = Field(
+        default=DEFAULT_REFRESH_INTERVAL, env='SBER_PARSER_REFRESH_INTERVAL'
+    )  # waiting of stale products when all are fresh
+    refresh_batch_size: int = Field(
+        default=DEFAULT_REFRESH_BATCH_SIZE, env='SBER_PARSER_REFRESH_BATCH_SIZE'
+    )
+    revisit_min_interval: float = Field(
+        default=DEFAULT_REVISIT_MIN_INTERVAL, env='SBER_PARSER_REVISIT_MIN_INTERVAL'
+    )  # bounds of revisit interval learned from change rate of product
+    revisit_max_interval: float = Field(
+        default=DEFAULT_REVISIT_MAX_INTERVAL, env='SBER_PARSER_REVISIT_MAX_INTERVAL'
+    )  # products with shorter refresh max age are revisited after it
+    sitemap_url: str = Field(
+        default=SBER_DEFAULT_SITEMAP_URL, env='SBER_MEGAMARKET_SITEMAP_URI'
+    )  # could be local path to sitemap file
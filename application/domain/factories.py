@@ -0,0 +1,83 @@
+"""
+Domain objects built from settings, shared by api, workers and scripts of one process.
+"""
+from clients import parser_pool
+from common.utils import get_process_executor
+from config import application_config, parser_config
+from domain.goods import (
+    ExtractionCircuitBreaker,
+    GinoProductRepository,
+    HedgePolicy,
+    NavigationStrategySelector,
+    ProductInfoService,
+    RevisitPolicy,
+    SberMegaMarketProductProvider,
+    SelectorRanking,
+)
+from domain.jobs import RetryPolicy
+
+navigation_selector = NavigationStrategySelector(
+    exploration_rate=parser_config.navigation_exploration_rate
+)  # shared between requests for learning on all of them
+hedge_policy = (
+    HedgePolicy(
+        percentile=parser_config.hedge_percentile,
+        max_hedge_rate=parser_config.hedge_max_rate,
+        default_delay=parser_config.hedge_delay,
+    )
+    if parser_config.has_hedging
+    else None
+)
+extraction_breaker = (
+    ExtractionCircuitBreaker(
+        window_size=parser_config.extraction_breaker_window,
+        min_hit_rate=parser_config.extraction_breaker_min_hit_rate,
+        cooldown=parser_config.extraction_breaker_cooldown,
+    )
+    if parser_config.has_extraction_breaker
+    else None
+)  # shared between requests for detecting layout changes on all of them
+has_snapshot_extraction = (
+    parser_config.has_snapshot_extraction
+    or parser_config.has_process_workers  # page elements stay in worker process
+    or parser_config.browser_backend == 'playwright'
+)
+selector_ranking = SelectorRanking(stats_file=parser_config.selector_stats_file)
+retry_policy = RetryPolicy(
+    max_attempts=parser_config.retry_max_attempts,
+    delay=parser_config.retry_delay,
+    max_delay=parser_config.retry_max_delay,
+    hours=parser_config.retry_hours,
+)
+revisit_policy = RevisitPolicy(
+    min_interval=parser_config.revisit_min_interval,
+    max_interval=parser_config.revisit_max_interval,
+)
+
+
+def get_product_provider() -> SberMegaMarketProductProvider:
+    return SberMegaMarketProductProvider(
+        parser_pool=parser_pool,
+        base_url=parser_config.url,
+        debug=application_config.is_debug,
+        hedge_policy=hedge_policy,
+        has_snapshot_extraction=has_snapshot_extraction,
+        parse_executor=(
+            get_process_executor(parser_config.parse_workers)
+            if parser_config.parse_workers
+            else None
+        ),
+        ready_timeout=parser_config.ready_timeout,
+        extraction_breaker=extraction_breaker,
+        selector_ranking=selector_ranking,
+        has_variant_extraction=parser_config.has_variant_extraction,
+        navigation_selector=navigation_selector,
+    )
+
+
+def get_product_info_service() -> ProductInfoService:
+    return ProductInfoService(
+        product_repo=GinoProductRepository(),
+        product_provider=get_product_provider(),
+        revisit_policy=revisit_policy,
+    )
@@ -1,5 +1,24 @@
-from .entities import ProductEntity
-from .repositories import GinoProductRepository, ProductRepository
-from .servicies import ProductInfoService
-from .types import CategoryName, ProductName, GoodsID
+from .entities import (
+    CanaryReport,
+    ProductEntity,
+    ProductFreshness,
+    ProductRevisit,
+    SitemapIngestResult,
+)
+from .repositories import (
+    GinoProductRepository,
+    GinoProductSitemapRepository,
+    ProductRepository,
+    ProductSitemapRepository,
+)
+from .servicies import ProductInfoService, ProductSitemapService
+from .extraction import ExtractionCircuitBreaker
+from .hedging import HedgePolicy
+from .navigation import NavigationStrategy, NavigationStrategySelector
+from .pipeline import ScrapePipeline
+from .selectors import SelectorRanking
+from .types import CategoryName, ProductField, ProductName, GoodsID
 from .provider import ProductProvider, SberMegaMarketProductProvider
+from .canary import SyntheticCanary
+from .refresh import FreshnessPolicy, RefreshScheduler
+from .revisit import RevisitPolicy
@@ -0,0 +1,145 @@
+"""
+Synthetic canary scrapes of known goods.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import suppress
+from statistics import mean
+from typing import Optional
+
+from loguru import logger
+
+from common.metrics import metrics
+from common.utils import utc_now
+from .entities import CanaryReport, CanaryResult, ProductEntity
+from .servicies import ProductInfoService
+from .timings import SCRAPE_STAGES, StageTimings, stage_timings_var
+from .types import GoodsID, ProductField
+
+DEFAULT_INTERVAL = 300.0  # sec
+DEFAULT_HISTORY_SIZE = 50
+REPORT_PERCENTILES = (0.5, 0.95)
+
+
+def get_percentile(values: list[float], percentile: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, math.ceil(percentile * len(values)) - 1)]
+
+
+def get_missing_fields(product: ProductEntity) -> list[ProductField]:
+    return [field for field in ProductField if not getattr(product, field.value)]
+
+
+class SyntheticCanary:
+    """
+    Periodic scrapes of known goods by the same service and provider as api requests.
+
+    Stage timings and completeness of product fields of recent rounds are kept for health report.
+    """
+
+    def __init__(
+        self,
+        product_info_service: ProductInfoService,
+        goods_ids: list[GoodsID],
+        interval: float = DEFAULT_INTERVAL,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ):
+        self.product_info_service = product_info_service
+        self.goods_ids = goods_ids
+        self.interval = interval
+        self.results: deque[CanaryResult] = deque(maxlen=history_size)
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self, goods_id: GoodsID) -> CanaryResult:
+        """
+        Scrape and save product, failures are returned in result.
+        """
+        timings = StageTimings()
+        token = stage_timings_var.set(timings)
+        started_at = utc_now()
+        start = time.monotonic()
+        product: Optional[ProductEntity] = None
+        error: Optional[str] = None
+        try:
+            product = await self.product_info_service.register_provider_product_info(
+                goods_id
+            )
+        except Exception as err:
+            logger.warning(f'Canary scrape of goods id {goods_id} failed: {err!r}')
+            error = str(err) or type(err).__name__
+        finally:
+            stage_timings_var.reset(token)
+
+        missing_fields = get_missing_fields(product) if product else list(ProductField)
+        result = CanaryResult(
+            goods_id=goods_id,
+            started_at=started_at,
+            success=product is not None,
+            error=error,
+            duration=time.monotonic() - start,
+            stages=timings.as_dict(),
+            completeness=1 - len(missing_fields) / len(ProductField),
+            missing_fields=missing_fields,
+        )
+        self._record(result)
+        return result
+
+    async def run_once(self) -> list[CanaryResult]:
+        return [await self.check(goods_id) for goods_id in self.goods_ids]
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def get_report(self) -> CanaryReport:
+        results = list(self.results)
+        report = CanaryReport(
+            goods_ids=self.goods_ids, interval=self.interval, checks=len(results)
+        )
+        if not results:
+            return report
+        report.success_rate = sum(result.success for result in results) / len(results)
+        report.completeness = mean(result.completeness for result in results)
+        for stage in SCRAPE_STAGES + ('total',):
+            durations = [
+                result.duration if stage == 'total' else result.stages[stage]
+                for result in results
+                if stage == 'total' or stage in result.stages
+            ]
+            if durations:
+                report.stages[stage] = {
+                    'avg': mean(durations),
+                    **{
+                        f'p{int(percentile * 100)}': get_percentile(
+                            durations, percentile
+                        )
+                        for percentile in REPORT_PERCENTILES
+                    },
+                    'max': max(durations),
+                }
+        report.results = results
+        return report
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def _record(self, result: CanaryResult):
+        self.results.appendleft(result)
+        metrics.increment('canary.checks')
+        if not result.success:
+            metrics.increment('canary.failures')
+        metrics.observe('canary.duration', result.duration)
+        metrics.observe('canary.completeness', result.completeness)
+        for stage, duration in result.stages.items():
+            metrics.observe(f'canary.stage.{stage}', duration)
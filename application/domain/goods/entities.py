@@ -1,9 +1,12 @@
+from datetime import datetime
 from decimal import Decimal
+from typing import Optional
 
 from pydantic import HttpUrl, Field
 
-from .types import GoodsID, ProductName
+from .types import CategoryName, GoodsID, ProductField, ProductName
 from ..entities import Entity, EncodedModel
+from ..types import IntId
 
 
 class ProductAttribute(EncodedModel):
@@ -36,3 +39,77 @@ class ProductEntity(Entity):
         ):
             return True
         return False
+
+
+class ProductVariants(EncodedModel):
+    products: list[ProductEntity] = Field(
+        default_factory=list, description='Variants resolved from product page'
+    )
+    pending_goods_ids: list[GoodsID] = Field(
+        default_factory=list, description='Variants required own page load'
+    )
+
+
+class ProductSitemapEntity(Entity):
+    goods_id: GoodsID = Field(description='Штрихкод')
+    url: HttpUrl
+    lastmod: Optional[datetime] = Field(description='Last modification from sitemap')
+
+
+class ProductFreshness(EncodedModel):
+    goods_id: GoodsID
+    checked_at: datetime = Field(description='Last scrape of product')
+    revisit_interval: Optional[float] = Field(
+        description='Seconds between scrapes learned from change rate'
+    )
+    categories: list[CategoryName] = Field(default_factory=list)
+
+
+class ProductRevisit(EncodedModel):
+    id: IntId
+    goods_id: GoodsID
+    created_at: datetime
+    modified_at: datetime = Field(description='Last change of product')
+    content_hash: Optional[str] = Field(description='Hash of normalized product fields')
+    checked_at: Optional[datetime]
+    first_checked_at: Optional[datetime] = Field(
+        description='Start of observed time of checks and changes'
+    )
+    checks: int = Field(0, description='Count of scrapes of stored product')
+    changes: int = Field(0, description='Count of scrapes with changed product')
+    revisit_interval: Optional[float]
+    next_revisit_at: Optional[datetime]
+
+
+class SitemapIngestResult(EncodedModel):
+    source: str
+    entries: int = Field(0, description='Count of url entries')
+    products: int = Field(0, description='Count of product url entries')
+    scheduled: int = Field(0, description='Count of products scheduled for scraping')
+
+
+class CanaryResult(EncodedModel):
+    goods_id: GoodsID
+    started_at: datetime
+    success: bool
+    error: Optional[str] = None
+    duration: float = Field(description='Seconds of full scrape with saving')
+    stages: dict[str, float] = Field(
+        default_factory=dict, description='Seconds of scrape stages'
+    )
+    completeness: float = Field(0.0, description='Share of filled product fields')
+    missing_fields: list[ProductField] = Field(default_factory=list)
+
+
+class CanaryReport(EncodedModel):
+    goods_ids: list[GoodsID]
+    interval: float = Field(description='Seconds between canary rounds')
+    checks: int = Field(0, description='Count of kept results')
+    success_rate: float = 0.0
+    completeness: float = Field(0.0, description='Mean share of filled product fields')
+    stages: dict[str, dict[str, float]] = Field(
+        default_factory=dict, description='Mean and percentiles of stage seconds'
+    )
+    results: list[CanaryResult] = Field(
+        default_factory=list, description='Latest results first'
+    )
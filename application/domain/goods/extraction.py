@@ -0,0 +1,160 @@
+"""
+Circuit breaker of product fields extraction for catching site layout changes.
+"""
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Optional
+
+from loguru import logger
+
+from common.errors import ApplicationError
+from common.metrics import metrics
+
+DEFAULT_REQUIRED_FIELDS = ('name', 'price')
+DEFAULT_WINDOW_SIZE = 50
+DEFAULT_MIN_OBSERVATIONS = 20
+DEFAULT_MIN_HIT_RATE = 0.05
+DEFAULT_COOLDOWN = 300.0  # sec
+
+
+class BreakerState(Enum):
+    CLOSED = 'closed'  # field is extracted as usual
+    OPEN = 'open'  # selector is broken, field is not extracted
+    HALF_OPEN = 'half_open'  # cooldown passed, single probe decides
+
+
+class ExtractionBrokenError(ApplicationError):
+    """
+    Required product field cannot be extracted with current selectors.
+    """
+
+    default_message = 'Product field extraction is broken'
+
+
+class FieldBreaker:
+    """
+    Sliding window of field selector hits.
+    """
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE):
+        self.hits: deque[bool] = deque(maxlen=window_size)
+        self.state = BreakerState.CLOSED
+        self.opened_at: Optional[float] = None  # opening or last probe time
+        self.selector = ''
+
+    @property
+    def hit_rate(self) -> float:
+        if not self.hits:
+            return 1.0
+        return sum(self.hits) / len(self.hits)
+
+
+class ExtractionCircuitBreaker:
+    """
+    Trip field breaker when its selector hit rate collapses across many products.
+
+    Open breaker of required field fails scrapes before taking browser,
+    open breaker of optional field skips its extraction.
+    """
+
+    def __init__(
+        self,
+        required_fields: tuple[str, ...] = DEFAULT_REQUIRED_FIELDS,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        min_observations: int = DEFAULT_MIN_OBSERVATIONS,
+        min_hit_rate: float = DEFAULT_MIN_HIT_RATE,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        self.required_fields = required_fields
+        self.window_size = window_size
+        self.min_observations = min(min_observations, window_size)
+        self.min_hit_rate = min_hit_rate
+        self.cooldown = cooldown
+        self._fields: dict[str, FieldBreaker] = {}
+        self._lock = threading.Lock()  # scrapes are recorded from executor threads
+
+    def allow(self, field: str) -> bool:
+        """
+        Check that field should be extracted, open breaker turns half-open after cooldown.
+
+        Half-open breaker admits one probe, the next one is admitted only if the
+        probe has not reported during cooldown.
+        """
+        with self._lock:
+            breaker = self._fields.get(field)
+            if breaker is None or breaker.state == BreakerState.CLOSED:
+                return True
+            assert breaker.opened_at is not None
+            if time.monotonic() - breaker.opened_at < self.cooldown:
+                return False
+            breaker.state = BreakerState.HALF_OPEN
+            breaker.opened_at = time.monotonic()
+            logger.info(f'Probe extraction of field {field} after cooldown')
+            return True
+
+    def check(self):
+        """
+        Fail fast if extraction of some required field is broken.
+        """
+        for field in self.required_fields:
+            if not self.allow(field):
+                raise ExtractionBrokenError(
+                    f'Extraction of field {field} is broken, selector: {self._fields[field].selector}'
+                )
+
+    def record(self, hits: dict[str, bool], selectors: dict[str, str]):
+        """
+        Add extraction result of one product page.
+        """
+        # other fields are not evidence on not product page
+        if not hits.get('name', True):
+            hits = {'name': False}
+        with self._lock:
+            for field, hit in hits.items():
+                breaker = self._fields.setdefault(field, FieldBreaker(self.window_size))
+                breaker.selector = selectors.get(field, breaker.selector)
+                self._add_hit(field, breaker, hit)
+
+    def get_broken_selectors(self) -> dict[str, str]:
+        """
+        Get selectors of fields with not closed breaker.
+        """
+        with self._lock:
+            return {
+                field: breaker.selector
+                for field, breaker in self._fields.items()
+                if breaker.state != BreakerState.CLOSED
+            }
+
+    def _add_hit(self, field: str, breaker: FieldBreaker, hit: bool):
+        if breaker.state == BreakerState.HALF_OPEN:
+            if hit:
+                breaker.state = BreakerState.CLOSED
+                breaker.opened_at = None
+                breaker.hits.clear()
+                logger.info(f'Extraction of field {field} is restored')
+            else:
+                self._open(field, breaker)
+        elif breaker.state == BreakerState.CLOSED:
+            breaker.hits.append(hit)
+            if (
+                len(breaker.hits) >= self.min_observations
+                and breaker.hit_rate < self.min_hit_rate
+            ):
+                self._open(field, breaker)
+        metrics.set_gauge(f'provider.extraction.{field}.hit_rate', breaker.hit_rate)
+        metrics.set_gauge(
+            f'provider.extraction.{field}.open',
+            float(breaker.state != BreakerState.CLOSED),
+        )
+
+    @staticmethod
+    def _open(field: str, breaker: FieldBreaker):
+        breaker.state = BreakerState.OPEN
+        breaker.opened_at = time.monotonic()
+        logger.error(
+            f'Extraction of field {field} is broken with hit rate {breaker.hit_rate:.2f}, '
+            f'check selector: {breaker.selector}'
+        )
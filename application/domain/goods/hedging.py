@@ -0,0 +1,95 @@
+"""
+Hedging of slow product scrapes.
+"""
+import contextvars
+import math
+import threading
+from collections import deque
+from typing import Optional
+
+from common.errors import ApplicationError
+from common.metrics import metrics
+
+DEFAULT_PERCENTILE = 0.9
+DEFAULT_MAX_HEDGE_RATE = 0.1
+DEFAULT_DELAY = 30.0  # sec, used until enough latencies are observed
+HISTORY_SIZE = 200
+MIN_HISTORY_SIZE = 20
+
+HEDGE_LAUNCHED_METRIC = 'provider.hedge.launched'
+HEDGE_WON_METRIC = 'provider.hedge.won'
+
+# cancel event of current scrape attempt, copied into executor threads by async_wrapper
+cancel_event_var: contextvars.ContextVar[
+    Optional[threading.Event]
+] = contextvars.ContextVar('cancel_event', default=None)
+
+
+class ScrapeCancelledError(ApplicationError):
+    """
+    Scrape attempt lost the race and was cancelled.
+    """
+
+    default_message = 'Scrape attempt cancelled'
+
+
+def check_cancelled():
+    """
+    Stop sync scrape attempt in executor thread if its task was cancelled.
+    """
+    cancel_event = cancel_event_var.get()
+    if cancel_event is not None and cancel_event.is_set():
+        raise ScrapeCancelledError()
+
+
+class HedgePolicy:
+    """
+    Delay before launching hedge attempt and cap of hedged requests share.
+    """
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_PERCENTILE,
+        max_hedge_rate: float = DEFAULT_MAX_HEDGE_RATE,
+        default_delay: float = DEFAULT_DELAY,
+        history_size: int = HISTORY_SIZE,
+    ):
+        if not 0 < percentile < 1:
+            raise ValueError(f'Wrong hedge percentile: {percentile}')
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.default_delay = default_delay
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=history_size)
+        self._hedged: deque[bool] = deque(maxlen=history_size)
+
+    def get_delay(self) -> float:
+        with self._lock:
+            if len(self._latencies) < MIN_HISTORY_SIZE:
+                return self.default_delay
+            latencies = sorted(self._latencies)
+            index = min(
+                len(latencies) - 1, math.ceil(self.percentile * len(latencies)) - 1
+            )
+            return latencies[index]
+
+    def record_latency(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def acquire_hedge(self) -> bool:
+        """
+        Count request and check that one more hedge is under the rate cap.
+        """
+        with self._lock:
+            hedged_count = sum(self._hedged)
+            # budget of one hedge for short history
+            allowed = hedged_count < self.max_hedge_rate * len(self._hedged) + 1
+            self._hedged.append(allowed)
+        if allowed:
+            metrics.increment(HEDGE_LAUNCHED_METRIC)
+        return allowed
+
+    def record_request(self):
+        with self._lock:
+            self._hedged.append(False)
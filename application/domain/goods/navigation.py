@@ -0,0 +1,97 @@
+"""
+Online choice of product page navigation strategy.
+"""
+import random
+import threading
+from enum import Enum
+from typing import Optional
+
+from loguru import logger
+
+from common.metrics import metrics
+
+DEFAULT_EXPLORATION_RATE = 0.1
+DEFAULT_DECAY = 0.2  # weight of the newest observation
+MIN_SUCCESS_RATE = 0.01
+
+
+class NavigationStrategy(Enum):
+    URL = 'url'  # direct catalog search url
+    SEARCH_FIELD = 'search_field'  # typing goods id into search field
+
+
+class StrategyStats:
+    """
+    Exponentially weighted success rate and latency of strategy.
+    """
+
+    def __init__(self, decay: float = DEFAULT_DECAY):
+        self.decay = decay
+        self.attempts = 0
+        self.success_rate = 1.0
+        self.latency: Optional[float] = None
+
+    def add(self, success: bool, latency: float):
+        self.attempts += 1
+        self.success_rate += self.decay * (float(success) - self.success_rate)
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.decay * (latency - self.latency)
+
+    @property
+    def cost(self) -> float:
+        """
+        Expected time for getting product page.
+        """
+        return (self.latency or 0.0) / max(self.success_rate, MIN_SUCCESS_RATE)
+
+
+class NavigationStrategySelector:
+    """
+    Epsilon-greedy router of requests to the currently cheapest navigation strategy.
+    """
+
+    def __init__(
+        self,
+        strategies: tuple[NavigationStrategy, ...] = tuple(NavigationStrategy),
+        exploration_rate: float = DEFAULT_EXPLORATION_RATE,
+        decay: float = DEFAULT_DECAY,
+    ):
+        self.exploration_rate = exploration_rate
+        self._lock = threading.Lock()
+        self._stats = {strategy: StrategyStats(decay) for strategy in strategies}
+
+    def choose(self) -> NavigationStrategy:
+        with self._lock:
+            if unexplored := [
+                strategy
+                for strategy, stats in self._stats.items()
+                if stats.attempts == 0
+            ]:
+                return random.choice(unexplored)
+            if random.random() < self.exploration_rate:
+                return random.choice(list(self._stats))
+            return min(self._stats, key=lambda strategy: self._stats[strategy].cost)
+
+    def get_fallbacks(self, strategy: NavigationStrategy) -> list[NavigationStrategy]:
+        with self._lock:
+            return sorted(
+                (fallback for fallback in self._stats if fallback != strategy),
+                key=lambda fallback: self._stats[fallback].cost,
+            )
+
+    def record(self, strategy: NavigationStrategy, success: bool, latency: float):
+        with self._lock:
+            stats = self._stats[strategy]
+            stats.add(success, latency)
+            logger.debug(
+                f'Navigation strategy {strategy.value}: success rate {stats.success_rate:.2f}, '
+                f'latency {stats.latency:.2f}'
+            )
+            metrics.set_gauge(
+                f'provider.navigation.{strategy.value}.success_rate', stats.success_rate
+            )
+            metrics.set_gauge(
+                f'provider.navigation.{strategy.value}.latency', stats.latency or 0.0
+            )
@@ -0,0 +1,252 @@
+"""
+Staged batch scraping with bounded queues between stages.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Iterable, Optional, Sequence
+
+from loguru import logger
+from pydantic import HttpUrl
+
+from common.metrics import metrics
+from .entities import ProductEntity
+from .repositories import ProductSitemapRepository
+from .servicies import ProductInfoService
+from .types import GoodsID
+
+DEFAULT_RESOLVE_CONCURRENCY = 4
+DEFAULT_QUEUE_SIZE = 10
+DEFAULT_PERSIST_BATCH_SIZE = 20
+DEFAULT_PERSIST_BATCH_DELAY = 1.0  # sec, waiting of batch filling
+
+# stage handler gets item of its queue and returns items for the next stage queue
+StageHandler = Callable[..., Awaitable[Sequence[tuple]]]
+
+RESOLVE_STAGE = 'resolve'
+FETCH_STAGE = 'fetch'
+PARSE_STAGE = 'parse'
+PERSIST_STAGE = 'persist'
+PIPELINE_STAGES = (RESOLVE_STAGE, FETCH_STAGE, PARSE_STAGE, PERSIST_STAGE)
+
+
+class ScrapePipeline:
+    """
+    Resolve url -> fetch page snapshot -> parse -> persist, each stage with own concurrency.
+
+    Full queue of the next stage blocks the previous one, so slow browsers or db
+    hold back url resolving instead of piling up snapshots in memory.
+    Without snapshot extraction products are scraped from live page elements in
+    fetch stage and parse stage is skipped together with variants resolving.
+    Name and price of variants resolved from product page are merged into stored
+    products, the rest of variants are scraped after the main batch. Failed goods ids are passed to
+    failure handler for retrying later.
+    """
+
+    def __init__(
+        self,
+        product_info_service: ProductInfoService,
+        sitemap_repo: ProductSitemapRepository,
+        fetch_concurrency: int = 1,
+        parse_concurrency: int = 1,
+        resolve_concurrency: int = DEFAULT_RESOLVE_CONCURRENCY,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        persist_batch_size: int = DEFAULT_PERSIST_BATCH_SIZE,
+        persist_batch_delay: float = DEFAULT_PERSIST_BATCH_DELAY,
+        failure_handler: Optional[Callable[[GoodsID, str], Awaitable[None]]] = None,
+        has_snapshot_extraction: bool = True,
+    ):
+        self.product_info_service = product_info_service
+        self.product_provider = product_info_service.product_provider
+        self.sitemap_repo = sitemap_repo
+        self.concurrency = {
+            RESOLVE_STAGE: max(resolve_concurrency, 1),
+            FETCH_STAGE: max(fetch_concurrency, 1),
+            PARSE_STAGE: max(parse_concurrency, 1),
+        }
+        self.queue_size = queue_size
+        self.persist_batch_size = persist_batch_size
+        self.persist_batch_delay = persist_batch_delay
+        self.failure_handler = failure_handler
+        self.has_snapshot_extraction = has_snapshot_extraction
+        self._seen_goods_ids: set[GoodsID] = set()
+        self._pending_goods_ids: list[GoodsID] = []
+
+    async def run(
+        self, goods_ids: Iterable[GoodsID], has_results: bool = True
+    ) -> list[ProductEntity]:
+        """
+        Scrape and save goods, failed goods are logged and skipped.
+        """
+        queues: dict[str, asyncio.Queue] = {
+            stage: asyncio.Queue(maxsize=self.queue_size) for stage in PIPELINE_STAGES
+        }
+        results: Optional[list[ProductEntity]] = [] if has_results else None
+        handlers: dict[str, StageHandler] = (
+            {
+                RESOLVE_STAGE: self._resolve,
+                FETCH_STAGE: self._fetch,
+                PARSE_STAGE: self._parse,
+            }
+            if self.has_snapshot_extraction
+            else {RESOLVE_STAGE: self._resolve, FETCH_STAGE: self._scrape}
+        )
+        stages = [*handlers, PERSIST_STAGE]
+        workers = [
+            asyncio.create_task(
+                self._stage_worker(
+                    stage,
+                    handler,
+                    queues[stage],
+                    queues[stages[stages.index(stage) + 1]],
+                )
+            )
+            for stage, handler in handlers.items()
+            for _ in range(self.concurrency[stage])
+        ]
+        workers.append(
+            asyncio.create_task(self._persist_worker(queues[PERSIST_STAGE], results))
+        )
+        self._seen_goods_ids = set()
+        self._pending_goods_ids = []
+        try:
+            await self._feed(goods_ids, queues)
+            while self._pending_goods_ids:  # fed after drain, stages never feed back
+                pending_goods_ids, self._pending_goods_ids = self._pending_goods_ids, []
+                await self._feed(pending_goods_ids, queues)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._record_queues(queues)
+        return results or []
+
+    async def _feed(
+        self, goods_ids: Iterable[GoodsID], queues: dict[str, asyncio.Queue]
+    ):
+        for goods_id in goods_ids:
+            if goods_id in self._seen_goods_ids:
+                continue
+            self._seen_goods_ids.add(goods_id)
+            await queues[RESOLVE_STAGE].put((goods_id,))
+            self._record_queues(queues)
+        for stage in PIPELINE_STAGES:  # items move only forward, stages drain in order
+            await queues[stage].join()
+
+    async def _resolve(
+        self, goods_id: GoodsID
+    ) -> list[tuple[GoodsID, Optional[HttpUrl]]]:
+        entry = await self.sitemap_repo.find_by_goods_id(goods_id)
+        return [(goods_id, entry.url if entry else None)]
+
+    async def _fetch(
+        self, goods_id: GoodsID, url: Optional[HttpUrl]
+    ) -> list[tuple[GoodsID, dict]]:
+        snapshot = await self.product_provider.fetch_product_snapshot(goods_id, url)
+        return [(goods_id, snapshot)]
+
+    async def _scrape(
+        self, goods_id: GoodsID, url: Optional[HttpUrl]
+    ) -> list[tuple[ProductEntity]]:
+        product = await self.product_provider.get_product(goods_id)
+        return [(product,)]
+
+    async def _parse(
+        self, goods_id: GoodsID, snapshot: dict
+    ) -> list[tuple[ProductEntity]]:
+        product = await self.product_provider.parse_product_snapshot(goods_id, snapshot)
+        variants = self.product_provider.get_product_variants(product, snapshot)
+        resolved_products = [
+            variant
+            for variant in variants.products
+            if variant.goods_id not in self._seen_goods_ids
+        ]
+        unstored_goods_ids = await self.product_info_service.merge_variants(
+            resolved_products
+        )
+        self._seen_goods_ids.update(
+            variant.goods_id
+            for variant in resolved_products
+            if variant.goods_id not in unstored_goods_ids
+        )
+        self._pending_goods_ids.extend(unstored_goods_ids)
+        self._pending_goods_ids.extend(variants.pending_goods_ids)
+        return [(product,)]
+
+    async def _stage_worker(
+        self,
+        stage: str,
+        handler: StageHandler,
+        source: asyncio.Queue,
+        target: asyncio.Queue,
+    ):
+        while True:
+            item = await source.get()
+            try:
+                started_at = time.monotonic()
+                results = await handler(*item)
+                metrics.observe(
+                    f'pipeline.{stage}.duration', time.monotonic() - started_at
+                )
+                for result in results:
+                    await target.put(result)
+            except Exception as err:
+                await self._record_failure(stage, item[0], err)
+            finally:
+                source.task_done()
+
+    async def _persist_worker(
+        self, source: asyncio.Queue, results: Optional[list[ProductEntity]]
+    ):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [(await source.get())[0]]
+            deadline = loop.time() + self.persist_batch_delay
+            while len(batch) < self.persist_batch_size:
+                try:
+                    (product,) = await asyncio.wait_for(
+                        source.get(), timeout=max(deadline - loop.time(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    break
+                batch.append(product)
+            try:
+                started_at = time.monotonic()
+                saved_products = await self._persist(batch)
+                metrics.observe(
+                    f'pipeline.{PERSIST_STAGE}.duration', time.monotonic() - started_at
+                )
+                if results is not None:
+                    results.extend(saved_products)
+            finally:
+                for _ in batch:
+                    source.task_done()
+
+    async def _persist(self, products: list[ProductEntity]) -> list[ProductEntity]:
+        try:
+            return await self.product_info_service.save_products(products)
+        except Exception as err:  # one broken product should not lose the whole batch
+            logger.warning(f'Pipeline batch saving failed, save one by one: {err}')
+        saved_products = []
+        for product in products:
+            try:
+                saved_products.extend(
+                    await self.product_info_service.save_products([product])
+                )
+            except Exception as err:
+                await self._record_failure(PERSIST_STAGE, product.goods_id, err)
+        return saved_products
+
+    async def _record_failure(self, stage: str, goods_id: GoodsID, error: Exception):
+        metrics.increment(f'pipeline.{stage}.failed')
+        logger.warning(f'Pipeline {stage} stage failed for {goods_id}: {error}')
+        if self.failure_handler is None:
+            return
+        try:
+            await self.failure_handler(goods_id, str(error) or type(error).__name__)
+        except Exception as err:
+            logger.warning(f'Cannot record failure of goods id {goods_id}: {err}')
+
+    @staticmethod
+    def _record_queues(queues: dict[str, asyncio.Queue]):
+        for stage, queue in queues.items():
+            metrics.set_gauge(f'pipeline.{stage}.queue', queue.qsize())
@@ -1,12 +1,16 @@
 """
 Providers base entities.
 """
+import asyncio
 import datetime
 import itertools
 import os
+import re
+import threading
 import time
 import urllib.parse
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import Executor
 from contextlib import contextmanager
 from functools import lru_cache
 from decimal import Decimal
@@ -18,18 +22,50 @@ from urllib.parse import urlparse
 from loguru import logger
 from pydantic import HttpUrl, parse_obj_as
 from pydantic import ValidationError
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 
-from clients.parser import BaseParser, ParserPool, By
+from clients.parser import (
+    BaseParser,
+    BlockedPageError,
+    ParserPool,
+    By,
+    Locator,
+    Locators,
+    SnapshotFields,
+    record_page_performance,
+)
 from common.errors import ProviderError
-from common.utils import async_wrapper, retry_by_exception
-from .entities import ProductEntity, ProductAttribute, ProductImage, ProductCategory
-from .types import GoodsID, ProductName
+from common.metrics import metrics
+from common.utils import async_wrapper, retry_by_exception, run_in_process
+from .entities import (
+    ProductEntity,
+    ProductAttribute,
+    ProductImage,
+    ProductCategory,
+    ProductVariants,
+)
+from .extraction import ExtractionBrokenError, ExtractionCircuitBreaker
+from .hedging import (
+    HEDGE_WON_METRIC,
+    HedgePolicy,
+    cancel_event_var,
+    check_cancelled,
+)
+from .navigation import NavigationStrategy, NavigationStrategySelector
+from .selectors import SelectorRanking
+from .timings import (
+    ACQUIRE_STAGE,
+    EXTRACT_STAGE,
+    NAVIGATE_STAGE,
+    READINESS_STAGE,
+    measure_stage,
+)
+from .types import GoodsID, ProductField, ProductName
 from ..types import Provider
 
 
 MAX_TRIES = 3
+DEFAULT_READY_TIMEOUT = 10  # sec
 
 
 class ProductProvider(Provider):
@@ -41,10 +77,44 @@ class ProductProvider(Provider):
 
     @abstractmethod
     async def get_product(
-        self, goods_id: GoodsID, raw_data: Optional[bytes] = None
+        self,
+        goods_id: GoodsID,
+        raw_data: Optional[bytes] = None,
+        hedged: bool = False,
+        fields: Optional[set[ProductField]] = None,
     ) -> ProductEntity:
         """
-        Get product data entity by goods id.
+        Get product data entity by goods id, only given fields are filled if they are set.
+        """
+
+    @abstractmethod
+    async def fetch_product_snapshot(
+        self, goods_id: GoodsID, url: Optional[HttpUrl] = None
+    ) -> dict:
+        """
+        Capture product page data, product page url is searched if absent.
+        """
+
+    @abstractmethod
+    async def parse_product_snapshot(
+        self, goods_id: GoodsID, snapshot: dict
+    ) -> ProductEntity:
+        """
+        Get product data entity from captured page data.
+        """
+
+    @abstractmethod
+    def get_product_variants(
+        self, product: ProductEntity, snapshot: dict
+    ) -> ProductVariants:
+        """
+        Get variants of product listed on its page.
+        """
+
+    @abstractmethod
+    def get_goods_id(self, url: str) -> Optional[GoodsID]:
+        """
+        Get goods id from product page url, None for not product pages.
         """
 
 
@@ -53,50 +123,525 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
     ProductProvider interface class for sbermegamarket.
     """
 
-    product_name_path: dict[By, str] = {
-        By.CLASS_NAME: 'pdp-header__title',
-    }
-    product_description_path: dict[By, str] = {By.CLASS_NAME: 'product-description'}
-    product_price_path: dict[By, str] = {By.CLASS_NAME: 'pdp-sales-block__price-final'}
-    product_images_path: dict[By, str] = {
-        By.CLASS_NAME: 'slide__image',
+    product_name_path: Locators = [
+        (By.CLASS_NAME, 'pdp-header__title'),
+        (By.XPATH, '//h1[@itemprop="name"]'),
+    ]
+    product_description_path: Locators = [(By.CLASS_NAME, 'product-description')]
+    product_price_path: Locators = [(By.CLASS_NAME, 'pdp-sales-block__price-final')]
+    product_images_path: Locators = [
+        (By.CLASS_NAME, 'slide__image'),
+    ]
+    product_specs_names_path: Locators = [(By.CLASS_NAME, 'pdp-specs__item-name')]
+    product_specs_values_path: Locators = [(By.CLASS_NAME, 'pdp-specs__item-value')]
+    product_categories_path: Locators = [(By.CLASS_NAME, 'breadcrumb-item')]
+    product_variants_path: Locators = [(By.CLASS_NAME, 'pdp-variations__item')]
+
+    snapshot_fields_by_product_field: dict[ProductField, tuple[str, ...]] = {
+        ProductField.NAME: ('name',),
+        ProductField.PRICE: ('price',),
+        ProductField.CATEGORIES: ('categories',),
+        ProductField.IMAGES: ('images',),
+        ProductField.ATTRIBUTES: ('specs_names', 'specs_values'),
     }
-    product_specs_names_path: dict[By, str] = {By.CLASS_NAME: 'pdp-specs__item-name'}
-    product_specs_values_path: dict[By, str] = {By.CLASS_NAME: 'pdp-specs__item-value'}
-    product_categories_path: dict[By, str] = {By.CLASS_NAME: 'breadcrumb-item'}
+
+    product_url_pattern = re.compile(
+        r'/catalog/details/(?:[^/]*-)?(?P<goods_id>\d+)(?:_\d+)?/?$'
+    )
+    variant_price_pattern = re.compile(r'(?P<price>\d[\d\s]*)\s*₽')
 
     def __init__(
-        self, parser_pool: ParserPool, base_url: HttpUrl, debug: bool = False
+        self,
+        parser_pool: ParserPool,
+        base_url: HttpUrl,
+        debug: bool = False,
+        hedge_policy: Optional[HedgePolicy] = None,
+        has_snapshot_extraction: bool = False,
+        parse_executor: Optional[Executor] = None,
+        ready_timeout: float = DEFAULT_READY_TIMEOUT,
+        extraction_breaker: Optional[ExtractionCircuitBreaker] = None,
+        selector_ranking: Optional[SelectorRanking] = None,
+        has_variant_extraction: bool = False,
     ) -> None:
         self.parser_pool = parser_pool
         self.base_url = base_url
         self.debug = debug
+        self.hedge_policy = hedge_policy
+        self.has_snapshot_extraction = has_snapshot_extraction
+        self.parse_executor = parse_executor
+        self.ready_timeout = ready_timeout
+        self.extraction_breaker = extraction_breaker
+        self.selector_ranking = selector_ranking
+        self.has_variant_extraction = has_variant_extraction
 
     async def get_product(
-        self, goods_id: GoodsID, raw_data: Optional[bytes] = None
+        self,
+        goods_id: GoodsID,
+        raw_data: Optional[bytes] = None,
+        hedged: bool = False,
+        fields: Optional[set[ProductField]] = None,
+    ) -> ProductEntity:
+        """
+        Get product entity by goods id, slow scrape could be hedged by second attempt.
+
+        Waits and extraction of product fields absent in fields are skipped.
+        """
+        if hedged and self.hedge_policy and not raw_data:
+            return await self._get_product_hedged(goods_id, fields)
+        return await self._get_product_with_retries(goods_id, raw_data, fields)
+
+    async def _get_product_with_retries(
+        self,
+        goods_id: GoodsID,
+        raw_data: Optional[bytes] = None,
+        fields: Optional[set[ProductField]] = None,
+        has_latency: bool = True,
+    ) -> ProductEntity:
+        started_at = time.monotonic()
+        with self._fail_fast(goods_id):
+            product = await retry_by_exception(
+                exceptions=ProviderError, max_tries=MAX_TRIES
+            )(self._scrape_product)(goods_id, raw_data, fields)
+        if has_latency and not raw_data:
+            self._record_latency(started_at, fields)
+        return product
+
+    def _record_latency(
+        self, started_at: float, fields: Optional[set[ProductField]] = None
+    ):
+        if self.hedge_policy and not fields:  # partial scrapes are faster
+            self.hedge_policy.record_latency(time.monotonic() - started_at)
+
+    async def fetch_product_snapshot(
+        self, goods_id: GoodsID, url: Optional[HttpUrl] = None
+    ) -> dict:
+        """
+        Capture product page data, browser is leased only for this call.
+        """
+        pull_product_snapshot = (
+            self._pull_product_snapshot_async
+            if url and self.parser_pool.has_async_parsers
+            else async_wrapper(self._pull_product_snapshot)
+        )
+        with self._fail_fast(goods_id):
+            return await retry_by_exception(
+                exceptions=ProviderError, max_tries=MAX_TRIES
+            )(pull_product_snapshot)(goods_id, url=url)
+
+    async def parse_product_snapshot(
+        self, goods_id: GoodsID, snapshot: dict
+    ) -> ProductEntity:
+        """
+        Get product entity from captured page data in worker pool.
+        """
+        with measure_stage(EXTRACT_STAGE):
+            if self.parse_executor is None:
+                return self._parse_product_snapshot(goods_id, snapshot)
+            return await run_in_process(
+                type(self)._parse_product_snapshot,
+                goods_id,
+                snapshot,
+                executor=self.parse_executor,
+            )
+
+    @staticmethod
+    @contextmanager
+    def _fail_fast(goods_id: GoodsID) -> Generator[None, None, None]:
+        try:
+            yield
+        except BlockedPageError as err:  # fast fail without retries on blocked session
+            logger.warning(f'Get blocked page for goods id {goods_id}: {err}')
+            raise ProviderError(
+                f'Marketplace blocked request for goods id: {goods_id}'
+            ) from err
+        except ExtractionBrokenError as err:  # fast fail without taking browser
+            logger.warning(f'Skip scrape for goods id {goods_id}: {err}')
+            raise ProviderError(str(err)) from err
+
+    async def _get_product_attempt(
+        self,
+        goods_id: GoodsID,
+        cancel_event: threading.Event,
+        fields: Optional[set[ProductField]] = None,
+    ) -> ProductEntity:
+        cancel_event_var.set(cancel_event)  # task has own context copy
+        return await self._get_product_with_retries(
+            goods_id, fields=fields, has_latency=False
+        )
+
+    async def _get_product_hedged(
+        self, goods_id: GoodsID, fields: Optional[set[ProductField]] = None
     ) -> ProductEntity:
         """
-        Get product entity by goods id.
+        Launch second attempt on spare browser if first one is slower than usual.
         """
-        return await retry_by_exception(exceptions=ProviderError, max_tries=MAX_TRIES)(
-            async_wrapper(self._get_product)
-        )(goods_id, raw_data)
+        assert self.hedge_policy is not None
+        started_at = time.monotonic()
+        cancel_event = threading.Event()
+        primary = asyncio.create_task(
+            self._get_product_attempt(goods_id, cancel_event, fields)
+        )
+        attempts = {primary: cancel_event}
+        try:
+            done, _ = await asyncio.wait(
+                {primary}, timeout=self.hedge_policy.get_delay()
+            )
+            if done or not self.parser_pool.available:
+                self.hedge_policy.record_request()
+                product = await primary
+                self._record_latency(started_at, fields)
+                return product
+            if not self.hedge_policy.acquire_hedge():
+                product = await primary
+                self._record_latency(started_at, fields)
+                return product
+
+            logger.info(f'Launch hedge scrape for goods id {goods_id}')
+            hedge_cancel_event = threading.Event()
+            hedge = asyncio.create_task(
+                self._get_product_attempt(goods_id, hedge_cancel_event, fields)
+            )
+            attempts[hedge] = hedge_cancel_event
+
+            error: Optional[BaseException] = None
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if (task_error := task.exception()) is None:
+                        if task is hedge:
+                            metrics.increment(HEDGE_WON_METRIC)
+                        # elapsed from first dispatch, censored latency of cancelled primary
+                        self._record_latency(started_at, fields)
+                        return task.result()
+                    error = error or task_error
+            assert error is not None
+            raise error
+        finally:
+            for task, task_cancel_event in attempts.items():
+                if not task.done():
+                    task_cancel_event.set()  # stop sync part in executor thread
+                    task.cancel()
+
+    def get_product_variants(
+        self, product: ProductEntity, snapshot: dict
+    ) -> ProductVariants:
+        """
+        Get entities of variants resolved from product page and goods ids of the rest.
+
+        Resolved variant has only name and price of its card, it shares categories
+        with product and its images and attributes are left for own page load.
+        """
+        variants = ProductVariants()
+        seen_goods_ids = {product.goods_id}
+        for element in self._get_snapshot_elements(snapshot, 'variants'):
+            goods_id = self.get_goods_id(element.get('href') or '')
+            if not goods_id or goods_id in seen_goods_ids:
+                continue
+            seen_goods_ids.add(goods_id)
+            name = element.get('title') or ''
+            price_match = self.variant_price_pattern.search(element['text'])
+            if not name or not price_match:
+                variants.pending_goods_ids.append(goods_id)
+                continue
+            try:
+                variants.products.append(
+                    self._make_product_entity(
+                        goods_id=goods_id,
+                        name=ProductName(name),
+                        description='',
+                        price=self._parse_price(price_match.group('price')),
+                        images=[],
+                        specifications=[],
+                        categories=product.categories,
+                    )
+                )
+            except ProviderError:
+                variants.pending_goods_ids.append(goods_id)
+        if variants.products or variants.pending_goods_ids:
+            logger.info(
+                f'Get {len(variants.products)} resolved and {len(variants.pending_goods_ids)} '
+                f'pending variants of goods id {product.goods_id}'
+            )
+        return variants
+
+    def get_goods_id(self, url: str) -> Optional[GoodsID]:
+        """
+        Get goods id from product page url.
+        """
+        if match := self.product_url_pattern.search(urlparse(url).path):
+            return GoodsID(match.group('goods_id'))
+        return None
+
+    async def _scrape_product(
+        self,
+        goods_id: GoodsID,
+        raw_data: Optional[bytes] = None,
+        fields: Optional[set[ProductField]] = None,
+    ) -> ProductEntity:
+        """
+        Get product entity by goods id from page snapshot or by live page elements.
+
+        Browser is released right after snapshot capture, snapshot is parsed in worker pool.
+        """
+        if not self.has_snapshot_extraction:
+            return await async_wrapper(self._get_product)(goods_id, raw_data, fields)
+
+        snapshot = await async_wrapper(self._pull_product_snapshot)(
+            goods_id, raw_data, fields=fields
+        )
+        check_cancelled()
+        return await self.parse_product_snapshot(goods_id, snapshot)
 
     def _get_product(
-        self, goods_id: GoodsID, raw_data: Optional[bytes] = None
+        self,
+        goods_id: GoodsID,
+        raw_data: Optional[bytes] = None,
+        fields: Optional[set[ProductField]] = None,
     ) -> ProductEntity:
         """
         Get product entity by goods id sync version.
         """
         if raw_data:
-            return self._parse_raw_product_data(goods_id, raw_data)
-        return self._pull_product_data(goods_id)
+            return self._parse_raw_product_data(goods_id, raw_data, fields)
+        return self._pull_product_data(goods_id, fields)
+
+    def _pull_product_snapshot(
+        self,
+        goods_id: GoodsID,
+        raw_data: Optional[bytes] = None,
+        url: Optional[HttpUrl] = None,
+        fields: Optional[set[ProductField]] = None,
+    ) -> dict:
+        """
+        Capture product page data sync version.
+        """
+        if not raw_data:
+            self._check_extraction()
+        with self._get_parser() as parser:
+            with measure_stage(NAVIGATE_STAGE):
+                if raw_data:
+                    self._open_raw_product_page(raw_data, parser)
+                elif url:
+                    parser.navigate(url, ready_paths=self.product_name_path)
+                else:
+                    self._open_product_page(goods_id, parser)
+            check_cancelled()
+            with measure_stage(READINESS_STAGE):
+                parser.wait_ready(
+                    self._get_ready_paths(fields), timeout=self.ready_timeout
+                )
+            logger.info(f'Capture snapshot for product with goods id: {goods_id}')
+            checked_fields, captured_fields = self._get_captured_fields(fields)
+            with measure_stage(EXTRACT_STAGE):
+                snapshot = parser.capture(captured_fields)
+        self._record_snapshot(snapshot, checked_fields, captured_fields)
+        return snapshot
+
+    async def _pull_product_snapshot_async(
+        self,
+        goods_id: GoodsID,
+        url: HttpUrl,
+        fields: Optional[set[ProductField]] = None,
+    ) -> dict:
+        """
+        Capture product page data by parser awaited on event loop, browser is only leased in thread.
+        """
+        self._check_extraction()
+        with measure_stage(ACQUIRE_STAGE):
+            parser = await async_wrapper(self.parser_pool.get)()
+        try:
+            with measure_stage(NAVIGATE_STAGE):
+                await parser.navigate_async(url, ready_paths=self.product_name_path)
+            check_cancelled()
+            with measure_stage(READINESS_STAGE):
+                await parser.wait_ready_async(
+                    self._get_ready_paths(fields), timeout=self.ready_timeout
+                )
+            logger.info(f'Capture snapshot for product with goods id: {goods_id}')
+            checked_fields, captured_fields = self._get_captured_fields(fields)
+            with measure_stage(EXTRACT_STAGE):
+                snapshot = await parser.capture_async(captured_fields)
+        finally:
+            await async_wrapper(self.parser_pool.put)(parser)
+        self._record_snapshot(snapshot, checked_fields, captured_fields)
+        return snapshot
+
+    def _get_ready_paths(
+        self, fields: Optional[set[ProductField]] = None
+    ) -> list[Locators]:
+        return [self.product_name_path] + (
+            [self.product_price_path]
+            if not fields or ProductField.PRICE in fields
+            else []
+        )
+
+    def _get_captured_fields(
+        self, fields: Optional[set[ProductField]] = None
+    ) -> tuple[SnapshotFields, SnapshotFields]:
+        """
+        Get fields checked by extraction breaker and all captured fields.
+        """
+        snapshot_fields = self._get_snapshot_field_names(fields)
+        checked_fields = {
+            field: field_data
+            for field, field_data in self._get_snapshot_fields().items()
+            if field in snapshot_fields and self._is_field_allowed(field)
+        }
+        captured_fields = dict(checked_fields)
+        if self.has_variant_extraction and not fields:  # not checked by breaker
+            captured_fields['variants'] = (
+                self._order_selectors('variants', self.product_variants_path),
+                ('href', 'title'),
+            )
+        return checked_fields, captured_fields
+
+    def _record_snapshot(
+        self,
+        snapshot: dict,
+        checked_fields: SnapshotFields,
+        captured_fields: SnapshotFields,
+    ):
+        record_page_performance(snapshot.get('performance'))
+        for field, (locators, _) in captured_fields.items():
+            self._record_selectors(
+                field, locators, (snapshot['fields'].get(field) or {}).get('locator')
+            )
+        self._record_extraction(
+            {
+                field: bool(self._get_snapshot_elements(snapshot, field))
+                for field in checked_fields
+            }
+        )
+
+    def _get_snapshot_field_names(
+        self, fields: Optional[set[ProductField]] = None
+    ) -> set[str]:
+        if not fields:
+            return set(self._get_snapshot_fields())
+        return {
+            snapshot_field
+            for field in fields
+            for snapshot_field in self.snapshot_fields_by_product_field[field]
+        }
+
+    def _check_extraction(self):
+        if self.extraction_breaker:
+            self.extraction_breaker.check()
+
+    def _is_field_allowed(self, field: str) -> bool:
+        return not self.extraction_breaker or self.extraction_breaker.allow(field)
+
+    def _record_extraction(self, hits: dict[str, bool]):
+        if not self.extraction_breaker:
+            return
+        self.extraction_breaker.record(
+            hits,
+            selectors={
+                field: ', '.join(
+                    SelectorRanking.get_key(locator) for locator in locators
+                )
+                for field, (locators, _) in self._get_snapshot_fields().items()
+            },
+        )
+
+    def _order_selectors(self, field: str, locators: Locators) -> Locators:
+        if not self.selector_ranking:
+            return locators
+        return self.selector_ranking.order(field, locators)
+
+    def _record_selectors(
+        self, field: str, locators: Locators, hit_index: Optional[int]
+    ):
+        if self.selector_ranking:
+            self.selector_ranking.record(field, locators, hit_index)
+
+    def _get_snapshot_fields(self) -> SnapshotFields:
+        return {
+            field: (self._order_selectors(field, locators), properties)
+            for field, (locators, properties) in {
+                'name': (self.product_name_path, ()),
+                'description': (self.product_description_path, ()),
+                'price': (self.product_price_path, ()),
+                'images': (self.product_images_path, ('src', 'alt')),
+                'specs_names': (self.product_specs_names_path, ()),
+                'specs_values': (self.product_specs_values_path, ()),
+                'categories': (self.product_categories_path, ()),
+            }.items()
+        }
+
+    @staticmethod
+    def _get_snapshot_elements(snapshot: dict, field: str) -> list[dict]:
+        return (snapshot['fields'].get(field) or {}).get('elements') or []
+
+    @classmethod
+    def _parse_product_snapshot(
+        cls, goods_id: GoodsID, snapshot: dict
+    ) -> ProductEntity:
+        """
+        Get product entity from captured page data, could be run in other process.
+        """
+        names = [
+            element['text'] for element in cls._get_snapshot_elements(snapshot, 'name')
+        ]
+        descriptions = [
+            element['text']
+            for element in cls._get_snapshot_elements(snapshot, 'description')
+        ]
+        prices = [
+            element['text'] for element in cls._get_snapshot_elements(snapshot, 'price')
+        ]
+        images = [
+            ProductImage(name=element.get('alt') or '', url=element['src'])
+            for element in cls._get_snapshot_elements(snapshot, 'images')
+            if element.get('src')
+        ]
+        specs_names = [
+            element['text']
+            for element in cls._get_snapshot_elements(snapshot, 'specs_names')
+        ]
+        specs_values = [
+            element['text']
+            for element in cls._get_snapshot_elements(snapshot, 'specs_values')
+        ]
+        specifications = (
+            [
+                ProductAttribute(name=key, value=value)
+                for key, value in itertools.zip_longest(
+                    specs_names, specs_values, fillvalue=''
+                )
+                if key
+            ]
+            if specs_names and specs_values
+            else []
+        )
+        categories = [
+            ProductCategory(name=element['text'])
+            for element in cls._get_snapshot_elements(snapshot, 'categories')
+            if element['text']
+        ]
+
+        product = cls._make_product_entity(
+            goods_id=goods_id,
+            name=ProductName(names[0] if names else ''),
+            description=descriptions[0] if descriptions else '',
+            price=cls._parse_price(prices[0]) if prices else Decimal('0'),
+            images=images,
+            specifications=specifications,
+            categories=categories[:-1],
+        )
+        if product.is_empty:
+            raise ProviderError(f'Product data for goods id: {goods_id} is empty')
+        return product
 
     @contextmanager
     def _get_parser(self) -> Generator[BaseParser, None, None]:
-        try:
+        with measure_stage(ACQUIRE_STAGE):
             parser = self.parser_pool.get()
-            assert parser.client is not None
+        try:
+            assert parser.is_inited
             yield parser
         finally:
             self.parser_pool.put(parser)
@@ -125,48 +670,106 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
         )
 
     def _parse_raw_product_data(
-        self, goods_id: GoodsID, raw_data: bytes
+        self,
+        goods_id: GoodsID,
+        raw_data: bytes,
+        fields: Optional[set[ProductField]] = None,
     ) -> ProductEntity:
         """
         Get product data entity from raw html data sync version
         """
-        file_path = self._save_data_to_file(raw_data)
         with self._get_parser() as parser:
-            parser.get_page(HttpUrl(file_path.as_uri()))
+            with measure_stage(NAVIGATE_STAGE):
+                self._open_raw_product_page(raw_data, parser)
             logger.info(
                 f'Start getting info for product with goods id: {goods_id} from raw data'
             )
-            return self._get_current_product_entity(goods_id, parser)
+            with measure_stage(EXTRACT_STAGE):
+                return self._get_current_product_entity(goods_id, parser, fields)
 
-    def _pull_product_data(self, goods_id: GoodsID) -> ProductEntity:
+    def _pull_product_data(
+        self, goods_id: GoodsID, fields: Optional[set[ProductField]] = None
+    ) -> ProductEntity:
         """
         Get product entity by goods id sync version.
         """
+        self._check_extraction()
         with self._get_parser() as parser:
-            product_data_url = self._get_product_page(goods_id, parser)
-            if parser.client.current_url != product_data_url:  # type: ignore[union-attr]
-                parser.get_page(product_data_url)
-
+            with measure_stage(NAVIGATE_STAGE):
+                self._open_product_page(goods_id, parser)
             logger.info(f'Start getting info for product with goods id: {goods_id}')
-            return self._get_current_product_entity(goods_id, parser)
+            with measure_stage(EXTRACT_STAGE):
+                return self._get_current_product_entity(goods_id, parser, fields)
+
+    def _open_raw_product_page(self, raw_data: bytes, parser: BaseParser):
+        file_path = self._save_data_to_file(raw_data)
+        parser.get_page(HttpUrl(file_path.as_uri()))
+
+    def _open_product_page(self, goods_id: GoodsID, parser: BaseParser):
+        check_cancelled()
+        product_data_url = self._get_product_page(goods_id, parser)
+        if parser.current_url != product_data_url:
+            check_cancelled()
+            parser.navigate(product_data_url, ready_paths=self.product_name_path)
 
     def _get_current_product_entity(
-        self, goods_id: GoodsID, parser: BaseParser
+        self,
+        goods_id: GoodsID,
+        parser: BaseParser,
+        fields: Optional[set[ProductField]] = None,
     ) -> ProductEntity:
         """
         Get product entity by goods id sync version.
         """
-        logger.info(
-            f'Start getting info for product from uri: {parser.client.current_url}'  # type: ignore[union-attr]
-        )
+        logger.info(f'Start getting info for product from uri: {parser.current_url}')
 
         # TODO: get goods_id from page instead kwarg
-        name = self._get_product_name(parser)
-        description = self._get_product_description(parser)
-        price = self._get_product_price(parser)
-        images = self._get_product_images(parser)
-        specifications = self._get_product_specifications(parser)
-        categories = self._get_product_categories(parser)
+        snapshot_fields = {
+            field
+            for field in self._get_snapshot_field_names(fields)
+            if self._is_field_allowed(field)
+        }
+        check_cancelled()
+        name = (
+            self._get_product_name(parser)
+            if 'name' in snapshot_fields
+            else ProductName('')
+        )
+        description = (
+            self._get_product_description(parser)
+            if 'description' in snapshot_fields
+            else ''
+        )
+        check_cancelled()
+        price = (
+            self._get_product_price(parser)
+            if 'price' in snapshot_fields
+            else Decimal('0')
+        )
+        images = self._get_product_images(parser) if 'images' in snapshot_fields else []
+        check_cancelled()
+        specifications = (
+            self._get_product_specifications(parser)
+            if {'specs_names', 'specs_values'} <= snapshot_fields
+            else []
+        )
+        categories = (
+            self._get_product_categories(parser)
+            if 'categories' in snapshot_fields
+            else []
+        )
+        hits = {
+            'name': bool(name),
+            'description': bool(description),
+            'price': bool(price),
+            'images': bool(images),
+            'specs_names': bool(specifications),
+            'specs_values': bool(specifications),
+            'categories': bool(categories),
+        }
+        self._record_extraction(
+            {field: hit for field, hit in hits.items() if field in snapshot_fields}
+        )
 
         product = self._make_product_entity(
             goods_id=goods_id,
@@ -222,13 +825,15 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
         )
         return product
 
-    @staticmethod
     def _get_elements_data(
-        path_dict: dict[By, str], parser: BaseParser
+        self, field: str, locators: Locators, parser: BaseParser
     ) -> list[WebElement]:
-        for key, value in path_dict.items():
+        locators = self._order_selectors(field, locators)
+        for index, (key, value) in enumerate(locators):
             if data := parser.get_elements(by=key, name=value):
+                self._record_selectors(field, locators, index)
                 return data
+        self._record_selectors(field, locators, None)
         return []
 
     def _get_product_page(self, goods_id: GoodsID, parser: BaseParser) -> HttpUrl:
@@ -245,7 +850,7 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
         """
         Get product name.
         """
-        if name_data := self._get_elements_data(self.product_name_path, parser):
+        if name_data := self._get_elements_data('name', self.product_name_path, parser):
             return ProductName(name_data[0].text)
         return ProductName('')
 
@@ -254,7 +859,7 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
         Get product description.
         """
         if description_data := self._get_elements_data(
-            self.product_description_path, parser
+            'description', self.product_description_path, parser
         ):
             return description_data[0].text
         return ''
@@ -263,16 +868,24 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
         """
         Get product description.
         """
-        if price_data := self._get_elements_data(self.product_price_path, parser):
-            price = price_data[0].text.replace(' ', '').replace('₽', '')
-            return Decimal(price) if price else Decimal('0')
+        if price_data := self._get_elements_data(
+            'price', self.product_price_path, parser
+        ):
+            return self._parse_price(price_data[0].text)
         return Decimal('0')
 
+    @staticmethod
+    def _parse_price(price_text: str) -> Decimal:
+        price = price_text.replace(' ', '').replace('₽', '')
+        return Decimal(price) if price else Decimal('0')
+
     def _get_product_images(self, parser: BaseParser) -> list[ProductImage]:
         """
         Get product images.
         """
-        if images_data := self._get_elements_data(self.product_images_path, parser):
+        if images_data := self._get_elements_data(
+            'images', self.product_images_path, parser
+        ):
             images = [
                 ProductImage(name=img.get_property('alt'), url=img.get_property('src'))
                 for img in images_data
@@ -287,13 +900,13 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
         """
         if not (
             specs_names := self._get_elements_data(
-                self.product_specs_names_path, parser
+                'specs_names', self.product_specs_names_path, parser
             )
         ):
             return []
         if not (
             specs_values := self._get_elements_data(
-                self.product_specs_values_path, parser
+                'specs_values', self.product_specs_values_path, parser
             )
         ):
             return []
@@ -312,7 +925,7 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
         Get product metadata.
         """
         if categories_data := self._get_elements_data(
-            self.product_categories_path, parser
+            'categories', self.product_categories_path, parser
         ):
             categories = [
                 ProductCategory(name=category.text)
@@ -325,57 +938,119 @@ class SberMegaMarketProductProviderUrlSearch(ProductProvider):
 
 class SberMegaMarketProductProvider(SberMegaMarketProductProviderUrlSearch):
     """
-    ProductProvider interface class for sbermegamarket with patches for searching by search field.
+    ProductProvider interface class for sbermegamarket with racing between direct url
+    and search field navigation.
     """
 
-    search_data_field_path: dict[By, str] = {
-        By.CLASS_NAME: 'search-field-input',
-    }
+    search_data_field_path: Locators = [
+        (By.CLASS_NAME, 'search-field-input'),
+    ]
 
-    @staticmethod
-    def _clear_search_data(search_field: WebElement):
-        search_field.clear()
-        if data := search_field.get_attribute('value'):
-            search_field.send_keys(Keys.BACKSPACE * len(data))
-        if max_length := search_field.get_attribute('maxlength'):
-            search_field.send_keys(Keys.BACKSPACE * int(max_length))
+    def __init__(
+        self,
+        parser_pool: ParserPool,
+        base_url: HttpUrl,
+        debug: bool = False,
+        hedge_policy: Optional[HedgePolicy] = None,
+        has_snapshot_extraction: bool = False,
+        parse_executor: Optional[Executor] = None,
+        ready_timeout: float = DEFAULT_READY_TIMEOUT,
+        extraction_breaker: Optional[ExtractionCircuitBreaker] = None,
+        selector_ranking: Optional[SelectorRanking] = None,
+        has_variant_extraction: bool = False,
+        navigation_selector: Optional[NavigationStrategySelector] = None,
+    ) -> None:
+        super().__init__(
+            parser_pool,
+            base_url,
+            debug,
+            hedge_policy,
+            has_snapshot_extraction,
+            parse_executor,
+            ready_timeout,
+            extraction_breaker,
+            selector_ranking,
+            has_variant_extraction,
+        )
+        self.navigation_selector = navigation_selector or NavigationStrategySelector()
 
-    def _get_search_field(self, parser: BaseParser) -> WebElement:
+    def _fill_search_field(self, goods_id: GoodsID, parser: BaseParser) -> Locator:
         """
-        Get base sbermegamarket page with search field.
+        Type goods id into search field, base sbermegamarket page is opened if it is absent.
         """
+        locators = self._order_selectors('search_field', self.search_data_field_path)
         for _ in range(MAX_TRIES):
-            if search_field_data := self._get_elements_data(
-                self.search_data_field_path, parser
-            ):
-                search_field_input = search_field_data[0]
-                self._clear_search_data(search_field_input)
-                return search_field_input
+            hit_index = parser.fill_search(locators, goods_id)
+            self._record_selectors('search_field', locators, hit_index)
+            if hit_index is not None:
+                return locators[hit_index]
             parser.get_page(self.base_url)
 
-        if self.debug:
-            parser.get_screenshot()
+        parser.save_artifacts('no_search_field')
         raise ProviderError('Cannot find search field')
 
     @lru_cache(maxsize=512)
     def _get_product_page(self, goods_id: GoodsID, parser: BaseParser) -> HttpUrl:
         """
-        Get product page entity by goods id.
+        Get product page by the currently best navigation strategy with fallback to others.
+        """
+        strategy = self.navigation_selector.choose()
+        strategies = [strategy, *self.navigation_selector.get_fallbacks(strategy)]
+        for current_strategy in strategies:
+            navigate = {
+                NavigationStrategy.URL: self._get_product_page_by_url,
+                NavigationStrategy.SEARCH_FIELD: self._get_product_page_by_search_field,
+            }[current_strategy]
+            started_at = time.monotonic()
+            try:
+                product_data_url = navigate(goods_id, parser)
+            except ProviderError as err:
+                self.navigation_selector.record(
+                    current_strategy,
+                    success=False,
+                    latency=time.monotonic() - started_at,
+                )
+                logger.warning(
+                    f'Navigation strategy {current_strategy.value} failed for goods id {goods_id}: {err}'
+                )
+                continue
+            self.navigation_selector.record(
+                current_strategy, success=True, latency=time.monotonic() - started_at
+            )
+            return product_data_url
+
+        raise ProviderError(f'Cannot get product page for goods id: {goods_id}')
+
+    def _get_product_page_by_url(
+        self, goods_id: GoodsID, parser: BaseParser
+    ) -> HttpUrl:
+        """
+        Get product page by direct catalog search url.
         """
-        search_field_input = self._get_search_field(parser)
-        search_field_input.send_keys(goods_id)
-        search_field_input.send_keys(Keys.RETURN)
-        search_field_input.submit()
+        parser.navigate(
+            super()._get_product_page(goods_id, parser),
+            ready_paths=self.product_name_path,
+        )
+        return self._wait_product_page(goods_id, parser)
 
+    def _get_product_page_by_search_field(
+        self, goods_id: GoodsID, parser: BaseParser
+    ) -> HttpUrl:
+        """
+        Get product page by typing goods id into search field.
+        """
+        parser.submit_search(self._fill_search_field(goods_id, parser))
+        return self._wait_product_page(goods_id, parser)
+
+    def _wait_product_page(self, goods_id: GoodsID, parser: BaseParser) -> HttpUrl:
+        """
+        Wait redirect to product page.
+        """
         for _ in range(MAX_TRIES):
-            if str(goods_id) in urlparse(parser.client.current_url).path:  # type: ignore[union-attr]
-                product_data_url = parse_obj_as(
-                    HttpUrl,
-                    parser.client.current_url,  # type: ignore[union-attr]
-                )
-                return product_data_url
+            current_url = parser.current_url
+            if str(goods_id) in urlparse(current_url).path:
+                return parse_obj_as(HttpUrl, current_url)
             time.sleep(1)
 
-        if self.debug:
-            parser.get_screenshot()
+        parser.save_artifacts('no_product_page')
         raise ProviderError('Cannot change current url to product url')
@@ -0,0 +1,228 @@
+"""
+Background re-scraping of products by freshness targets.
+"""
+import asyncio
+import math
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Optional
+
+from loguru import logger
+
+from common.metrics import metrics
+from common.utils import utc_now
+from .entities import ProductFreshness
+from .servicies import ProductInfoService
+from .types import CategoryName, GoodsID
+
+DEFAULT_MAX_AGE = 24 * 3600.0  # sec
+DEFAULT_PRIORITY = 1.0
+DEFAULT_SHARE = 0.5  # of parser pool
+DEFAULT_INTERVAL = 60.0  # sec, waiting of stale products when all are fresh
+DEFAULT_BATCH_SIZE = 100
+
+
+def parse_targets(targets: str) -> dict[str, tuple[float, float]]:
+    """
+    Get max age and priority by category name or goods id from 'key=max_age[:priority]' list.
+    """
+    targets_data = {}
+    for target in targets.split(','):
+        if not target.strip():
+            continue
+        key, _, value = target.rpartition('=')
+        max_age, _, priority = value.partition(':')
+        if not key.strip():
+            raise ValueError(f'Wrong freshness target: {target}')
+        targets_data[key.strip()] = (
+            float(max_age),
+            float(priority) if priority else DEFAULT_PRIORITY,
+        )
+    return targets_data
+
+
+class FreshnessPolicy:
+    """
+    Max age and priority of product, goods id target goes before category ones.
+
+    Product of several categories gets the shortest max age and the highest priority of them.
+    """
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE, targets: str = ''):
+        self.max_age = max_age
+        self.targets = parse_targets(targets)
+
+    @property
+    def goods_ids(self) -> list[GoodsID]:
+        return [GoodsID(key) for key in self.targets if key.isdigit()]
+
+    @property
+    def categories(self) -> list[CategoryName]:
+        return [CategoryName(key) for key in self.targets if not key.isdigit()]
+
+    @property
+    def max_max_age(self) -> float:
+        return max([self.max_age, *(max_age for max_age, _ in self.targets.values())])
+
+    def get_target(self, product: ProductFreshness) -> tuple[float, float]:
+        if product.goods_id in self.targets:
+            return self.targets[product.goods_id]
+        category_targets = [
+            self.targets[category]
+            for category in product.categories
+            if category in self.targets
+        ]
+        if not category_targets:
+            return self.max_age, DEFAULT_PRIORITY
+        return (
+            min(max_age for max_age, _ in category_targets),
+            max(priority for _, priority in category_targets),
+        )
+
+    def get_staleness(self, product: ProductFreshness, now: datetime) -> float:
+        """
+        Get share of revisit interval passed since scrape, product is stale above 1.
+
+        Interval learned from change rate of product is bounded by its max age.
+        """
+        max_age, _ = self.get_target(product)
+        if product.revisit_interval is not None:
+            max_age = min(max_age, product.revisit_interval)
+        return (now - product.checked_at).total_seconds() / max(max_age, 1.0)
+
+    def get_score(self, product: ProductFreshness, now: datetime) -> float:
+        _, priority = self.get_target(product)
+        return self.get_staleness(product, now) * priority
+
+
+class RefreshScheduler:
+    """
+    Continuous re-scraping of stale products, the most stale and prioritized ones first.
+
+    Products are revisited by intervals learned from their change rate and never later than
+    their max age. Scrapes take at most share of parser pool, so api requests and seed jobs
+    are not starved.
+    Failed products are skipped until their revisit interval passes again.
+    """
+
+    def __init__(
+        self,
+        product_info_service: ProductInfoService,
+        policy: FreshnessPolicy,
+        pool_size: int,
+        share: float = DEFAULT_SHARE,
+        interval: float = DEFAULT_INTERVAL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.product_info_service = product_info_service
+        self.product_repo = product_info_service.product_repo
+        self.policy = policy
+        self.concurrency = max(math.floor(pool_size * share), 1)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._failed_at: dict[GoodsID, datetime] = {}
+        self._running: set[GoodsID] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def select_stale(self) -> list[ProductFreshness]:
+        """
+        Get the most stale and prioritized products, in progress and recently failed are skipped.
+
+        Candidates are selected by revisit time, by default target and by every category
+        and goods id target, so products with short targets are not hidden behind the oldest ones.
+        """
+        now = utc_now()
+        self._failed_at = {
+            goods_id: failed_at
+            for goods_id, failed_at in self._failed_at.items()
+            if (now - failed_at).total_seconds() < self.policy.max_max_age
+        }
+        # products finished during selecting are fresh in db
+        running = set(self._running)
+        limit = self.batch_size + len(running) + len(self._failed_at)
+        candidates = await self.product_repo.select_revisit_due(now, limit=limit)
+        queries: list[dict] = [
+            {'checked_before': now - timedelta(seconds=self.policy.max_age)}
+        ]
+        for category in self.policy.categories:
+            max_age, _ = self.policy.targets[category]
+            queries.append(
+                {
+                    'checked_before': now - timedelta(seconds=max_age),
+                    'category': category,
+                }
+            )
+        if goods_ids := self.policy.goods_ids:
+            queries.append({'checked_before': now, 'goods_ids': goods_ids})
+        for query in queries:
+            candidates.extend(
+                await self.product_repo.select_checked_before(limit=limit, **query)
+            )
+        products = {
+            product.goods_id: product
+            for product in candidates
+            if product.goods_id not in running
+        }
+        stale_products = []
+        for product in products.values():
+            if failed_at := self._failed_at.get(product.goods_id):
+                product = product.copy(
+                    update={'checked_at': max(product.checked_at, failed_at)}
+                )
+            if self.policy.get_staleness(product, now) > 1:
+                stale_products.append(product)
+        stale_products.sort(
+            key=lambda product: self.policy.get_score(product, now), reverse=True
+        )
+        metrics.set_gauge('refresh.stale', len(stale_products))
+        return stale_products[: self.batch_size]
+
+    async def run(self):
+        logger.info(f'Start refresh scheduler with concurrency {self.concurrency}')
+        slots = asyncio.Semaphore(self.concurrency)
+        scrapes: set[asyncio.Task] = set()
+        try:
+            while True:
+                try:
+                    products = await self.select_stale()
+                except Exception:
+                    logger.exception('Cannot select stale products')
+                    products = []
+                if not products:
+                    await asyncio.sleep(self.interval)
+                    continue
+                for product in products:
+                    await slots.acquire()
+                    self._running.add(product.goods_id)
+                    scrape = asyncio.create_task(self.refresh(product.goods_id))
+                    scrapes.add(scrape)
+                    scrape.add_done_callback(scrapes.discard)
+                    scrape.add_done_callback(lambda _: slots.release())
+        finally:
+            for scrape in scrapes:
+                scrape.cancel()
+            await asyncio.gather(*scrapes, return_exceptions=True)
+
+    async def refresh(self, goods_id: GoodsID):
+        try:
+            await self.product_info_service.register_provider_product_info(goods_id)
+        except Exception as err:
+            logger.warning(f'Refresh of goods id {goods_id} failed: {err!r}')
+            metrics.increment('refresh.failed')
+            self._failed_at[goods_id] = utc_now()
+        else:
+            metrics.increment('refresh.done')
+            self._failed_at.pop(goods_id, None)
+        finally:
+            self._running.discard(goods_id)
@@ -1,19 +1,27 @@
 from abc import ABCMeta, abstractmethod
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Set
 
 from loguru import logger
 from tortoise import transactions
 
 from common.errors import RepositoryError, NotFoundError
+from common.utils import utc_now
 from storages.databases import (
     ProductModel,
     ProductAttributeModel,
     CategoryModel,
     ProductImageModel,
+    ProductSitemapEntryModel,
 )
-from .entities import ProductEntity
-from .types import GoodsID, CategoryName
+from .entities import (
+    ProductEntity,
+    ProductFreshness,
+    ProductRevisit,
+    ProductSitemapEntity,
+)
+from .types import GoodsID, CategoryName, ProductField
 from ..types import Repository, IntId
 
 
@@ -40,6 +48,42 @@ class ProductRepository(Repository):
     async def select_by_category(self, category: CategoryName) -> List[ProductEntity]:
         pass
 
+    @abstractmethod
+    async def select_by_goods_ids(
+        self, goods_ids: List[GoodsID]
+    ) -> List[ProductEntity]:
+        pass
+
+    @abstractmethod
+    async def select_checked_at(
+        self, goods_ids: List[GoodsID]
+    ) -> dict[GoodsID, datetime]:
+        pass
+
+    @abstractmethod
+    async def select_checked_before(
+        self,
+        checked_before: datetime,
+        limit: int = 100,
+        category: Optional[CategoryName] = None,
+        goods_ids: Optional[List[GoodsID]] = None,
+    ) -> List[ProductFreshness]:
+        pass
+
+    @abstractmethod
+    async def select_revisit_due(
+        self, revisit_before: datetime, limit: int = 100
+    ) -> List[ProductFreshness]:
+        pass
+
+    @abstractmethod
+    async def find_revisit(self, goods_id: GoodsID) -> Optional[ProductRevisit]:
+        pass
+
+    @abstractmethod
+    async def update_revisit(self, revisit: ProductRevisit) -> None:
+        pass
+
     @abstractmethod
     async def insert(self, instance: ProductEntity) -> IntId:
         pass
@@ -48,6 +92,12 @@ class ProductRepository(Repository):
     async def update(self, instance: ProductEntity) -> None:
         pass
 
+    @abstractmethod
+    async def update_fields(
+        self, instance: ProductEntity, fields: Set[ProductField]
+    ) -> None:
+        pass
+
     @abstractmethod
     async def delete(self, instance: ProductEntity) -> None:
         pass
@@ -108,11 +158,97 @@ class GinoProductRepository(ProductRepository):
         ]
         return products_data
 
+    async def select_by_goods_ids(
+        self, goods_ids: List[GoodsID]
+    ) -> List[ProductEntity]:
+        products = await self.model.filter(goods_id__in=goods_ids).prefetch_related(
+            'attributes', 'categories', 'images'
+        )
+        return [
+            ProductEntity(**self._map_product_instance_to_dict(product))
+            for product in products
+        ]
+
+    async def select_checked_at(
+        self, goods_ids: List[GoodsID]
+    ) -> dict[GoodsID, datetime]:
+        """
+        Get time of the last scrape of stored products, unchanged scrape keeps modified_at.
+        """
+        products_data = await self.model.filter(goods_id__in=goods_ids).values(
+            'goods_id', 'checked_at', 'modified_at'
+        )
+        return {
+            GoodsID(product_data['goods_id']): product_data['checked_at']
+            or product_data['modified_at']
+            for product_data in products_data
+        }
+
+    async def select_checked_before(
+        self,
+        checked_before: datetime,
+        limit: int = 100,
+        category: Optional[CategoryName] = None,
+        goods_ids: Optional[List[GoodsID]] = None,
+    ) -> List[ProductFreshness]:
+        """
+        Get the least recently scraped products with their categories, the oldest first.
+        """
+        query = self.model.filter(checked_at__lt=checked_before)
+        if category is not None:
+            query = query.filter(categories__name=category)
+        if goods_ids is not None:
+            query = query.filter(goods_id__in=goods_ids)
+        products = (
+            await query.order_by('checked_at')
+            .limit(limit)
+            .prefetch_related('categories')
+        )
+        return [
+            self._map_product_instance_to_freshness(product) for product in products
+        ]
+
+    async def select_revisit_due(
+        self, revisit_before: datetime, limit: int = 100
+    ) -> List[ProductFreshness]:
+        """
+        Get products with passed revisit time, the most overdue first.
+        """
+        products = (
+            await self.model.filter(next_revisit_at__lte=revisit_before)
+            .order_by('next_revisit_at')
+            .limit(limit)
+            .prefetch_related('categories')
+        )
+        return [
+            self._map_product_instance_to_freshness(product) for product in products
+        ]
+
+    async def find_revisit(self, goods_id: GoodsID) -> Optional[ProductRevisit]:
+        product = await self.model.get_or_none(goods_id=goods_id)
+        if not product:
+            return None
+        return ProductRevisit.from_orm(product)
+
+    async def update_revisit(self, revisit: ProductRevisit):
+        await self.model.filter(goods_id=revisit.goods_id).update(
+            checked_at=revisit.checked_at,
+            first_checked_at=revisit.first_checked_at,
+            checks=revisit.checks,
+            changes=revisit.changes,
+            content_hash=revisit.content_hash,
+            revisit_interval=revisit.revisit_interval,
+            next_revisit_at=revisit.next_revisit_at,
+        )
+
     async def insert(self, entity: ProductEntity) -> IntId:
         logger.debug(f'Try to save db data for  {entity}')
         async with self.atomic():
             product = await self.model.create(
-                goods_id=entity.goods_id, name=entity.name, price=entity.price
+                goods_id=entity.goods_id,
+                name=entity.name,
+                price=entity.price,
+                checked_at=utc_now(),
             )
             entity.set_id(IntId(product.id))
             instance_id = entity.get_id()
@@ -145,6 +281,32 @@ class GinoProductRepository(ProductRepository):
                 f'Successfully update product instance: {product} for entity {entity}'
             )
 
+    async def update_fields(self, entity: ProductEntity, fields: Set[ProductField]):
+        logger.debug(f'Try to update db data of fields {fields} for {entity}')
+        async with self.atomic():
+            instance_id = entity.get_id()
+            product = await self.model.get_or_none(id=instance_id)
+            if not product:
+                raise NotFoundError(f'Cannot find model record for id {instance_id}')
+            columns = [
+                field.value
+                for field in fields
+                if field in (ProductField.NAME, ProductField.PRICE)
+            ]
+            await product.update_from_dict(
+                data={column: getattr(entity, column) for column in columns}
+            ).save(update_fields=[*columns, 'modified_at'])
+
+            if ProductField.ATTRIBUTES in fields:
+                await self._update_or_create_attributes(product, entity=entity)
+            if ProductField.CATEGORIES in fields:
+                await self._update_or_create_categories(product, entity=entity)
+            if ProductField.IMAGES in fields:
+                await self._update_or_create_images(product, entity=entity)
+            logger.debug(
+                f'Successfully update fields {fields} of product instance: {product}'
+            )
+
     async def delete(self, entity: ProductEntity):
         instance_id = entity.get_id()
         async with self.atomic():
@@ -239,6 +401,15 @@ class GinoProductRepository(ProductRepository):
         )
         return image_instances
 
+    @staticmethod
+    def _map_product_instance_to_freshness(instance: ProductModel) -> ProductFreshness:
+        return ProductFreshness(
+            goods_id=instance.goods_id,
+            checked_at=instance.checked_at or instance.modified_at,
+            revisit_interval=instance.revisit_interval,
+            categories=[category.name for category in instance.categories],
+        )
+
     @staticmethod
     def _map_product_instance_to_dict(
         instance: ProductModel,
@@ -257,3 +428,46 @@ class GinoProductRepository(ProductRepository):
                 {'name': image.name, 'url': image.url} for image in instance.images
             ],
         )
+
+
+class ProductSitemapRepository(Repository):
+    __metaclass__ = ABCMeta
+
+    """
+    Sitemap entries repository interface class.
+    """
+
+    @abstractmethod
+    async def find_by_goods_id(
+        self, goods_id: GoodsID
+    ) -> Optional[ProductSitemapEntity]:
+        pass
+
+    @abstractmethod
+    async def upsert_many(self, instances: List[ProductSitemapEntity]) -> None:
+        pass
+
+
+class GinoProductSitemapRepository(ProductSitemapRepository):
+    model = ProductSitemapEntryModel
+
+    async def find_by_goods_id(
+        self, goods_id: GoodsID
+    ) -> Optional[ProductSitemapEntity]:
+        entry = await self.model.get_or_none(goods_id=goods_id)
+        if not entry:
+            return None
+        return ProductSitemapEntity.from_orm(entry)
+
+    async def upsert_many(self, entities: List[ProductSitemapEntity]):
+        logger.debug(f'Try to save {len(entities)} sitemap entries')
+        await self.model.bulk_create(
+            [
+                self.model(
+                    goods_id=entity.goods_id, url=entity.url, lastmod=entity.lastmod
+                )
+                for entity in entities
+            ],
+            update_fields=['url', 'lastmod', 'modified_at'],
+            on_conflict=['goods_id'],
+        )
@@ -0,0 +1,145 @@
+"""
+Change detection and adaptive revisit intervals of products by their observed change rate.
+"""
+import hashlib
+import json
+import math
+from datetime import datetime, timedelta
+from typing import Optional
+
+from common.utils import utc_now
+from .entities import ProductEntity, ProductRevisit
+from .types import ProductField
+
+DEFAULT_MIN_INTERVAL = 3600.0  # sec
+DEFAULT_MAX_INTERVAL = 30 * 24 * 3600.0  # sec
+
+
+def get_changed_fields(
+    stored_product_data: ProductEntity,
+    product_data: ProductEntity,
+    fields: Optional[set[ProductField]] = None,
+) -> set[ProductField]:
+    """
+    Get fields with changed values, order of categories, images and attributes is ignored.
+    """
+    stored_values = get_field_values(stored_product_data)
+    values = get_field_values(product_data)
+    return {
+        field
+        for field in fields or set(ProductField)
+        if values[field] != stored_values[field]
+    }
+
+
+def get_field_values(product_data: ProductEntity) -> dict[ProductField, object]:
+    return {
+        ProductField.NAME: product_data.name,
+        ProductField.PRICE: product_data.price,
+        ProductField.CATEGORIES: sorted(
+            category.name for category in product_data.categories
+        ),
+        ProductField.IMAGES: sorted(
+            (image.name, image.url) for image in product_data.images
+        ),
+        ProductField.ATTRIBUTES: sorted(
+            (attribute.name, attribute.value) for attribute in product_data.attributes
+        ),
+    }
+
+
+def get_content_hash(product_data: ProductEntity) -> str:
+    """
+    Get sha256 of normalized product fields, equal for products without changed fields.
+    """
+    values = get_field_values(product_data)
+    values[ProductField.PRICE] = f'{product_data.price:.2f}'
+    return hashlib.sha256(
+        json.dumps(
+            {field.value: value for field, value in values.items()},
+            ensure_ascii=False,
+            default=str,
+        ).encode()
+    ).hexdigest()
+
+
+def estimate_change_rate(checks: int, changes: int, observed_time: float) -> float:
+    """
+    Get changes per second from count of checks with detected change over observed time.
+
+    Detected changes are fewer than real ones if product changes more often than it is checked,
+    estimator -ln((n - X + 0.5) / (n + 1)) / mean interval accounts for it and stays finite
+    when every check finds change.
+    """
+    if checks <= 0 or observed_time <= 0:
+        return 0.0
+    changes = min(changes, checks)
+    return -math.log((checks - changes + 0.5) / (checks + 1)) / (observed_time / checks)
+
+
+class RevisitPolicy:
+    """
+    Revisit interval is expected time between product changes bounded by min and max.
+
+    Product without checks history is revisited after min interval to learn its rate quickly.
+    Checks are observed since insert, product stored before that starts observation on its
+    first check.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+
+    def get_interval(self, revisit: ProductRevisit, now: datetime) -> float:
+        if not revisit.checks or revisit.first_checked_at is None:
+            return self.min_interval
+        change_rate = estimate_change_rate(
+            revisit.checks,
+            revisit.changes,
+            (now - revisit.first_checked_at).total_seconds(),
+        )
+        if not change_rate:
+            return self.max_interval
+        return min(max(1 / change_rate, self.min_interval), self.max_interval)
+
+    def record_check(
+        self, revisit: ProductRevisit, is_changed: bool, now: Optional[datetime] = None
+    ) -> ProductRevisit:
+        """
+        Count scrape of stored product and schedule the next one.
+        """
+        now = now or utc_now()
+        if revisit.first_checked_at is None:
+            return self.record_insert(revisit, now)
+        revisit = revisit.copy(
+            update={
+                'checks': revisit.checks + 1,
+                'changes': revisit.changes + int(is_changed),
+                'checked_at': now,
+            }
+        )
+        revisit.revisit_interval = self.get_interval(revisit, now)
+        revisit.next_revisit_at = now + timedelta(seconds=revisit.revisit_interval)
+        return revisit
+
+    def record_insert(
+        self, revisit: ProductRevisit, now: Optional[datetime] = None
+    ) -> ProductRevisit:
+        """
+        Start observation of new product or of product stored before checks counting.
+        """
+        now = now or utc_now()
+        return revisit.copy(
+            update={
+                'checked_at': now,
+                'first_checked_at': now,
+                'checks': 0,
+                'changes': 0,
+                'revisit_interval': self.min_interval,
+                'next_revisit_at': now + timedelta(seconds=self.min_interval),
+            }
+        )
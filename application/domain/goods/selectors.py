@@ -0,0 +1,144 @@
+"""
+Ordering of field selector candidates by observed hit rate.
+"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from clients.parser import Locator, Locators
+
+DEFAULT_SAVE_INTERVAL = 60.0  # sec
+MAX_OBSERVATIONS = 1000  # counts are halved above it for following layout changes
+
+
+class SelectorStats:
+    """
+    Hits and misses of one selector.
+    """
+
+    def __init__(self, hits: float = 0.0, misses: float = 0.0):
+        self.hits = hits
+        self.misses = misses
+
+    def add(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.hits + self.misses > MAX_OBSERVATIONS:
+            self.hits /= 2
+            self.misses /= 2
+
+    @property
+    def score(self) -> float:
+        """
+        Smoothed hit rate, unknown selector gets 0.5.
+        """
+        return (self.hits + 1) / (self.hits + self.misses + 2)
+
+
+class SelectorRanking:
+    """
+    Per field selector statistics, the most successful selector is tried first.
+
+    Statistics are saved to json file for keeping ordering across restarts.
+    """
+
+    def __init__(
+        self,
+        stats_file: Optional[Path] = None,
+        save_interval: float = DEFAULT_SAVE_INTERVAL,
+    ):
+        # empty env value gives current dir, stats are kept in memory only then
+        self.stats_file = stats_file if stats_file and not stats_file.is_dir() else None
+        self.save_interval = save_interval
+        self._stats: dict[str, dict[str, SelectorStats]] = {}
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()  # selectors are recorded from executor threads
+        self._write_lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def get_key(locator: Locator) -> str:
+        by, value = locator
+        return f'{by.value}={value}'
+
+    def order(self, field: str, locators: Locators) -> Locators:
+        """
+        Sort selector candidates by score, declared order is kept for equal scores.
+        """
+        with self._lock:
+            field_stats = self._stats.get(field, {})
+            return sorted(
+                locators,
+                key=lambda locator: -field_stats.get(
+                    self.get_key(locator), SelectorStats()
+                ).score,
+            )
+
+    def record(self, field: str, tried: Locators, hit_index: Optional[int]):
+        """
+        Add hit of selector with hit_index and misses of selectors tried before it.
+        """
+        with self._lock:
+            field_stats = self._stats.setdefault(field, {})
+            for index, locator in enumerate(tried):
+                stats = field_stats.setdefault(self.get_key(locator), SelectorStats())
+                stats.add(index == hit_index)
+                if index == hit_index:
+                    break
+            if time.monotonic() - self._saved_at < self.save_interval:
+                return
+            self._saved_at = time.monotonic()
+            data = self._dump()
+        self._write(data)
+
+    def save(self):
+        """
+        Write statistics to file, called on shutdown for keeping not saved records.
+        """
+        with self._lock:
+            data = self._dump()
+        self._write(data)
+
+    def load(self):
+        if not self.stats_file or not self.stats_file.exists():
+            return
+        try:
+            data = json.loads(self.stats_file.read_text())
+        except (OSError, ValueError) as err:
+            logger.warning(f'Cannot load selector stats from {self.stats_file}: {err}')
+            return
+        with self._lock:
+            self._stats = {
+                field: {
+                    key: SelectorStats(hits, misses)
+                    for key, (hits, misses) in field_data.items()
+                }
+                for field, field_data in data.items()
+            }
+        logger.info(f'Load selector stats from {self.stats_file}')
+
+    def _dump(self) -> dict:
+        return {
+            field: {
+                key: [stats.hits, stats.misses] for key, stats in field_stats.items()
+            }
+            for field, field_stats in self._stats.items()
+        }
+
+    def _write(self, data: dict):
+        if not self.stats_file:
+            return
+        try:
+            with self._write_lock:
+                self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.stats_file.with_suffix('.tmp')
+                tmp_file.write_text(json.dumps(data))
+                tmp_file.replace(self.stats_file)  # readers never see partial file
+        except OSError as err:
+            logger.warning(f'Cannot save selector stats to {self.stats_file}: {err}')
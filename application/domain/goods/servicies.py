@@ -1,22 +1,39 @@
-from typing import Optional
+import itertools
+from typing import Awaitable, Callable, Iterator, Optional
 
 from loguru import logger
 
+from clients.sitemap import SitemapEntry, SitemapReader
 from common.errors import ServiceError, ProviderError, NotFoundError
-from common.utils import duration_measure
-from .entities import ProductEntity
+from common.utils import async_wrapper, duration_measure
+from .entities import (
+    ProductEntity,
+    ProductRevisit,
+    ProductSitemapEntity,
+    SitemapIngestResult,
+)
 from .provider import ProductProvider
-from .repositories import ProductRepository
-from .types import GoodsID, CategoryName
+from .repositories import ProductRepository, ProductSitemapRepository
+from .revisit import RevisitPolicy, get_changed_fields, get_content_hash
+from .timings import PERSIST_STAGE, measure_stage
+from .types import GoodsID, CategoryName, ProductField
 from ..types import Service
 
+SITEMAP_BATCH_SIZE = 1000
+# fields shown on variant card of product page
+VARIANT_FIELDS = {ProductField.NAME, ProductField.PRICE}
+
 
 class ProductInfoService(Service):
     def __init__(
-        self, product_repo: ProductRepository, product_provider: ProductProvider
+        self,
+        product_repo: ProductRepository,
+        product_provider: ProductProvider,
+        revisit_policy: Optional[RevisitPolicy] = None,
     ) -> None:
         self.product_repo = product_repo
         self.product_provider = product_provider
+        self.revisit_policy = revisit_policy or RevisitPolicy()
 
     async def manual_upload_product_info(
         self, product_entity: ProductEntity
@@ -35,21 +52,35 @@ class ProductInfoService(Service):
         return await self._update_product(goods_id, product_data)
 
     async def register_provider_product_info(
-        self, goods_id: GoodsID, raw_data: Optional[bytes] = None
+        self,
+        goods_id: GoodsID,
+        raw_data: Optional[bytes] = None,
+        hedged: bool = False,
+        fields: Optional[set[ProductField]] = None,
     ) -> ProductEntity:
+        stored_product_data = await self._get_product(goods_id) if fields else None
+        if not stored_product_data:
+            fields = None  # new product is scraped fully
         try:
-            product_data = await self.product_provider.get_product(goods_id, raw_data)
+            product_data = await self.product_provider.get_product(
+                goods_id, raw_data, hedged=hedged, fields=fields
+            )
         except ProviderError as err:
             logger.warning(f'Get provider error {err} for goods_id {goods_id} ')
             raise NotFoundError(f'Cannot find information for goods_id: {goods_id}')
-        return await self._update_product(goods_id, product_data)
+        with measure_stage(PERSIST_STAGE):
+            if stored_product_data and fields:
+                return await self._merge_product(
+                    stored_product_data, product_data, fields
+                )
+            return await self._update_product(goods_id, product_data)
 
     @duration_measure
     async def find_product_info(self, goods_id: GoodsID) -> Optional[ProductEntity]:
         if product := await self._get_product(goods_id):
             return product
         try:
-            return await self.register_provider_product_info(goods_id)
+            return await self.register_provider_product_info(goods_id, hedged=True)
         except NotFoundError as err:
             logger.warning(str(err))
             return None
@@ -65,6 +96,36 @@ class ProductInfoService(Service):
             return []
         return products
 
+    async def save_products(
+        self, products_data: list[ProductEntity]
+    ) -> list[ProductEntity]:
+        """
+        Save batch of scraped products in one transaction.
+        """
+        async with self.product_repo.atomic():
+            return [
+                await self._update_product(product_data.goods_id, product_data)
+                for product_data in products_data
+            ]
+
+    async def merge_variants(self, variants: list[ProductEntity]) -> list[GoodsID]:
+        """
+        Write name and price of variants listed on product page into stored products.
+
+        Variant card has no images and attributes, so goods ids of not stored
+        variants are returned for full scrape.
+        """
+        unstored_goods_ids = []
+        async with self.product_repo.atomic():
+            for variant in variants:
+                if stored_product_data := await self._get_product(variant.goods_id):
+                    await self._merge_product(
+                        stored_product_data, variant, VARIANT_FIELDS
+                    )
+                else:
+                    unstored_goods_ids.append(variant.goods_id)
+        return unstored_goods_ids
+
     async def _get_product(self, goods_id: GoodsID) -> Optional[ProductEntity]:
         products = await self.product_repo.find_by_goods_id(goods_id)
         return products
@@ -74,20 +135,83 @@ class ProductInfoService(Service):
         goods_id: GoodsID,
         product_data: ProductEntity,
     ) -> ProductEntity:
+        """
+        Write product if its content hash is changed, unchanged product only gets checked_at.
+        """
+        content_hash = get_content_hash(product_data)
         async with self.product_repo.atomic():
-            if exist_product_data := await self._get_product(goods_id):
-                exist_product_data.update(product_data)
-                await self.product_repo.update(exist_product_data)
+            if revisit := await self.product_repo.find_revisit(goods_id):
+                if revisit.content_hash == content_hash:
+                    await self._record_check(revisit, content_hash, is_changed=False)
+                    logger.debug(f'Product with goods_id {goods_id} is not changed')
+                    return product_data.copy(
+                        update={
+                            'id': revisit.id,
+                            'created_at': revisit.created_at,
+                            'modified_at': revisit.modified_at,
+                        }
+                    )
+                exist_product_data = await self.product_repo.get_by_id(revisit.id)
+                is_changed = bool(get_changed_fields(exist_product_data, product_data))
+                if is_changed:  # product saved before hashing is compared by fields
+                    exist_product_data.update(product_data)
+                    await self.product_repo.update(exist_product_data)
+                await self._record_check(revisit, content_hash, is_changed)
                 logger.debug(
                     f'Successfully update {exist_product_data} with key {exist_product_data.get_id()}'
                 )
                 return await self.product_repo.get_by_id(exist_product_data.get_id())
 
             instance_id = await self.product_repo.insert(product_data)
+            if revisit := await self.product_repo.find_revisit(goods_id):
+                await self._record_check(revisit, content_hash)
             saved_product_data = await self.product_repo.get_by_id(instance_id)
             logger.debug(f'Create {saved_product_data} with key {instance_id}')
             return await self.product_repo.get_by_id(instance_id)
 
+    async def _merge_product(
+        self,
+        stored_product_data: ProductEntity,
+        product_data: ProductEntity,
+        fields: set[ProductField],
+    ) -> ProductEntity:
+        """
+        Write only changed fields of partial product data.
+        """
+        changed_fields = get_changed_fields(stored_product_data, product_data, fields)
+        if changed_fields:
+            stored_product_data.update(
+                product_data.copy(include={field.value for field in changed_fields})
+            )
+            await self.product_repo.update_fields(stored_product_data, changed_fields)
+        else:
+            logger.debug(f'Fields {fields} of {stored_product_data} are not changed')
+        if revisit := await self.product_repo.find_revisit(
+            stored_product_data.goods_id
+        ):
+            await self._record_check(
+                revisit, get_content_hash(stored_product_data), bool(changed_fields)
+            )
+        if not changed_fields:
+            return stored_product_data
+        return await self.product_repo.get_by_id(stored_product_data.get_id())
+
+    async def _record_check(
+        self,
+        revisit: ProductRevisit,
+        content_hash: str,
+        is_changed: Optional[bool] = None,
+    ):
+        """
+        Count scrape of stored product for its revisit interval, new product has no change.
+        """
+        if is_changed is None:
+            revisit = self.revisit_policy.record_insert(revisit)
+        else:
+            revisit = self.revisit_policy.record_check(revisit, is_changed)
+        revisit.content_hash = content_hash
+        await self.product_repo.update_revisit(revisit)
+
     async def _remove_product(
         self, goods_id: GoodsID
     ):  # TODO: add logic for using this method
@@ -100,3 +224,79 @@ class ProductInfoService(Service):
 
     async def count(self) -> int:
         return await self.product_repo.get_count()
+
+
+class ProductSitemapService(Service):
+    def __init__(
+        self,
+        sitemap_repo: ProductSitemapRepository,
+        product_repo: ProductRepository,
+        product_provider: ProductProvider,
+        sitemap_reader: SitemapReader,
+    ) -> None:
+        self.sitemap_repo = sitemap_repo
+        self.product_repo = product_repo
+        self.product_provider = product_provider
+        self.sitemap_reader = sitemap_reader
+
+    async def ingest(
+        self,
+        source: str,
+        schedule: Callable[[list[GoodsID]], Awaitable[None]],
+        batch_size: int = SITEMAP_BATCH_SIZE,
+    ) -> SitemapIngestResult:
+        """
+        Store product entries of sitemap and schedule scraping for new or changed products.
+
+        Product is changed if its lastmod is after the last scrape of stored product.
+        """
+        result = SitemapIngestResult(source=source)
+        entries = self.sitemap_reader.iter_entries(source)
+        read_batch = async_wrapper(self._read_batch)
+        while batch := await read_batch(entries, batch_size):
+            result.entries += len(batch)
+            sitemap_entities = self._map_entries_to_entities(batch)
+            if not sitemap_entities:
+                continue
+            result.products += len(sitemap_entities)
+
+            goods_ids = [entity.goods_id for entity in sitemap_entities]
+            stored_checked_at = await self.product_repo.select_checked_at(goods_ids)
+            await self.sitemap_repo.upsert_many(sitemap_entities)
+
+            goods_ids_for_scrape = [
+                entity.goods_id
+                for entity in sitemap_entities
+                if entity.goods_id not in stored_checked_at
+                or (
+                    entity.lastmod is not None
+                    and entity.lastmod > stored_checked_at[entity.goods_id]
+                )
+            ]
+            if goods_ids_for_scrape:
+                await schedule(goods_ids_for_scrape)
+            result.scheduled += len(goods_ids_for_scrape)
+            logger.debug(
+                f'Process {len(batch)} sitemap entries, scheduled {len(goods_ids_for_scrape)}'
+            )
+
+        logger.info(f'Sitemap ingest result: {result}')
+        return result
+
+    @staticmethod
+    def _read_batch(
+        entries: Iterator[SitemapEntry], batch_size: int
+    ) -> list[SitemapEntry]:
+        return list(itertools.islice(entries, batch_size))
+
+    def _map_entries_to_entities(
+        self, entries: list[SitemapEntry]
+    ) -> list[ProductSitemapEntity]:
+        map_goods_id_to_entities: dict[GoodsID, ProductSitemapEntity] = {}
+        for entry in entries:
+            if not (goods_id := self.product_provider.get_goods_id(entry.loc)):
+                continue
+            map_goods_id_to_entities[goods_id] = ProductSitemapEntity(
+                goods_id=goods_id, url=entry.loc, lastmod=entry.lastmod
+            )
+        return list(map_goods_id_to_entities.values())
@@ -0,0 +1,61 @@
+"""
+Timings of product scrape stages.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Generator, Optional
+
+ACQUIRE_STAGE = 'acquire'
+NAVIGATE_STAGE = 'navigate'
+READINESS_STAGE = 'readiness'
+EXTRACT_STAGE = 'extract'
+PERSIST_STAGE = 'persist'
+SCRAPE_STAGES = (
+    ACQUIRE_STAGE,
+    NAVIGATE_STAGE,
+    READINESS_STAGE,
+    EXTRACT_STAGE,
+    PERSIST_STAGE,
+)
+
+
+class StageTimings:
+    """
+    Durations of stages of one scrape summed over its retries.
+    """
+
+    def __init__(self):
+        self._durations: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, duration: float):
+        with self._lock:
+            self._durations[stage] = self._durations.get(stage, 0.0) + duration
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._durations)
+
+
+# timings of current scrape, the same object is shared with executor threads by async_wrapper
+stage_timings_var: contextvars.ContextVar[
+    Optional[StageTimings]
+] = contextvars.ContextVar('stage_timings', default=None)
+
+
+@contextmanager
+def measure_stage(stage: str) -> Generator[None, None, None]:
+    """
+    Add duration of block to timings of current scrape, nothing is measured without them.
+    """
+    timings = stage_timings_var.get()
+    if timings is None:
+        yield
+        return
+    started_at = time.monotonic()
+    try:
+        yield
+    finally:
+        timings.add(stage, time.monotonic() - started_at)
@@ -1,3 +1,6 @@
+from enum import Enum
+
+
 class BaseStr(str):
     max_length = 1024
 
@@ -44,3 +47,11 @@ class CategoryName(BaseStr):
             type='string',
             examples=['life', 'sport'],
         )
+
+
+class ProductField(str, Enum):
+    NAME = 'name'
+    PRICE = 'price'
+    CATEGORIES = 'categories'
+    IMAGES = 'images'
+    ATTRIBUTES = 'attributes'
@@ -0,0 +1,6 @@
+from .entities import ScrapeTaskEntity, ScrapeTaskResult, SeedJobEntity
+from .repositories import GinoSeedJobRepository, SeedJobRepository
+from .retries import RetryPolicy
+from .runner import SeedJobRunner, get_worker_id
+from .servicies import SeedJobService
+from .types import ScrapeTaskStatus, SeedJobStatus
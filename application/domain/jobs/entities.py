@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import Field
+
+from domain.goods import GoodsID, ProductEntity
+from .types import ScrapeTaskStatus, SeedJobStatus
+from ..entities import Entity, EncodedModel
+from ..types import IntId
+
+
+class SeedJobEntity(Entity):
+    status: SeedJobStatus = SeedJobStatus.PENDING
+    total: int = Field(0, description='Count of goods ids in job')
+    pending: int = 0
+    running: int = 0
+    done: int = 0
+    failed: int = 0
+
+    @property
+    def finished(self) -> int:
+        return self.done + self.failed
+
+
+class ScrapeTaskEntity(Entity):
+    job_id: Optional[IntId] = Field(description='Seed job of task')
+    goods_id: GoodsID = Field(description='Штрихкод')
+    status: ScrapeTaskStatus = ScrapeTaskStatus.PENDING
+    error: Optional[str] = Field(max_length=1024)
+    worker_id: Optional[str] = Field(description='Worker holding lease of running task')
+    leased_until: Optional[datetime] = Field(
+        description='Running task is taken by other worker after it'
+    )
+    attempts: int = Field(0, description='Count of finished scrape attempts')
+    next_attempt_at: Optional[datetime] = Field(
+        description='Failed task is not taken before it'
+    )
+
+
+class ScrapeTaskResult(EncodedModel):
+    goods_id: GoodsID
+    status: ScrapeTaskStatus
+    error: Optional[str] = None
+    attempts: int = 0
+    product: Optional[ProductEntity] = Field(description='Saved product of done task')
@@ -0,0 +1,355 @@
+from abc import ABCMeta, abstractmethod
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from loguru import logger
+from tortoise import transactions
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F, Q
+from tortoise.functions import Count
+
+from common.utils import utc_now
+from storages.databases import ScrapeTaskModel, SeedJobModel
+from domain.goods import GoodsID
+from .entities import ScrapeTaskEntity, SeedJobEntity
+from .types import ScrapeTaskStatus, SeedJobStatus
+from ..types import Repository, IntId
+
+ERROR_MAX_LENGTH = 1024
+INSERT_BATCH_SIZE = 1000
+
+
+class SeedJobRepository(Repository):
+    __metaclass__ = ABCMeta
+
+    """
+    Seed jobs and their scrape tasks repository interface class.
+    """
+
+    @abstractmethod
+    async def create(self, goods_ids: List[GoodsID]) -> SeedJobEntity:
+        pass
+
+    @abstractmethod
+    async def find_by_id(self, job_id: IntId) -> Optional[SeedJobEntity]:
+        pass
+
+    @abstractmethod
+    async def select_tasks(
+        self, job_id: IntId, offset: int = 0, limit: int = 100
+    ) -> List[ScrapeTaskEntity]:
+        pass
+
+    @abstractmethod
+    async def take_task(
+        self,
+        worker_id: str,
+        lease_time: float,
+        has_retries: bool = True,
+        max_attempts: Optional[int] = None,
+    ) -> Optional[ScrapeTaskEntity]:
+        pass
+
+    @abstractmethod
+    async def extend_lease(
+        self, task: ScrapeTaskEntity, worker_id: str, lease_time: float
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    async def finish_task(
+        self,
+        task: ScrapeTaskEntity,
+        worker_id: str,
+        status: ScrapeTaskStatus,
+        error: Optional[str] = None,
+        next_attempt_at: Optional[datetime] = None,
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    async def release_tasks(self, worker_id: str) -> int:
+        pass
+
+    @abstractmethod
+    async def add_retry_task(
+        self, goods_id: GoodsID, error: str, next_attempt_at: datetime
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    async def select_dead_tasks(
+        self, offset: int = 0, limit: int = 100
+    ) -> List[ScrapeTaskEntity]:
+        pass
+
+    @abstractmethod
+    async def count_dead_tasks(self) -> int:
+        pass
+
+    @abstractmethod
+    async def requeue_dead_tasks(
+        self, goods_ids: Optional[List[GoodsID]] = None
+    ) -> int:
+        pass
+
+    @abstractmethod
+    @asynccontextmanager
+    async def atomic(self):
+        pass
+
+
+class GinoSeedJobRepository(SeedJobRepository):
+    model = SeedJobModel
+    task_model = ScrapeTaskModel
+
+    async def create(self, goods_ids: List[GoodsID]) -> SeedJobEntity:
+        async with self.atomic():
+            job = await self.model.create(total=len(goods_ids))
+            await self.task_model.bulk_create(
+                [
+                    self.task_model(
+                        job=job,
+                        goods_id=goods_id,
+                        status=ScrapeTaskStatus.PENDING.value,
+                    )
+                    for goods_id in goods_ids
+                ],
+                batch_size=INSERT_BATCH_SIZE,
+            )
+        logger.debug(f'Create seed job {job.id} with {len(goods_ids)} goods ids')
+        return SeedJobEntity(
+            id=job.id,
+            created_at=job.created_at,
+            modified_at=job.modified_at,
+            total=job.total,
+            pending=job.total,
+        )
+
+    async def find_by_id(self, job_id: IntId) -> Optional[SeedJobEntity]:
+        job = await self.model.get_or_none(id=job_id)
+        if not job:
+            return None
+        status_counts = {
+            task_data['status']: task_data['count']
+            for task_data in await self.task_model.filter(job_id=job_id)
+            .annotate(count=Count('id'))
+            .group_by('status')
+            .values('status', 'count')
+        }
+        job_data = SeedJobEntity(
+            id=job.id,
+            created_at=job.created_at,
+            modified_at=job.modified_at,
+            total=job.total,
+            **{
+                status.value: status_counts.get(status.value, 0)
+                for status in ScrapeTaskStatus
+            },
+        )
+        if job_data.finished >= job_data.total:
+            job_data.status = SeedJobStatus.DONE
+        elif job_data.finished or job_data.running:
+            job_data.status = SeedJobStatus.RUNNING
+        return job_data
+
+    async def select_tasks(
+        self, job_id: IntId, offset: int = 0, limit: int = 100
+    ) -> List[ScrapeTaskEntity]:
+        tasks = (
+            await self.task_model.filter(job_id=job_id)
+            .order_by('id')
+            .offset(offset)
+            .limit(limit)
+        )
+        return [ScrapeTaskEntity.from_orm(task) for task in tasks]
+
+    async def take_task(
+        self,
+        worker_id: str,
+        lease_time: float,
+        has_retries: bool = True,
+        max_attempts: Optional[int] = None,
+    ) -> Optional[ScrapeTaskEntity]:
+        """
+        Lease the oldest pending task or running task with expired lease of dead worker.
+
+        Fresh tasks go before retries of failed ones, retries are skipped without has_retries.
+        Rows locked by other workers are skipped, so workers never wait for each other.
+        Expired lease counts as failed attempt, task out of max_attempts is failed instead.
+        """
+        now = utc_now()
+        async with self.atomic():
+            query = self.task_model.filter(
+                Q(
+                    Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+                    status=ScrapeTaskStatus.PENDING.value,
+                )
+                | Q(status=ScrapeTaskStatus.RUNNING.value, leased_until__lt=now)
+            )
+            if not has_retries:
+                query = query.filter(attempts=0)
+            while True:
+                task = (
+                    await query.order_by('attempts', 'id')
+                    .select_for_update(skip_locked=True)
+                    .first()
+                )
+                if not task:
+                    return None
+                if task.status != ScrapeTaskStatus.RUNNING.value:
+                    break
+                if not await self._expire_lease(task, max_attempts):
+                    break
+            task.status = ScrapeTaskStatus.RUNNING.value
+            task.worker_id = worker_id
+            task.leased_until = now + timedelta(seconds=lease_time)
+            await task.save(
+                update_fields=['status', 'worker_id', 'leased_until', 'modified_at']
+            )
+        return ScrapeTaskEntity.from_orm(task)
+
+    async def _expire_lease(
+        self, task: ScrapeTaskModel, max_attempts: Optional[int] = None
+    ) -> bool:
+        """
+        Count attempt of dead worker on locked task, True if task is failed by it.
+        """
+        error = f'Lease of {task.worker_id} expired'
+        task.attempts += 1
+        is_failed = max_attempts is not None and task.attempts >= max_attempts
+        if is_failed:
+            logger.warning(
+                f'Fail task {task.id} after {task.attempts} attempts: {error}'
+            )
+        else:
+            logger.info(f'Take task {task.id} with expired lease of {task.worker_id}')
+        update_data: dict = {'attempts': F('attempts') + 1, 'error': error}
+        if is_failed:
+            update_data.update(
+                status=ScrapeTaskStatus.FAILED.value,
+                leased_until=None,
+                modified_at=utc_now(),
+            )
+        await self.task_model.filter(id=task.id).update(**update_data)
+        return is_failed
+
+    async def extend_lease(
+        self, task: ScrapeTaskEntity, worker_id: str, lease_time: float
+    ) -> bool:
+        """
+        Heartbeat of running task, False if lease was taken over by other worker.
+        """
+        return bool(
+            await self.task_model.filter(
+                id=task.get_id(),
+                worker_id=worker_id,
+                status=ScrapeTaskStatus.RUNNING.value,
+            ).update(leased_until=utc_now() + timedelta(seconds=lease_time))
+        )
+
+    async def finish_task(
+        self,
+        task: ScrapeTaskEntity,
+        worker_id: str,
+        status: ScrapeTaskStatus,
+        error: Optional[str] = None,
+        next_attempt_at: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Save result of attempt, pending status with next_attempt_at schedules retry.
+        """
+        return bool(
+            await self.task_model.filter(
+                id=task.get_id(),
+                worker_id=worker_id,
+                status=ScrapeTaskStatus.RUNNING.value,
+            ).update(
+                status=status.value,
+                error=error[:ERROR_MAX_LENGTH] if error else None,
+                attempts=F('attempts') + 1,
+                next_attempt_at=next_attempt_at,
+                leased_until=None,
+                modified_at=utc_now(),
+            )
+        )
+
+    async def release_tasks(self, worker_id: str) -> int:
+        """
+        Return running tasks of stopped worker into queue without waiting of lease expiring.
+        """
+        return await self.task_model.filter(
+            worker_id=worker_id, status=ScrapeTaskStatus.RUNNING.value
+        ).update(
+            status=ScrapeTaskStatus.PENDING.value,
+            leased_until=None,
+            modified_at=utc_now(),
+        )
+
+    async def add_retry_task(
+        self, goods_id: GoodsID, error: str, next_attempt_at: datetime
+    ) -> bool:
+        """
+        Schedule retry of goods failed out of seed jobs, False if it is already queued.
+        """
+        try:
+            async with self.atomic():
+                if await self.task_model.filter(
+                    job_id=None,
+                    goods_id=goods_id,
+                    status__in=[
+                        ScrapeTaskStatus.PENDING.value,
+                        ScrapeTaskStatus.RUNNING.value,
+                    ],
+                ).exists():
+                    return False
+                await self.task_model.create(
+                    goods_id=goods_id,
+                    status=ScrapeTaskStatus.PENDING.value,
+                    error=error[:ERROR_MAX_LENGTH],
+                    attempts=1,
+                    next_attempt_at=next_attempt_at,
+                )
+        except IntegrityError:  # concurrent failure of the same goods queued it first
+            logger.debug(f'Retry of goods id {goods_id} is already queued')
+            return False
+        return True
+
+    async def select_dead_tasks(
+        self, offset: int = 0, limit: int = 100
+    ) -> List[ScrapeTaskEntity]:
+        tasks = (
+            await self.task_model.filter(status=ScrapeTaskStatus.FAILED.value)
+            .order_by('-modified_at')
+            .offset(offset)
+            .limit(limit)
+        )
+        return [ScrapeTaskEntity.from_orm(task) for task in tasks]
+
+    async def count_dead_tasks(self) -> int:
+        return await self.task_model.filter(
+            status=ScrapeTaskStatus.FAILED.value
+        ).count()
+
+    async def requeue_dead_tasks(
+        self, goods_ids: Optional[List[GoodsID]] = None
+    ) -> int:
+        """
+        Queue failed tasks again with fresh attempts, all of them if goods ids are not set.
+        """
+        query = self.task_model.filter(status=ScrapeTaskStatus.FAILED.value)
+        if goods_ids:
+            query = query.filter(goods_id__in=goods_ids)
+        return await query.update(
+            status=ScrapeTaskStatus.PENDING.value,
+            attempts=0,
+            next_attempt_at=None,
+            modified_at=utc_now(),
+        )
+
+    @asynccontextmanager
+    async def atomic(self):
+        transaction_ctx = transactions.in_transaction()
+        async with transaction_ctx:
+            yield
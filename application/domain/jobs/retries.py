@@ -0,0 +1,63 @@
+"""
+Retries of failed scrape tasks with exponential backoff in off-peak hours.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from common.utils import utc_now
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_DELAY = 60.0  # sec, delay after the first failure
+DEFAULT_MAX_DELAY = 6 * 3600.0  # sec
+
+
+def parse_hours(hours: str) -> Optional[tuple[int, int]]:
+    """
+    Get start and end hour from 'start-end' utc hours window, None for empty window.
+    """
+    if not hours.strip():
+        return None
+    start, _, end = hours.partition('-')
+    window = (int(start), int(end))
+    if not all(0 <= hour <= 24 for hour in window):
+        raise ValueError(f'Wrong hours window: {hours}')
+    return window
+
+
+class RetryPolicy:
+    """
+    Failed task is scheduled again until max attempts, then it stays in dead-letter set.
+
+    Retries are taken only in off-peak hours window, fresh tasks go first in any time.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        delay: float = DEFAULT_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        hours: str = '',
+    ):
+        self.max_attempts = max_attempts
+        self.delay = delay
+        self.max_delay = max_delay
+        self.hours = parse_hours(hours)
+
+    def get_next_attempt_at(self, attempts: int) -> Optional[datetime]:
+        """
+        Get time of retry after given count of failed attempts, None if task is dead.
+        """
+        if attempts >= self.max_attempts:
+            return None
+        return utc_now() + timedelta(
+            seconds=min(self.delay * 2 ** max(attempts - 1, 0), self.max_delay)
+        )
+
+    def is_off_peak(self, now: Optional[datetime] = None) -> bool:
+        if self.hours is None:
+            return True
+        hour = (now or utc_now()).hour
+        start, end = self.hours
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end  # window over midnight
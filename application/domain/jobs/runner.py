@@ -0,0 +1,161 @@
+"""
+Background scraping of seed job tasks.
+"""
+import asyncio
+import os
+import socket
+from contextlib import suppress
+from typing import Optional
+
+from loguru import logger
+
+from common.errors import NotFoundError
+from common.metrics import metrics
+from domain.goods import ProductInfoService
+from .entities import ScrapeTaskEntity
+from .repositories import SeedJobRepository
+from .retries import RetryPolicy
+from .types import ScrapeTaskStatus
+
+DEFAULT_CONCURRENCY = 1
+DEFAULT_POLL_INTERVAL = 5.0  # sec, waiting of new tasks in empty queue
+DEFAULT_LEASE_TIME = 300.0  # sec, task of worker without heartbeats is taken by others
+HEARTBEATS_PER_LEASE = 3
+
+
+def get_worker_id(prefix: str = 'worker') -> str:
+    return f'{prefix}-{socket.gethostname()}-{os.getpid()}'
+
+
+class SeedJobRunner:
+    """
+    Lease pending tasks of seed jobs from db and scrape them, at most concurrency at once.
+
+    Any number of runners in api and worker processes share the queue. Leases of running
+    tasks are extended by heartbeats, tasks of crashed runners are taken by others after
+    lease expiring and tasks of stopped runners are returned into queue at once.
+    Failed tasks are retried by retry policy and stay in dead-letter set after the last attempt.
+    """
+
+    def __init__(
+        self,
+        seed_job_repo: SeedJobRepository,
+        product_info_service: ProductInfoService,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        lease_time: float = DEFAULT_LEASE_TIME,
+        worker_id: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.seed_job_repo = seed_job_repo
+        self.product_info_service = product_info_service
+        self.concurrency = max(concurrency, 1)
+        self.poll_interval = poll_interval
+        self.lease_time = lease_time
+        self.worker_id = worker_id or get_worker_id()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._task: Optional[asyncio.Task] = None
+        self._scrapes: set[asyncio.Task] = set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def run(self):
+        """
+        Scrape tasks until cancelled, running tasks are returned into queue on cancel.
+        """
+        logger.info(f'Start seed job runner {self.worker_id}')
+        slots = asyncio.Semaphore(self.concurrency)
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    task = await self.seed_job_repo.take_task(
+                        self.worker_id,
+                        self.lease_time,
+                        has_retries=self.retry_policy.is_off_peak(),
+                        max_attempts=self.retry_policy.max_attempts,
+                    )
+                except Exception:
+                    slots.release()
+                    logger.exception('Cannot take seed job task')
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                if task is None:
+                    slots.release()
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                scrape = asyncio.create_task(self.run_task(task))
+                self._scrapes.add(scrape)
+                scrape.add_done_callback(self._scrapes.discard)
+                scrape.add_done_callback(lambda _: slots.release())
+        finally:
+            for scrape in self._scrapes:
+                scrape.cancel()
+            await asyncio.gather(*self._scrapes, return_exceptions=True)
+            if released := await self.seed_job_repo.release_tasks(self.worker_id):
+                logger.info(
+                    f'Return {released} seed job tasks of {self.worker_id} into queue'
+                )
+
+    async def run_task(self, task: ScrapeTaskEntity):
+        """
+        Scrape and save goods of task under lease, failed task is retried with backoff.
+        """
+        heartbeat = asyncio.create_task(self._keep_lease(task))
+        try:
+            status, error = await self._scrape(task)
+        finally:
+            heartbeat.cancel()
+        next_attempt_at = None
+        if status == ScrapeTaskStatus.FAILED:
+            next_attempt_at = self.retry_policy.get_next_attempt_at(task.attempts + 1)
+            if next_attempt_at:
+                status = ScrapeTaskStatus.PENDING
+        if not await self.seed_job_repo.finish_task(
+            task, self.worker_id, status, error, next_attempt_at
+        ):
+            logger.warning(f'Lease of task {task.id} was taken over, result is dropped')
+            return
+        if next_attempt_at:
+            logger.info(f'Retry goods id {task.goods_id} at {next_attempt_at}: {error}')
+            metrics.increment('seed_jobs.tasks.retried')
+            return
+        metrics.increment(f'seed_jobs.tasks.{status.value}')
+
+    async def _scrape(
+        self, task: ScrapeTaskEntity
+    ) -> tuple[ScrapeTaskStatus, Optional[str]]:
+        try:
+            await self.product_info_service.register_provider_product_info(
+                task.goods_id
+            )
+        except NotFoundError as err:
+            return ScrapeTaskStatus.FAILED, str(err)
+        except Exception as err:
+            logger.exception(f'Seed job task for goods id {task.goods_id} failed')
+            return ScrapeTaskStatus.FAILED, str(err) or type(err).__name__
+        return ScrapeTaskStatus.DONE, None
+
+    async def _keep_lease(self, task: ScrapeTaskEntity):
+        while True:
+            await asyncio.sleep(self.lease_time / HEARTBEATS_PER_LEASE)
+            try:
+                if not await self.seed_job_repo.extend_lease(
+                    task, self.worker_id, self.lease_time
+                ):
+                    logger.warning(
+                        f'Lost lease of task {task.id} for goods id {task.goods_id}'
+                    )
+                    return
+            except Exception:
+                logger.exception(f'Cannot extend lease of task {task.id}')
@@ -0,0 +1,96 @@
+from typing import Iterable, Optional
+
+from loguru import logger
+
+from domain.goods import GoodsID, ProductRepository
+from .entities import ScrapeTaskEntity, ScrapeTaskResult, SeedJobEntity
+from .repositories import SeedJobRepository
+from .retries import RetryPolicy
+from .types import ScrapeTaskStatus
+from ..types import IntId, Service
+
+
+class SeedJobService(Service):
+    def __init__(
+        self,
+        seed_job_repo: SeedJobRepository,
+        product_repo: ProductRepository,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        self.seed_job_repo = seed_job_repo
+        self.product_repo = product_repo
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    async def submit(self, goods_ids: Iterable[GoodsID]) -> SeedJobEntity:
+        """
+        Save job with goods ids for scraping in background, duplicates are dropped.
+        """
+        job = await self.seed_job_repo.create(list(dict.fromkeys(goods_ids)))
+        logger.info(f'Submit seed job {job.id} with {job.total} goods ids')
+        return job
+
+    async def get_job(self, job_id: IntId) -> Optional[SeedJobEntity]:
+        return await self.seed_job_repo.find_by_id(job_id)
+
+    async def get_results(
+        self, job_id: IntId, offset: int = 0, limit: int = 100
+    ) -> list[ScrapeTaskResult]:
+        """
+        Get page of job tasks in submit order with saved products of done tasks.
+        """
+        tasks = await self.seed_job_repo.select_tasks(
+            job_id, offset=offset, limit=limit
+        )
+        done_goods_ids = [
+            task.goods_id for task in tasks if task.status == ScrapeTaskStatus.DONE
+        ]
+        products = {
+            product.goods_id: product
+            for product in (
+                await self.product_repo.select_by_goods_ids(done_goods_ids)
+                if done_goods_ids
+                else []
+            )
+        }
+        return [
+            ScrapeTaskResult(
+                goods_id=task.goods_id,
+                status=task.status,
+                error=task.error,
+                attempts=task.attempts,
+                product=(
+                    products.get(task.goods_id)
+                    if task.status == ScrapeTaskStatus.DONE
+                    else None
+                ),
+            )
+            for task in tasks
+        ]
+
+    async def record_failure(self, goods_id: GoodsID, error: str):
+        """
+        Schedule retry of goods failed out of seed jobs by runners.
+        """
+        next_attempt_at = self.retry_policy.get_next_attempt_at(1)
+        if next_attempt_at and await self.seed_job_repo.add_retry_task(
+            goods_id, error, next_attempt_at
+        ):
+            logger.info(f'Schedule retry of goods id {goods_id} at {next_attempt_at}')
+
+    async def get_dead_tasks(
+        self, offset: int = 0, limit: int = 100
+    ) -> tuple[list[ScrapeTaskEntity], int]:
+        """
+        Get page of tasks failed all attempts, the latest first, and their total count.
+        """
+        return (
+            await self.seed_job_repo.select_dead_tasks(offset=offset, limit=limit),
+            await self.seed_job_repo.count_dead_tasks(),
+        )
+
+    async def requeue_dead_tasks(
+        self, goods_ids: Optional[list[GoodsID]] = None
+    ) -> int:
+        requeued = await self.seed_job_repo.requeue_dead_tasks(goods_ids)
+        logger.info(f'Requeue {requeued} dead tasks')
+        return requeued
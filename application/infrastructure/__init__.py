@@ -1,6 +1,8 @@
 from .system_status_checker import (
     AppState,
+    ApplicationMetrics,
     TortoiseDatabaseHeartbeat,
     HeartbeatInformation,
+    MetricsState,
     SystemInfo,
 )
@@ -4,6 +4,7 @@ from enum import IntEnum
 from loguru import logger
 from tortoise import connections
 
+from common.metrics import MetricsRegistry
 from domain.entities import EncodedModel
 
 
@@ -23,6 +24,12 @@ class AppState(EncodedModel):
     debug: bool
 
 
+class MetricsState(EncodedModel):
+    counters: dict[str, float]
+    gauges: dict[str, float]
+    observations: dict[str, dict[str, float]]
+
+
 class HeartbeatComponent:
     __metaclass__ = ABCMeta
 
@@ -61,3 +68,11 @@ class SystemInfo:
             )
         }
         return system_status
+
+
+class ApplicationMetrics:
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    async def check(self) -> MetricsState:
+        return MetricsState(**self.registry.snapshot())
@@ -0,0 +1,249 @@
+"""
+Batch scraping of goods ids from file or stdin with local browser pool.
+
+Results are streamed to NDJSON file and/or saved into database. Finished goods ids are
+appended to checkpoint file, so interrupted run started again skips them.
+
+    PYTHONPATH=application python application/scripts/batch_scrape.py \
+        --input goods_ids.txt --output products.ndjson --db --checkpoint var/batch.checkpoint
+"""
+import argparse
+import asyncio
+import signal
+import sys
+from contextlib import suppress
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Iterator, Optional, TextIO
+
+from loguru import logger
+
+from clients import parser_pool
+from common.errors import NotFoundError, ProviderError
+from common.utils import async_wrapper, shutdown_process_executor
+from config import db_config, parser_config
+from domain.factories import get_product_provider, revisit_policy, selector_ranking
+from domain.goods import (
+    GinoProductRepository,
+    GoodsID,
+    ProductEntity,
+    ProductInfoService,
+)
+from storages.databases import connect_db, disconnect_db
+
+DONE_STATUS = 'done'
+FAILED_STATUS = 'failed'
+DEFAULT_CONCURRENCY = 1
+
+
+def read_goods_ids(lines: Iterable[str]) -> Iterator[GoodsID]:
+    """
+    Get goods id per line, empty lines and # comments are skipped.
+    """
+    for line in lines:
+        if goods_id := line.split('#')[0].strip():
+            yield GoodsID(goods_id)
+
+
+class BatchCheckpoint:
+    """
+    Append only file of finished goods ids with their status.
+    """
+
+    def __init__(self, path: Path, has_failed_retry: bool = False):
+        self.path = path
+        self.has_failed_retry = has_failed_retry
+        self.finished: dict[GoodsID, str] = {}
+        self._file: Optional[TextIO] = None
+
+    def load(self) -> int:
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                goods_id, _, status = line.partition('\t')
+                if goods_id:
+                    self.finished[GoodsID(goods_id)] = status
+        return len(self.finished)
+
+    def is_finished(self, goods_id: GoodsID) -> bool:
+        status = self.finished.get(goods_id)
+        return status == DONE_STATUS or (
+            status == FAILED_STATUS and not self.has_failed_retry
+        )
+
+    def record(self, goods_id: GoodsID, status: str):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open('a')
+        self._file.write(f'{goods_id}\t{status}\n')
+        self._file.flush()
+        self.finished[goods_id] = status
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BatchScraper:
+    """
+    Scrape goods ids by workers with bounded concurrency and record every finished one.
+
+    Failed checkpoint or output writing stops the whole run.
+    """
+
+    def __init__(
+        self,
+        scrape: Callable[[GoodsID], Awaitable[ProductEntity]],
+        checkpoint: BatchCheckpoint,
+        output: Optional[TextIO] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        self.scrape = scrape
+        self.checkpoint = checkpoint
+        self.output = output
+        self.concurrency = max(concurrency, 1)
+        self.counts = {DONE_STATUS: 0, FAILED_STATUS: 0, 'skipped': 0}
+
+    async def run(self, goods_ids: Iterable[GoodsID]) -> dict[str, int]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [
+            asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)
+        ]
+        feed = asyncio.create_task(self._feed(goods_ids, queue))
+        try:
+            # workers never return, finished one has failed and queue is never drained
+            done, _ = await asyncio.wait(
+                [feed, *workers], return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
+        finally:
+            for task in [feed, *workers]:
+                task.cancel()
+            await asyncio.gather(feed, *workers, return_exceptions=True)
+        return self.counts
+
+    async def _feed(self, goods_ids: Iterable[GoodsID], queue: asyncio.Queue):
+        for goods_id in goods_ids:
+            if self.checkpoint.is_finished(goods_id):
+                self.counts['skipped'] += 1
+                continue
+            await queue.put(goods_id)
+        await queue.join()
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            goods_id = await queue.get()
+            try:
+                status = await self._scrape(goods_id)
+                self.checkpoint.record(goods_id, status)
+                self.counts[status] += 1
+                if sum(self.counts.values()) % 100 == 0:
+                    logger.info(f'Batch scraping progress: {self.counts}')
+            finally:
+                queue.task_done()
+
+    async def _scrape(self, goods_id: GoodsID) -> str:
+        try:
+            product = await self.scrape(goods_id)
+        except (NotFoundError, ProviderError) as err:
+            logger.warning(f'Cannot scrape goods id {goods_id}: {err}')
+            return FAILED_STATUS
+        except Exception:
+            logger.exception(f'Get unknown exception for goods id {goods_id}')
+            return FAILED_STATUS
+        if self.output is not None:
+            self.output.write(product.json(ensure_ascii=False) + '\n')
+            self.output.flush()  # result is written before goods id gets into checkpoint
+        return DONE_STATUS
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--input', default='-', help='File with goods id per line, - for stdin'
+    )
+    parser.add_argument('--output', type=Path, help='NDJSON file for products')
+    parser.add_argument('--db', action='store_true', help='Save products into database')
+    parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        default=Path('var/batch_scrape.checkpoint'),
+        help='File of finished goods ids for resuming',
+    )
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Scrape goods ids failed in previous runs again',
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=parser_config.pool_size,
+        help='Count of local browsers',
+    )
+    parser.add_argument(
+        '--concurrency', type=int, help='Goods scraped at once, pool size by default'
+    )
+    args = parser.parse_args()
+    if not args.output and not args.db:
+        parser.error('set --output and/or --db')
+    return args
+
+
+async def run_batch(args: argparse.Namespace, input_file: TextIO) -> dict[str, int]:
+    checkpoint = BatchCheckpoint(args.checkpoint, has_failed_retry=args.retry_failed)
+    if finished := checkpoint.load():
+        logger.info(f'Resume batch scraping, {finished} goods ids are finished')
+    output = args.output.open('a') if args.output else None
+    if args.db:
+        await connect_db(str(db_config.dsn))
+    await async_wrapper(parser_pool.init)(
+        parser_config.copy(update={'pool_size': args.pool_size})
+    )
+    product_provider = get_product_provider()
+    product_info_service = ProductInfoService(
+        product_repo=GinoProductRepository(),
+        product_provider=product_provider,
+        revisit_policy=revisit_policy,
+    )
+    scraper = BatchScraper(
+        scrape=(
+            product_info_service.register_provider_product_info
+            if args.db
+            else product_provider.get_product
+        ),
+        checkpoint=checkpoint,
+        output=output,
+        concurrency=args.concurrency or parser_pool.size or args.pool_size,
+    )
+    try:
+        return await scraper.run(read_goods_ids(input_file))
+    finally:
+        logger.info(f'Batch scraping result: {scraper.counts}')
+        checkpoint.close()
+        if output:
+            output.close()
+        await async_wrapper(parser_pool.close)()
+        shutdown_process_executor()
+        selector_ranking.save()
+        if args.db:
+            await disconnect_db()
+
+
+async def main():
+    args = get_args()
+    input_file = sys.stdin if args.input == '-' else open(args.input)
+    run_task = asyncio.create_task(run_batch(args, input_file))
+    loop = asyncio.get_running_loop()
+    # checkpoint keeps finished goods ids
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(stop_signal, run_task.cancel)
+    try:
+        with suppress(asyncio.CancelledError):
+            await run_task
+    finally:
+        input_file.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""
+Standalone scrape worker. It takes seed job tasks from db queue shared with api and other
+workers, so any number of workers could be run on any nodes with access to database.
+"""
+import asyncio
+import signal
+from contextlib import suppress
+
+from loguru import logger
+
+from clients import parser_pool
+from common.utils import async_wrapper, shutdown_process_executor
+from config import application_config, db_config, parser_config
+from domain.factories import get_product_info_service, retry_policy, selector_ranking
+from domain.jobs import GinoSeedJobRepository, SeedJobRunner
+from storages.databases import connect_db, disconnect_db
+from web.core.loggings import setup_logging
+
+
+async def run_worker():
+    await connect_db(str(db_config.dsn))
+    await async_wrapper(parser_pool.init)(parser_config)
+    runner = SeedJobRunner(
+        seed_job_repo=GinoSeedJobRepository(),
+        product_info_service=get_product_info_service(),
+        concurrency=parser_config.seed_job_concurrency
+        or parser_pool.size
+        or parser_config.pool_size,
+        poll_interval=parser_config.seed_job_poll_interval,
+        lease_time=parser_config.seed_job_lease_time,
+        retry_policy=retry_policy,
+    )
+    run_task = asyncio.create_task(runner.run())
+    loop = asyncio.get_running_loop()
+    # running tasks are returned into queue
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(stop_signal, run_task.cancel)
+    try:
+        with suppress(asyncio.CancelledError):
+            await run_task
+    finally:
+        logger.info(f'Stop seed job runner {runner.worker_id}')
+        await async_wrapper(parser_pool.close)()
+        shutdown_process_executor()
+        selector_ranking.save()
+        await disconnect_db()
+
+
+if __name__ == '__main__':
+    setup_logging(debug=application_config.is_debug)
+    asyncio.run(run_worker())
@@ -1,7 +1,10 @@
-from .connector import init_db
+from .connector import connect_db, disconnect_db, init_db
 from .models import (
     Product as ProductModel,
     ProductAttribute as ProductAttributeModel,
     Category as CategoryModel,
     ProductImage as ProductImageModel,
+    ProductSitemapEntry as ProductSitemapEntryModel,
+    ScrapeTask as ScrapeTaskModel,
+    SeedJob as SeedJobModel,
 )
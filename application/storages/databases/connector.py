@@ -2,6 +2,7 @@ from copy import deepcopy
 from typing import Optional
 
 from fastapi import FastAPI
+from tortoise import Tortoise
 from tortoise.contrib.fastapi import register_tortoise
 from config import db_config
 
@@ -30,3 +31,17 @@ def init_db(app: FastAPI, dsn: Optional[str] = None):
         generate_schemas=True,  # TODO: set False if use migrations from zero
         add_exception_handlers=False,
     )
+
+
+async def connect_db(dsn: Optional[str] = None):
+    """
+    Open connections outside of web application, for workers and scripts.
+    """
+    config: dict[str, dict] = deepcopy(DEFAULT_TORTOISE_ORM_CONFIG)  # type: ignore[arg-type]
+    if dsn:
+        config['connections']['default'] = dsn
+    await Tortoise.init(config=config)
+
+
+async def disconnect_db():
+    await Tortoise.close_connections()
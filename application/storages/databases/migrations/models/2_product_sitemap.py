@@ -0,0 +1,21 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "product_sitemap_entry" (
+            "id" SERIAL NOT NULL PRIMARY KEY,
+            "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+            "modified_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+            "goods_id" VARCHAR(128) NOT NULL UNIQUE,
+            "url" VARCHAR(1024) NOT NULL,
+            "lastmod" TIMESTAMPTZ
+        );
+        CREATE INDEX IF NOT EXISTS "idx_product_sit_goods_i_5b1d0e" ON "product_sitemap_entry" ("goods_id");
+    """
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "product_sitemap_entry";
+    """
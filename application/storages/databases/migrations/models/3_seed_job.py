@@ -0,0 +1,32 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "seed_job" (
+            "id" SERIAL NOT NULL PRIMARY KEY,
+            "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+            "modified_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+            "total" INT NOT NULL  DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS "scrape_task" (
+            "id" SERIAL NOT NULL PRIMARY KEY,
+            "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+            "modified_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+            "goods_id" VARCHAR(128) NOT NULL,
+            "status" VARCHAR(16) NOT NULL,
+            "error" VARCHAR(1024),
+            "job_id" INT REFERENCES "seed_job" ("id") ON DELETE CASCADE
+        );
+        CREATE INDEX IF NOT EXISTS "idx_scrape_task_goods_i_4e1f2a" ON "scrape_task" ("goods_id");
+        CREATE INDEX IF NOT EXISTS "idx_scrape_task_status_9c3b71" ON "scrape_task" ("status");
+        CREATE INDEX IF NOT EXISTS "idx_scrape_task_job_id_d2a86e" ON "scrape_task" ("job_id");
+        CREATE UNIQUE INDEX IF NOT EXISTS "uid_scrape_task_job_id_7f05c4" ON "scrape_task" ("job_id", "goods_id");
+    """
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "scrape_task";
+        DROP TABLE IF EXISTS "seed_job";
+    """
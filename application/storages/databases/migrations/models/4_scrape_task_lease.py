@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "scrape_task" ADD "worker_id" VARCHAR(128);
+        ALTER TABLE "scrape_task" ADD "leased_until" TIMESTAMPTZ;
+        CREATE INDEX IF NOT EXISTS "idx_scrape_task_leased__0b8e5d" ON "scrape_task" ("leased_until");
+    """
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_scrape_task_leased__0b8e5d";
+        ALTER TABLE "scrape_task" DROP COLUMN "leased_until";
+        ALTER TABLE "scrape_task" DROP COLUMN "worker_id";
+    """
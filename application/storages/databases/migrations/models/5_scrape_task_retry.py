@@ -0,0 +1,20 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "scrape_task" ADD "attempts" INT NOT NULL  DEFAULT 0;
+        ALTER TABLE "scrape_task" ADD "next_attempt_at" TIMESTAMPTZ;
+        CREATE INDEX IF NOT EXISTS "idx_scrape_task_next_at_61c2f9" ON "scrape_task" ("next_attempt_at");
+        CREATE UNIQUE INDEX IF NOT EXISTS "uid_scrape_task_retry_goods_i_b84e0d" ON "scrape_task" ("goods_id")
+            WHERE "job_id" IS NULL AND "status" IN ('pending', 'running');
+    """
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "uid_scrape_task_retry_goods_i_b84e0d";
+        DROP INDEX IF EXISTS "idx_scrape_task_next_at_61c2f9";
+        ALTER TABLE "scrape_task" DROP COLUMN "next_attempt_at";
+        ALTER TABLE "scrape_task" DROP COLUMN "attempts";
+    """
@@ -0,0 +1,28 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "product" ADD "checked_at" TIMESTAMPTZ;
+        ALTER TABLE "product" ADD "first_checked_at" TIMESTAMPTZ;
+        ALTER TABLE "product" ADD "checks" INT NOT NULL  DEFAULT 0;
+        ALTER TABLE "product" ADD "changes" INT NOT NULL  DEFAULT 0;
+        ALTER TABLE "product" ADD "revisit_interval" DOUBLE PRECISION;
+        ALTER TABLE "product" ADD "next_revisit_at" TIMESTAMPTZ;
+        UPDATE "product" SET "checked_at" = "modified_at";
+        CREATE INDEX IF NOT EXISTS "idx_product_checked_5f0c1e" ON "product" ("checked_at");
+        CREATE INDEX IF NOT EXISTS "idx_product_next_re_8a3d42" ON "product" ("next_revisit_at");
+    """
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_product_next_re_8a3d42";
+        DROP INDEX IF EXISTS "idx_product_checked_5f0c1e";
+        ALTER TABLE "product" DROP COLUMN "next_revisit_at";
+        ALTER TABLE "product" DROP COLUMN "revisit_interval";
+        ALTER TABLE "product" DROP COLUMN "changes";
+        ALTER TABLE "product" DROP COLUMN "checks";
+        ALTER TABLE "product" DROP COLUMN "first_checked_at";
+        ALTER TABLE "product" DROP COLUMN "checked_at";
+    """
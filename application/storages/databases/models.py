@@ -19,6 +19,13 @@ class Product(BaseModel):
     goods_id = fields.CharField(max_length=128, index=True, unique=True)
     name = fields.CharField(max_length=1024)
     price = fields.DecimalField(max_digits=10, decimal_places=2)
+    checked_at = fields.DatetimeField(null=True, index=True)
+    first_checked_at = fields.DatetimeField(null=True)
+    checks = fields.IntField(default=0)
+    changes = fields.IntField(default=0)
+    revisit_interval = fields.FloatField(null=True)
+    next_revisit_at = fields.DatetimeField(null=True, index=True)
+    content_hash = fields.CharField(max_length=64, null=True)
 
     attributes: fields.ReverseRelation['ProductAttribute']
     categories: fields.ManyToManyRelation['Category']
@@ -83,3 +90,48 @@ class ProductImage(BaseModel):
 
     def __str__(self):
         return self.name
+
+
+class ProductSitemapEntry(BaseModel):
+    goods_id = fields.CharField(max_length=128, index=True, unique=True)
+    url = fields.CharField(max_length=1024)
+    lastmod = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = 'product_sitemap_entry'
+
+    def __str__(self):
+        return self.goods_id
+
+
+class SeedJob(BaseModel):
+    total = fields.IntField(default=0)
+
+    tasks: fields.ReverseRelation['ScrapeTask']
+
+    class Meta:
+        table = 'seed_job'
+
+    def __str__(self):
+        return f'Seed job {self.id}'
+
+
+class ScrapeTask(BaseModel):
+    job: fields.ForeignKeyNullableRelation[SeedJob] = fields.ForeignKeyField(
+        'models.SeedJob', related_name='tasks', null=True, index=True
+    )
+    goods_id = fields.CharField(max_length=128, index=True)
+    status = fields.CharField(max_length=16, index=True)
+    error = fields.CharField(max_length=1024, null=True)
+    worker_id = fields.CharField(max_length=128, null=True)
+    leased_until = fields.DatetimeField(null=True, index=True)
+    attempts = fields.IntField(default=0)
+    next_attempt_at = fields.DatetimeField(null=True, index=True)
+
+    class Meta:
+        table = 'scrape_task'
+        # queued retry of goods out of jobs is unique by partial index of migration
+        unique_together = (('job', 'goods_id'),)
+
+    def __str__(self):
+        return self.goods_id
@@ -11,7 +11,7 @@ from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 
 from clients import parser_pool
 from common.errors import EntityError, ProviderError, RepositoryError, ServiceError
-from common.utils import async_wrapper
+from common.utils import async_wrapper, shutdown_process_executor
 from config import (
     application_config,
     db_config,
@@ -19,6 +19,7 @@ from config import (
     openapi_config,
     sentry_config,
 )
+from domain.factories import selector_ranking
 from storages.databases import init_db
 from web.core.exception_handlers import (
     HTTP_422_UNPROCESSABLE_ENTITY,
@@ -37,6 +38,11 @@ from web.core.middlewares import (
     request_logging_middleware,
 )
 from web.routers import base_router as routers
+from web.routers.api.endpoints.parser.deps import (
+    refresh_scheduler,
+    seed_job_runner,
+    synthetic_canary,
+)
 
 
 setup_logging(debug=application_config.is_debug)
@@ -88,6 +94,12 @@ async def startup():
     Startups scripts
     """
     await async_wrapper(parser_pool.init)(parser_config)
+    if synthetic_canary:
+        synthetic_canary.start()
+    if seed_job_runner:
+        seed_job_runner.start()
+    if refresh_scheduler:
+        refresh_scheduler.start()
 
 
 @app.on_event('shutdown')
@@ -95,7 +107,15 @@ async def shutdown():
     """
     Shutdown scripts
     """
+    if synthetic_canary:
+        await synthetic_canary.stop()
+    if seed_job_runner:
+        await seed_job_runner.stop()
+    if refresh_scheduler:
+        await refresh_scheduler.stop()
     await async_wrapper(parser_pool.close)()
+    shutdown_process_executor()
+    selector_ranking.save()
 
 
 @app.get('/')
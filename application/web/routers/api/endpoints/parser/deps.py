@@ -1,18 +1,106 @@
-from clients import parser_pool
+from clients import parser_pool, SitemapReader
+from config import parser_config
+from domain.factories import (
+    get_product_info_service,
+    get_product_provider,
+    has_snapshot_extraction,
+    retry_policy,
+)
 from domain.goods import (
+    FreshnessPolicy,
     GinoProductRepository,
-    SberMegaMarketProductProvider,
+    GinoProductSitemapRepository,
+    GoodsID,
     ProductInfoService,
+    ProductSitemapService,
+    RefreshScheduler,
+    ScrapePipeline,
+    SyntheticCanary,
+)
+from domain.jobs import (
+    GinoSeedJobRepository,
+    SeedJobRunner,
+    SeedJobService,
+    get_worker_id,
 )
-from config import application_config, parser_config
 
 
 async def get_product_parser_service() -> ProductInfoService:
-    return ProductInfoService(
-        product_repo=GinoProductRepository(),
-        product_provider=SberMegaMarketProductProvider(
-            parser_pool=parser_pool,
-            base_url=parser_config.url,
-            debug=application_config.is_debug,
+    return get_product_info_service()
+
+
+synthetic_canary = (
+    SyntheticCanary(
+        product_info_service=get_product_info_service(),
+        goods_ids=[
+            GoodsID(goods_id.strip())
+            for goods_id in parser_config.canary_goods_ids.split(',')
+            if goods_id.strip()
+        ],
+        interval=parser_config.canary_interval,
+        history_size=parser_config.canary_history_size,
+    )
+    if parser_config.canary_goods_ids.strip()
+    else None
+)  # started with application
+
+
+refresh_scheduler = (
+    RefreshScheduler(
+        product_info_service=get_product_info_service(),
+        policy=FreshnessPolicy(
+            max_age=parser_config.refresh_max_age, targets=parser_config.refresh_targets
         ),
+        pool_size=parser_config.pool_size,
+        share=parser_config.refresh_share,
+        interval=parser_config.refresh_interval,
+        batch_size=parser_config.refresh_batch_size,
+    )
+    if parser_config.has_refresh_scheduler
+    else None
+)  # started with application
+
+
+seed_job_runner = (
+    SeedJobRunner(
+        seed_job_repo=GinoSeedJobRepository(),
+        product_info_service=get_product_info_service(),
+        concurrency=parser_config.seed_job_concurrency or parser_config.pool_size,
+        poll_interval=parser_config.seed_job_poll_interval,
+        lease_time=parser_config.seed_job_lease_time,
+        worker_id=get_worker_id('api'),
+        retry_policy=retry_policy,
+    )
+    if parser_config.has_seed_job_runner
+    else None
+)  # started with application
+
+
+async def get_seed_job_service() -> SeedJobService:
+    return SeedJobService(
+        seed_job_repo=GinoSeedJobRepository(),
+        product_repo=GinoProductRepository(),
+        retry_policy=retry_policy,
+    )
+
+
+async def get_product_sitemap_service() -> ProductSitemapService:
+    return ProductSitemapService(
+        sitemap_repo=GinoProductSitemapRepository(),
+        product_repo=GinoProductRepository(),
+        product_provider=get_product_provider(),
+        sitemap_reader=SitemapReader(),
+    )
+
+
+async def get_scrape_pipeline() -> ScrapePipeline:
+    return ScrapePipeline(
+        product_info_service=await get_product_parser_service(),
+        sitemap_repo=GinoProductSitemapRepository(),
+        fetch_concurrency=parser_pool.size or parser_config.pool_size,
+        parse_concurrency=parser_config.parse_workers,
+        queue_size=parser_config.pipeline_queue_size,
+        persist_batch_size=parser_config.pipeline_batch_size,
+        failure_handler=(await get_seed_job_service()).record_failure,
+        has_snapshot_extraction=has_snapshot_extraction,
     )
@@ -1,16 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+import asyncio
+
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    UploadFile,
+)
+from loguru import logger
 
 from common.cache import async_cache
+from common.errors import ClientError, NotFoundError
 from common.utils import duration_measure, gather_tasks
-from domain.goods import CategoryName, GoodsID, ProductInfoService
-from .deps import get_product_parser_service
+from config import parser_config
+from domain.goods import (
+    CategoryName,
+    GoodsID,
+    ProductField,
+    ProductInfoService,
+    ProductSitemapService,
+    ScrapePipeline,
+)
+from domain.jobs import SeedJobService
+from domain.types import IntId
+from .deps import (
+    get_product_parser_service,
+    get_product_sitemap_service,
+    get_scrape_pipeline,
+    get_seed_job_service,
+)
 from .schemas import (
+    DeadLettersRequeueRequest,
+    DeadLettersRequeueResponse,
+    DeadLettersResponse,
     ProductManualUploadRequest,
     ProductManualUploadResponse,
     ProductSeedRequest,
     ProductSeedResponse,
+    ProductSitemapIngestResponse,
     ProductInfoCountResponse,
     ProductsInfoResponse,
+    SeedJobRequest,
+    SeedJobResponse,
+    SeedJobResultsResponse,
 )
 
 router = APIRouter()
@@ -46,25 +81,142 @@ async def manual_upload_products(
 @router.post('/seed_data', response_model=ProductSeedResponse)
 async def seed_product_info(
     *,
-    product_info_service: ProductInfoService = Depends(get_product_parser_service),
+    scrape_pipeline: ScrapePipeline = Depends(get_scrape_pipeline),
     goods_ids_data: ProductSeedRequest,
 ) -> ProductsInfoResponse:
     """
     Update goods data for list of goods ids. Forcefully update records in db.
     """
-    goods_ids = goods_ids_data.data.goods_ids
-    products_seed_tasks = [
-        product_info_service.register_provider_product_info(goods_id)
-        for goods_id in set(goods_ids)
-    ]
-    results = await duration_measure(gather_tasks)(
-        products_seed_tasks,
-        timeout=MIN * len(products_seed_tasks),
+    goods_ids = set(goods_ids_data.data.goods_ids)
+    results = await asyncio.wait_for(
+        duration_measure(scrape_pipeline.run)(goods_ids),
+        timeout=MIN * max(len(goods_ids), 1),
     )
 
     return ProductsInfoResponse(data=results)
 
 
+async def scrape_products_info(
+    scrape_pipeline: ScrapePipeline, goods_ids: list[GoodsID]
+):
+    """
+    Scrape goods data through staged pipeline without collecting results.
+    """
+    await scrape_pipeline.run(goods_ids, has_results=False)
+
+
+async def ingest_sitemap(
+    product_sitemap_service: ProductSitemapService,
+    scrape_pipeline: ScrapePipeline,
+    source: str,
+):
+    """
+    Read sitemap and scrape new or changed products batch by batch.
+    """
+
+    async def schedule(goods_ids: list[GoodsID]):
+        await scrape_products_info(scrape_pipeline, goods_ids)
+
+    try:
+        await duration_measure(product_sitemap_service.ingest)(
+            source=source, schedule=schedule
+        )
+    except ClientError as err:
+        logger.warning(f'Sitemap ingest failed: {err}')
+
+
+@router.post('/sitemap', response_model=ProductSitemapIngestResponse, status_code=202)
+async def ingest_product_sitemap(
+    *,
+    background_tasks: BackgroundTasks,
+    product_sitemap_service: ProductSitemapService = Depends(
+        get_product_sitemap_service
+    ),
+    scrape_pipeline: ScrapePipeline = Depends(get_scrape_pipeline),
+) -> ProductSitemapIngestResponse:
+    """
+    Collect goods ids from sitemap and scrape new or changed products in background.
+    """
+    background_tasks.add_task(
+        ingest_sitemap,
+        product_sitemap_service,
+        scrape_pipeline,
+        parser_config.sitemap_url,
+    )
+    return ProductSitemapIngestResponse(source=parser_config.sitemap_url)
+
+
+@router.post('/seed_jobs', response_model=SeedJobResponse, status_code=202)
+async def submit_seed_job(
+    *,
+    seed_job_service: SeedJobService = Depends(get_seed_job_service),
+    goods_ids_data: SeedJobRequest,
+) -> SeedJobResponse:
+    """
+    Save goods ids for scraping in background and return job for polling.
+    """
+    job = await seed_job_service.submit(goods_ids_data.data.goods_ids)
+    return SeedJobResponse(data=job)
+
+
+@router.get('/seed_jobs/{job_id}', response_model=SeedJobResponse)
+async def get_seed_job(
+    job_id: IntId,
+    seed_job_service: SeedJobService = Depends(get_seed_job_service),
+) -> SeedJobResponse:
+    """
+    Get status and progress of seed job.
+    """
+    job = await seed_job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Not found')
+    return SeedJobResponse(data=job)
+
+
+@router.get('/seed_jobs/{job_id}/results', response_model=SeedJobResultsResponse)
+async def get_seed_job_results(
+    job_id: IntId,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    seed_job_service: SeedJobService = Depends(get_seed_job_service),
+) -> SeedJobResultsResponse:
+    """
+    Get page of seed job results, products are set for done goods ids.
+    """
+    if not await seed_job_service.get_job(job_id):
+        raise HTTPException(status_code=404, detail='Not found')
+    results = await seed_job_service.get_results(job_id, offset=offset, limit=limit)
+    return SeedJobResultsResponse(data=results, offset=offset, limit=limit)
+
+
+@router.get('/dead_letters', response_model=DeadLettersResponse)
+async def get_dead_letters(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    seed_job_service: SeedJobService = Depends(get_seed_job_service),
+) -> DeadLettersResponse:
+    """
+    Get page of goods ids failed all scrape attempts with their last errors.
+    """
+    tasks, total = await seed_job_service.get_dead_tasks(offset=offset, limit=limit)
+    return DeadLettersResponse(data=tasks, total=total, offset=offset, limit=limit)
+
+
+@router.post('/dead_letters/requeue', response_model=DeadLettersRequeueResponse)
+async def requeue_dead_letters(
+    *,
+    seed_job_service: SeedJobService = Depends(get_seed_job_service),
+    goods_ids_data: DeadLettersRequeueRequest,
+) -> DeadLettersRequeueResponse:
+    """
+    Queue dead goods ids again with fresh attempts, all of them if goods ids are not set.
+    """
+    requeued = await seed_job_service.requeue_dead_tasks(
+        goods_ids_data.data.goods_ids or None
+    )
+    return DeadLettersRequeueResponse(requeued=requeued)
+
+
 @router.get('/{goods_id}', response_model=ProductsInfoResponse)
 async def get_product_info(
     goods_id: GoodsID,
@@ -81,6 +233,24 @@ async def get_product_info(
     return ProductsInfoResponse(data=[product_info_entity])
 
 
+@router.put('/{goods_id}', response_model=ProductsInfoResponse)
+async def refresh_product_info(
+    goods_id: GoodsID,
+    fields: Optional[list[ProductField]] = Query(None),
+    product_info_service: ProductInfoService = Depends(get_product_parser_service),
+) -> ProductsInfoResponse:
+    """
+    Scrape a product info again, only given fields are updated if they are set.
+    """
+    try:
+        product_info_entity = await product_info_service.register_provider_product_info(
+            goods_id=goods_id, fields=set(fields) if fields else None
+        )
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail='Not found')
+    return ProductsInfoResponse(data=[product_info_entity])
+
+
 @router.post('/{goods_id}', response_model=ProductsInfoResponse)
 async def manual_upload_product_info(
     goods_id: GoodsID,
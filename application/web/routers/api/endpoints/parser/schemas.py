@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 
 from domain.goods import GoodsID, ProductEntity
 from domain.entities import EncodedModel
+from domain.jobs import ScrapeTaskEntity, ScrapeTaskResult, SeedJobEntity
 
 
 class ProductIds(BaseModel):
@@ -36,6 +37,53 @@ class ProductsInfoResponse(EncodedModel):
     data: list[ProductEntity]
 
 
+# Properties for sitemap ingesting
+class ProductSitemapIngestResponse(BaseModel):
+    source: str = Field(description='Sitemap read in background')
+
+
+# Properties for seed jobs
+class SeedJobIds(BaseModel):
+    goods_ids: list[GoodsID] = Field(
+        min_items=1, description='Goods ids for scraping in background'
+    )
+
+
+class SeedJobRequest(BaseModel):
+    data: SeedJobIds
+
+
+class SeedJobResponse(EncodedModel):
+    data: SeedJobEntity
+
+
+class SeedJobResultsResponse(EncodedModel):
+    data: list[ScrapeTaskResult]
+    offset: int
+    limit: int
+
+
+class DeadLettersResponse(EncodedModel):
+    data: list[ScrapeTaskEntity]
+    total: int
+    offset: int
+    limit: int
+
+
+class DeadLetterIds(BaseModel):
+    goods_ids: list[GoodsID] = Field(
+        default_factory=list, description='Goods ids for requeue, all of them if empty'
+    )
+
+
+class DeadLettersRequeueRequest(BaseModel):
+    data: DeadLetterIds = Field(default_factory=DeadLetterIds)
+
+
+class DeadLettersRequeueResponse(BaseModel):
+    requeued: int
+
+
 # Additional data
 class ProductInfoCountResponse(BaseModel):
     count: int
@@ -1,5 +1,10 @@
+from typing import Optional
+
+from common.metrics import metrics
 from config import application_config, db_config, openapi_config
-from infrastructure import TortoiseDatabaseHeartbeat, SystemInfo
+from domain.goods import SyntheticCanary
+from infrastructure import ApplicationMetrics, TortoiseDatabaseHeartbeat, SystemInfo
+from web.routers.api.endpoints.parser.deps import synthetic_canary
 
 
 async def get_system_info() -> SystemInfo:
@@ -13,3 +18,11 @@ async def get_db_info() -> TortoiseDatabaseHeartbeat:
     return TortoiseDatabaseHeartbeat(
         name=f'Heart-Beat: {db_config.driver}-{db_config.db_name}',
     )
+
+
+async def get_metrics_info() -> ApplicationMetrics:
+    return ApplicationMetrics(registry=metrics)
+
+
+async def get_canary_info() -> Optional[SyntheticCanary]:
+    return synthetic_canary
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
 from loguru import logger
 from web.routers.deps import get_common_data
 
-from .deps import get_db_info, get_system_info
-from .schemas import AppStateResponseData, DbStateResponseData
+from domain.goods import SyntheticCanary
+from .deps import get_canary_info, get_db_info, get_metrics_info, get_system_info
+from .schemas import (
+    AppStateResponseData,
+    CanaryStateResponseData,
+    DbStateResponseData,
+    MetricsStateResponseData,
+)
 
 
 router = APIRouter()
@@ -41,3 +49,22 @@ async def liveness_prob(
     logger.info('liveness_prob')
     db_info = await db_data.check()
     return db_info
+
+
+@router.get('/metrics', response_model=MetricsStateResponseData)
+async def metrics_state(
+    metrics_data=Depends(get_metrics_info),
+) -> MetricsStateResponseData:
+    logger.info('Metrics-status start')
+    metrics_info = await metrics_data.check()
+    return metrics_info
+
+
+@router.get('/canary', response_model=CanaryStateResponseData)
+async def canary_state(
+    canary: Optional[SyntheticCanary] = Depends(get_canary_info),
+) -> CanaryStateResponseData:
+    logger.info('Canary-status start')
+    if canary is None:
+        raise HTTPException(status_code=404, detail='Canary is disabled')
+    return CanaryStateResponseData(**canary.get_report().dict())
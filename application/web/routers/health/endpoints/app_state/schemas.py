@@ -1,4 +1,5 @@
-from infrastructure import AppState, HeartbeatInformation
+from domain.goods import CanaryReport
+from infrastructure import AppState, HeartbeatInformation, MetricsState
 
 
 class AppStateResponseData(AppState):
@@ -7,3 +8,11 @@ class AppStateResponseData(AppState):
 
 class DbStateResponseData(HeartbeatInformation):
     pass
+
+
+class MetricsStateResponseData(MetricsState):
+    pass
+
+
+class CanaryStateResponseData(CanaryReport):
+    pass
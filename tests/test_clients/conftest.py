@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+from dotenv import find_dotenv, load_dotenv
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(BASE_DIR / Path('application')))
+load_dotenv(
+    find_dotenv(
+        filename=str(BASE_DIR / Path('.env.example')), raise_error_if_not_found=True
+    )
+)
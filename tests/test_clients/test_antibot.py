@@ -0,0 +1,89 @@
+import pickle
+from unittest.mock import Mock
+
+import pytest
+from selenium.webdriver import Chrome
+
+from clients.parser import BaseParser
+from clients.parser.antibot import (
+    PAGE_TEXT_LIMIT,
+    BlockedPageError,
+    PageState,
+    classify_page,
+)
+from config.client import ParserSettings
+
+
+@pytest.mark.parametrize(
+    'title, text, status, state',
+    [
+        ('Смартфон купить', 'Цена 1 299 ₽', 200, PageState.OK),
+        ('Смартфон купить', 'Цена 1 299 ₽', None, PageState.OK),
+        ('', '', 403, PageState.BLOCKED),
+        ('', '', 429, PageState.BLOCKED),
+        ('', '', 502, PageState.ERROR),
+        ('Проверка браузера', '', 200, PageState.CHALLENGE),
+        ('', 'Please solve the CAPTCHA to continue', None, PageState.CHALLENGE),
+        ('Access Denied', '', None, PageState.BLOCKED),
+        ('', 'Слишком много запросов', None, PageState.BLOCKED),
+        ('', 'ERR_PROXY_CONNECTION_FAILED', None, PageState.ERROR),
+    ],
+)
+def test_classify_page(title, text, status, state):
+    assert classify_page(title, text, status) == state
+
+
+def test_status_goes_before_markers():
+    assert classify_page('captcha', '', 503) == PageState.ERROR
+
+
+def test_markers_after_text_limit_are_ignored():
+    text = 'x' * PAGE_TEXT_LIMIT + ' captcha'
+    assert classify_page('Product', text) == PageState.OK
+
+
+def test_blocked_page_error_pickling():
+    err = pickle.loads(
+        pickle.dumps(BlockedPageError(PageState.CHALLENGE, 'https://x/'))
+    )
+    assert (err.state, err.url) == (PageState.CHALLENGE, 'https://x/')
+    assert 'challenge' in str(err)
+
+
+class FakeRateController:
+    def __init__(self):
+        self.acquired = 0
+        self.records: list[dict] = []
+
+    def acquire(self) -> float:
+        self.acquired += 1
+        return 0
+
+    def record(self, latency: float, error: bool = False, blocked: bool = False):
+        self.records.append({'error': error, 'blocked': blocked})
+
+
+def get_parser(page_state: PageState) -> BaseParser:
+    parser = BaseParser(page_classifier=lambda title, text, status: page_state)
+    parser.config = ParserSettings()
+    parser.client = Mock(spec=Chrome)
+    parser.client.execute_script.return_value = {'title': '', 'text': ''}
+    parser.rate_controller = FakeRateController()
+    return parser
+
+
+def test_get_page_is_classified():
+    parser = get_parser(PageState.OK)
+    assert parser.get_page('file:///tmp/page.html') is parser.client
+    assert parser.rate_controller.acquired == 1
+    assert parser.rate_controller.records == [{'error': False, 'blocked': False}]
+    assert not parser.is_tainted
+
+
+def test_get_blocked_page():
+    parser = get_parser(PageState.CHALLENGE)
+    with pytest.raises(BlockedPageError) as err:
+        parser.get_page('file:///tmp/page.html')
+    assert err.value.state == PageState.CHALLENGE
+    assert parser.rate_controller.records == [{'error': False, 'blocked': True}]
+    assert parser.is_tainted
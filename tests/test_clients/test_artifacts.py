@@ -0,0 +1,58 @@
+import gzip
+import os
+import time
+from pathlib import Path
+
+from clients.parser.artifacts import ArtifactStore, get_artifact_name
+
+
+def make_artifact(folder: Path, name: str, size: int, age: float) -> Path:
+    path = folder / name
+    path.write_bytes(b'0' * size)
+    modified_at = time.time() - age
+    os.utime(path, (modified_at, modified_at))
+    return path
+
+
+def test_artifact_name():
+    assert (
+        get_artifact_name('blocked', 'https://megamarket.ru/catalog/details/phone-1/')
+        == 'blocked-phone-1'
+    )
+    assert get_artifact_name('not ready', 'https://megamarket.ru') == (
+        'not_ready-megamarket.ru'
+    )
+
+
+def test_clean_expired(tmp_path: Path):
+    store = ArtifactStore(tmp_path, max_age=3600)
+    expired = make_artifact(tmp_path, 'expired.html.gz', 10, age=7200)
+    fresh = make_artifact(tmp_path, 'fresh.html.gz', 10, age=60)
+    other = make_artifact(tmp_path, 'notes.txt', 10, age=7200)
+    store.clean()
+    assert not expired.exists()
+    assert fresh.exists()
+    assert other.exists()  # only artifacts are removed
+
+
+def test_clean_oldest_above_size(tmp_path: Path):
+    store = ArtifactStore(tmp_path, max_size=25)
+    oldest = make_artifact(tmp_path, 'oldest.png.gz', 10, age=300)
+    older = make_artifact(tmp_path, 'older.png.gz', 10, age=200)
+    newest = make_artifact(tmp_path, 'newest.png.gz', 10, age=100)
+    store.clean()
+    assert not oldest.exists()
+    assert older.exists() and newest.exists()
+
+
+def test_clean_missing_folder(tmp_path: Path):
+    ArtifactStore(tmp_path / 'artifacts').clean()
+
+
+def test_save_in_background(tmp_path: Path):
+    store = ArtifactStore(tmp_path / 'artifacts')
+    store.save('sample', 'https://megamarket.ru/catalog/', html='<html></html>')
+    store.close()
+    (path,) = (tmp_path / 'artifacts').glob('*.html.gz')
+    assert path.name.endswith('-sample-catalog.html.gz')
+    assert gzip.decompress(path.read_bytes()) == b'<html></html>'
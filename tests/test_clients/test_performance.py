@@ -0,0 +1,55 @@
+import json
+
+from clients.parser.performance import (
+    TRACE_EVENTS_METHOD,
+    get_page_cdp_metrics,
+    get_trace,
+)
+
+
+def make_raw_metrics(**values) -> dict:
+    return {
+        'metrics': [{'name': name, 'value': value} for name, value in values.items()]
+    }
+
+
+def make_log_entry(method: str, params: dict) -> dict:
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def test_first_page_metrics():
+    page_metrics, tab_metrics = get_page_cdp_metrics(
+        make_raw_metrics(TaskDuration=1.5, Nodes=300, Documents=2)
+    )
+    assert page_metrics == {'TaskDuration': 1.5, 'Nodes': 300}
+    assert tab_metrics == page_metrics  # unknown metrics are skipped
+
+
+def test_cumulative_metrics_are_page_differences():
+    _, tab_metrics = get_page_cdp_metrics(
+        make_raw_metrics(TaskDuration=1.5, ScriptDuration=0.5, Nodes=300)
+    )
+    page_metrics, next_tab_metrics = get_page_cdp_metrics(
+        make_raw_metrics(TaskDuration=2.0, ScriptDuration=0.25, Nodes=200),
+        tab_metrics,
+    )
+    assert page_metrics == {
+        'TaskDuration': 0.5,
+        'ScriptDuration': 0.0,  # counters are reset by browser restart
+        'Nodes': 200,
+    }
+    assert next_tab_metrics['TaskDuration'] == 2.0
+
+
+def test_trace_from_performance_log():
+    event = {'name': 'ParseHTML', 'ph': 'X', 'ts': 1, 'dur': 5}
+    performance_log = [
+        make_log_entry('Network.requestWillBeSent', {'requestId': '1'}),
+        make_log_entry(TRACE_EVENTS_METHOD, event),
+    ]
+    assert json.loads(get_trace(performance_log) or '') == {'traceEvents': [event]}
+
+
+def test_no_trace_events():
+    assert get_trace([]) is None
+    assert get_trace([make_log_entry('Page.loadEventFired', {})]) is None
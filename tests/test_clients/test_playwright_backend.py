@@ -0,0 +1,62 @@
+import pytest
+
+from clients.parser import By, playwright_backend, remote
+from clients.parser.playwright_backend import (
+    PlaywrightRuntime,
+    get_cdp_url,
+    get_page_function,
+    get_selector,
+)
+from common.errors import ClientError
+
+
+@pytest.mark.parametrize(
+    'locator, selector',
+    [
+        ((By.CLASS_NAME, 'pdp-header__title'), '.pdp-header__title'),
+        ((By.XPATH, '//h1[@itemprop="name"]'), 'xpath=//h1[@itemprop="name"]'),
+        ((By.ID, 'search'), 'id=search'),
+    ],
+)
+def test_get_selector(locator, selector):
+    assert get_selector(locator) == selector
+
+
+@pytest.mark.parametrize(
+    'remote_browser, cdp_url',
+    [
+        (
+            'ws://10.0.0.1:9222/devtools/browser/ab-12',
+            'ws://10.0.0.1:9222/devtools/browser/ab-12',
+        ),
+        (
+            'wss://chrome-1/devtools/browser/ab-12',
+            'wss://chrome-1/devtools/browser/ab-12',
+        ),
+        ('chrome-1:9333', 'http://10.0.0.1:9333'),
+        ('http://chrome-1', 'http://10.0.0.1:9222'),
+        ('localhost', 'http://localhost:9222'),
+    ],
+)
+def test_get_cdp_url(remote_browser, cdp_url, monkeypatch):
+    monkeypatch.setattr(remote.socket, 'gethostbyname', lambda host: '10.0.0.1')
+    assert get_cdp_url(remote_browser) == cdp_url
+
+
+def test_get_cdp_url_of_wrong_endpoint():
+    with pytest.raises(ValueError):
+        get_cdp_url(':9222')
+
+
+def test_get_page_function():
+    assert get_page_function('return args[0];') == (
+        '(args) => (function () { return args[0]; }).apply(null, args)'
+    )
+
+
+@pytest.mark.skipif(
+    playwright_backend.async_playwright is not None, reason='playwright is installed'
+)
+def test_runtime_without_playwright():
+    with pytest.raises(ClientError, match='Playwright is not installed'):
+        PlaywrightRuntime()
@@ -0,0 +1,83 @@
+import pytest
+
+from clients.parser import rate_control
+from clients.parser.rate_control import DECREASE_COOLDOWN, AdaptiveRateController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(rate_control.time, 'monotonic', fake_clock.monotonic)
+    monkeypatch.setattr(rate_control.time, 'sleep', fake_clock.sleep)
+    return fake_clock
+
+
+def test_wrong_rate_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveRateController(min_rate=2, max_rate=1)
+
+
+def test_rate_is_bounded(clock):
+    assert AdaptiveRateController(rate=100, max_rate=5).rate == 5
+    assert AdaptiveRateController(rate=0.01, min_rate=0.5).rate == 0.5
+
+
+def test_tokens_are_refilled_by_rate(clock):
+    controller = AdaptiveRateController(rate=2)
+    assert controller.acquire() == 0  # initial token
+    assert controller.acquire() == pytest.approx(0.5)
+    clock.now += 10  # bucket is not filled above capacity
+    assert controller.acquire() == 0
+    assert controller.acquire() == 0
+    assert controller.acquire() == pytest.approx(0.5)
+
+
+def test_additive_increase(clock):
+    controller = AdaptiveRateController(rate=1, increase_step=0.1, max_rate=1.15)
+    controller.record(latency=1)
+    assert controller.rate == pytest.approx(1.1)
+    controller.record(latency=1)
+    assert controller.rate == pytest.approx(1.15)
+
+
+@pytest.mark.parametrize(
+    'result', [{'error': True}, {'blocked': True}, {'latency': 20}]
+)
+def test_multiplicative_decrease(clock, result):
+    controller = AdaptiveRateController(
+        rate=4, decrease_factor=0.5, latency_target=10, min_rate=1.5
+    )
+    controller.record(**{'latency': 1, **result})
+    assert controller.rate == 2
+    clock.now += DECREASE_COOLDOWN
+    controller.record(**{'latency': 1, **result})
+    assert controller.rate == 1.5
+
+
+def test_burst_of_failures_decreases_rate_once(clock):
+    controller = AdaptiveRateController(rate=4, decrease_factor=0.5)
+    for _ in range(5):
+        controller.record(latency=1, error=True)
+    assert controller.rate == 2
+
+
+@pytest.mark.asyncio
+async def test_acquire_async(clock, monkeypatch):
+    async def fake_sleep(seconds: float):
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_control.asyncio, 'sleep', fake_sleep)
+    controller = AdaptiveRateController(rate=4)
+    assert await controller.acquire_async() == 0
+    assert await controller.acquire_async() == pytest.approx(0.25)
@@ -0,0 +1,92 @@
+import io
+import json
+from urllib.error import URLError
+
+import pytest
+
+from clients.parser import remote
+from clients.parser.remote import (
+    get_debugger_address,
+    is_remote_browser_available,
+    load_remote_browsers,
+)
+
+
+@pytest.fixture(autouse=True)
+def resolver(monkeypatch):
+    hosts = {'chrome-1': '10.0.0.1'}
+
+    def gethostbyname(host: str) -> str:
+        if host in hosts:
+            return hosts[host]
+        if host.replace('.', '').isdigit():
+            return host
+        raise remote.socket.gaierror(f'Unknown host {host}')
+
+    monkeypatch.setattr(remote.socket, 'gethostbyname', gethostbyname)
+
+
+@pytest.mark.parametrize(
+    'endpoint, address',
+    [
+        ('localhost:9333', 'localhost:9333'),
+        (' 127.0.0.1:9333 ', '127.0.0.1:9333'),
+        ('chrome-1', '10.0.0.1:9222'),
+        ('http://chrome-1:9333', '10.0.0.1:9333'),
+        ('ws://chrome-1:9333/devtools/browser/ab-12', '10.0.0.1:9333'),
+    ],
+)
+def test_get_debugger_address(endpoint, address):
+    assert get_debugger_address(endpoint) == address
+
+
+@pytest.mark.parametrize('endpoint', ['', '   ', ':9222', 'ws:///devtools/browser'])
+def test_get_debugger_address_of_wrong_endpoint(endpoint):
+    with pytest.raises(ValueError):
+        get_debugger_address(endpoint)
+
+
+def test_get_debugger_address_of_unknown_host():
+    with pytest.raises(OSError):
+        get_debugger_address('chrome-2:9222')
+
+
+def test_load_remote_browsers(tmp_path):
+    registry_file = tmp_path / 'browsers.txt'
+    registry_file.write_text(
+        'chrome-1:9222\n# comment\n\nchrome-2:9222  # second\nlocalhost:9222\n'
+    )
+    assert load_remote_browsers(' localhost:9222, ,chrome-1:9222', registry_file) == [
+        'localhost:9222',
+        'chrome-1:9222',
+        'chrome-2:9222',
+    ]
+
+
+@pytest.mark.parametrize('endpoints', ['', ' , ', '#localhost:9222'])
+def test_load_no_remote_browsers(endpoints, tmp_path):
+    assert load_remote_browsers(endpoints) == []
+    assert load_remote_browsers(endpoints, tmp_path) == []  # empty env value
+    assert load_remote_browsers(endpoints, tmp_path / 'missing.txt') == []
+
+
+def test_remote_browser_is_available(monkeypatch):
+    urls = []
+
+    def urlopen(url: str, timeout: float):
+        urls.append(url)
+        return io.BytesIO(json.dumps({'Browser': 'Chrome/120.0'}).encode())
+
+    monkeypatch.setattr(remote, 'urlopen', urlopen)
+    assert is_remote_browser_available('ws://chrome-1:9333/devtools/browser/ab-12')
+    assert urls == ['http://10.0.0.1:9333/json/version']
+
+
+def test_remote_browser_is_not_available(monkeypatch):
+    def urlopen(url: str, timeout: float):
+        raise URLError('Connection refused')
+
+    monkeypatch.setattr(remote, 'urlopen', urlopen)
+    assert not is_remote_browser_available('localhost:9222')
+    assert not is_remote_browser_available(':9222')
+    assert not is_remote_browser_available('chrome-2:9222')
@@ -0,0 +1,70 @@
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+
+from clients.sitemap import SitemapReader
+from common.errors import ClientError
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<sitemap><loc>products.xml</loc></sitemap>
+<sitemap><loc>nested/index.xml</loc></sitemap>
+</sitemapindex>
+"""
+NESTED_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<sitemap><loc>more-products.xml.gz</loc></sitemap>
+</sitemapindex>
+"""
+PRODUCTS = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>https://megamarket.ru/catalog/details/phone-100001/</loc><lastmod>2023-01-02</lastmod></url>
+<url><loc>https://megamarket.ru/catalog/sport/</loc></url>
+</urlset>
+"""
+MORE_PRODUCTS = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>https://megamarket.ru/catalog/details/ball-100002/</loc><lastmod>2023-01-03T10:00:00Z</lastmod></url>
+</urlset>
+"""
+
+
+@pytest.fixture
+def sitemap_path(tmp_path):
+    (tmp_path / 'nested').mkdir()
+    (tmp_path / 'index.xml').write_text(SITEMAP_INDEX)
+    (tmp_path / 'products.xml').write_text(PRODUCTS)
+    (tmp_path / 'nested' / 'index.xml').write_text(NESTED_INDEX)
+    (tmp_path / 'nested' / 'more-products.xml.gz').write_bytes(
+        gzip.compress(MORE_PRODUCTS.encode())
+    )
+    return tmp_path / 'index.xml'
+
+
+def test_read_nested_sitemaps(sitemap_path):
+    entries = list(SitemapReader().iter_entries(str(sitemap_path)))
+    assert [entry.loc for entry in entries] == [
+        'https://megamarket.ru/catalog/details/phone-100001/',
+        'https://megamarket.ru/catalog/sport/',
+        'https://megamarket.ru/catalog/details/ball-100002/',
+    ]
+    assert entries[0].lastmod == datetime(2023, 1, 2, tzinfo=timezone.utc)
+    assert entries[1].lastmod is None
+    assert entries[2].lastmod == datetime(2023, 1, 3, 10, tzinfo=timezone.utc)
+
+
+def test_read_sitemap_by_file_url(sitemap_path):
+    entries = list(SitemapReader().iter_entries(sitemap_path.as_uri()))
+    assert len(entries) == 3
+
+
+def test_read_missing_sitemap(tmp_path):
+    with pytest.raises(ClientError):
+        list(SitemapReader().iter_entries(str(tmp_path / 'missing.xml')))
+
+
+def test_read_broken_sitemap(tmp_path):
+    (tmp_path / 'broken.xml').write_text('<urlset><url><loc>')
+    with pytest.raises(ClientError):
+        list(SitemapReader().iter_entries(str(tmp_path / 'broken.xml')))
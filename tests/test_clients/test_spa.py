@@ -0,0 +1,33 @@
+import pytest
+
+from clients.parser.spa import get_app_path, is_same_app
+
+
+@pytest.mark.parametrize(
+    'url, path',
+    [
+        (
+            'https://megamarket.ru/catalog/details/phone-100001/',
+            '/catalog/details/phone-100001/',
+        ),
+        ('https://megamarket.ru/catalog/?q=100001', '/catalog/?q=100001'),
+        ('https://megamarket.ru/catalog/#reviews', '/catalog/'),
+        ('https://megamarket.ru', ''),
+    ],
+)
+def test_get_app_path(url, path):
+    assert get_app_path(url) == path
+
+
+@pytest.mark.parametrize(
+    'current_url, url, result',
+    [
+        ('https://megamarket.ru/', 'https://megamarket.ru/catalog/?q=1', True),
+        ('https://megamarket.ru/', 'http://megamarket.ru/catalog/', False),
+        ('https://megamarket.ru/', 'https://www.megamarket.ru/catalog/', False),
+        ('data:,', 'https://megamarket.ru/catalog/', False),  # blank tab has no app
+        ('file:///tmp/page.html', 'file:///tmp/other.html', False),
+    ],
+)
+def test_is_same_app(current_url, url, result):
+    assert is_same_app(current_url, url) == result
@@ -0,0 +1,172 @@
+import multiprocessing
+import threading
+from typing import Optional
+
+import pytest
+
+from clients.parser import By
+from clients.parser.workers import (
+    STOP_COMMAND,
+    ParserWorkerClient,
+    run_parser_worker,
+)
+from common.errors import ClientError
+from common.metrics import metrics
+
+PAGES_METRIC = 'test.worker.pages'
+
+
+class UnpicklableError(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.lock = threading.Lock()
+
+
+class FakeParser:
+    def __init__(self, remote_browser: Optional[str] = None):
+        self.remote_browser = remote_browser
+        self.is_inited = False
+        self.is_tainted = False
+
+    def init(self, config):
+        self.is_inited = True
+
+    def get_page(self, url):
+        metrics.increment(PAGES_METRIC)
+        return object()  # driver is not sent back
+
+    def capture(self, fields):
+        if not fields:
+            raise UnpicklableError('Browser session is lost')
+        return {field: [] for field in fields}
+
+    def taint(self, reason):
+        raise ClientError(reason)
+
+    @property
+    def current_url(self):
+        return 'https://megamarket.ru/'
+
+    def close_client(self):
+        pass
+
+
+def run_commands(*commands) -> list[tuple]:
+    connection, worker_connection = multiprocessing.Pipe()
+    for method, *args in commands:
+        connection.send((method, tuple(args), {}))
+    connection.send((STOP_COMMAND, (), {}))
+    run_parser_worker(worker_connection, FakeParser)
+    return [connection.recv() for _ in commands]
+
+
+def test_results_are_sent_back():
+    responses = run_commands(
+        ('init', None),
+        ('current_url',),
+        ('capture', ['name']),
+        ('get_page', 'https://megamarket.ru/catalog/'),
+    )
+    assert [response[:2] for response in responses] == [
+        ('ok', None),
+        ('ok', 'https://megamarket.ru/'),
+        ('ok', {'name': []}),
+        ('ok', None),
+    ]
+    assert responses[0][2]['is_inited']
+
+
+def test_errors_are_picklable():
+    responses = run_commands(('taint', 'Captcha'), ('capture', []), ('restart_all',))
+    assert [status for status, _, _ in responses] == ['error'] * 3
+    error, unpicklable_error, unknown_error = [result for _, result, _ in responses]
+    assert isinstance(error, ClientError) and str(error) == 'Captcha'
+    assert isinstance(unpicklable_error, ClientError)
+    assert 'UnpicklableError: Browser session is lost' in str(unpicklable_error)
+    assert 'Unknown parser worker method' in str(unknown_error)
+
+
+def test_counters_are_sent_as_increments():
+    sent = metrics.snapshot()['counters'].get(PAGES_METRIC, 0)  # new process has none
+    responses = run_commands(
+        ('get_page', 'https://megamarket.ru/'),
+        ('get_page', 'https://megamarket.ru/'),
+        ('current_url',),
+    )
+    assert [state['counters'].get(PAGES_METRIC) for *_, state in responses] == [
+        sent + 1,
+        1,
+        None,
+    ]
+
+
+class FakeConnection:
+    def __init__(self, response: tuple):
+        self.response = response
+        self.sent: list[tuple] = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def poll(self, timeout):
+        return True
+
+    def recv(self):
+        return self.response
+
+
+class FakeProcess:
+    def is_alive(self):
+        return True
+
+
+def make_client(response: tuple) -> ParserWorkerClient:
+    client = ParserWorkerClient(FakeParser)
+    client.process = FakeProcess()  # type: ignore[assignment]
+    client.connection = FakeConnection(response)  # type: ignore[assignment]
+    return client
+
+
+def test_client_forwards_counters():
+    state = {'is_inited': True, 'is_tainted': True, 'counters': {PAGES_METRIC: 2}}
+    before = metrics.snapshot()['counters'].get(PAGES_METRIC, 0)
+    client = make_client(('ok', 'https://megamarket.ru/', state))
+    assert client.current_url == 'https://megamarket.ru/'
+    assert metrics.snapshot()['counters'][PAGES_METRIC] == before + 2
+    assert client.is_inited and client.is_tainted
+
+
+def test_client_raises_worker_error():
+    state = {'is_inited': True, 'is_tainted': False, 'counters': {}}
+    client = make_client(('error', ClientError('Captcha'), state))
+    with pytest.raises(ClientError, match='Captcha'):
+        client.taint('Captcha')
+
+
+class FakeRateController:
+    def __init__(self):
+        self.acquired = 0
+        self.records: list[dict] = []
+
+    def acquire(self) -> float:
+        self.acquired += 1
+        return 0
+
+    def record(self, latency: float, error: bool = False, blocked: bool = False):
+        self.records.append({'error': error, 'blocked': blocked})
+
+
+@pytest.mark.parametrize(
+    'method, args',
+    [
+        ('get_page', ('https://megamarket.ru/',)),
+        ('submit_search', ((By.CLASS_NAME, 'search-field-input'),)),
+    ],
+)
+def test_client_rate_controls_navigation(method, args):
+    state = {'is_inited': True, 'is_tainted': False, 'counters': {}}
+    client = make_client(('ok', None, state))
+    client.rate_controller = FakeRateController()
+    getattr(client, method)(*args)
+    assert client.rate_controller.acquired == 1
+    assert client.rate_controller.records == [{'error': False, 'blocked': False}]
@@ -0,0 +1,91 @@
+import pytest
+
+from domain.goods import extraction
+from domain.goods.extraction import (
+    BreakerState,
+    ExtractionBrokenError,
+    ExtractionCircuitBreaker,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(extraction.time, 'monotonic', fake_clock.monotonic)
+    return fake_clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return ExtractionCircuitBreaker(
+        window_size=10, min_observations=5, min_hit_rate=0.5, cooldown=60
+    )
+
+
+def record_price(breaker: ExtractionCircuitBreaker, hit: bool, times: int = 1):
+    for _ in range(times):
+        breaker.record({'name': True, 'price': hit}, {'price': '.price'})
+
+
+def get_state(breaker: ExtractionCircuitBreaker, field: str) -> BreakerState:
+    return breaker._fields[field].state
+
+
+def test_closed_until_min_observations(breaker):
+    record_price(breaker, False, 4)
+    assert get_state(breaker, 'price') == BreakerState.CLOSED
+    breaker.check()
+    record_price(breaker, False)
+    assert get_state(breaker, 'price') == BreakerState.OPEN
+    assert breaker.get_broken_selectors() == {'price': '.price'}
+
+
+def test_open_required_field_fails_fast(breaker):
+    record_price(breaker, False, 5)
+    with pytest.raises(ExtractionBrokenError):
+        breaker.check()
+
+
+def test_missed_name_is_only_evidence(breaker):
+    for _ in range(5):
+        breaker.record({'name': False, 'price': False}, {})
+    assert get_state(breaker, 'name') == BreakerState.OPEN
+    assert 'price' not in breaker._fields  # not product page
+
+
+def test_half_open_admits_single_probe(breaker, clock):
+    record_price(breaker, False, 5)
+    clock.now += 60
+    assert breaker.allow('price')
+    assert get_state(breaker, 'price') == BreakerState.HALF_OPEN
+    assert not breaker.allow('price')  # probe is in flight
+    clock.now += 60
+    assert breaker.allow('price')  # probe did not report during cooldown
+
+
+def test_successful_probe_closes(breaker, clock):
+    record_price(breaker, False, 5)
+    clock.now += 60
+    assert breaker.allow('price')
+    record_price(breaker, True)
+    assert get_state(breaker, 'price') == BreakerState.CLOSED
+    assert breaker.allow('price')
+    assert breaker.get_broken_selectors() == {}
+
+
+def test_failed_probe_reopens(breaker, clock):
+    record_price(breaker, False, 5)
+    clock.now += 60
+    assert breaker.allow('price')
+    record_price(breaker, False)
+    assert get_state(breaker, 'price') == BreakerState.OPEN
+    clock.now += 59
+    assert not breaker.allow('price')  # cooldown starts over
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from domain.goods.entities import ProductEntity
+from domain.goods.hedging import (
+    MIN_HISTORY_SIZE,
+    HedgePolicy,
+    ScrapeCancelledError,
+    cancel_event_var,
+    check_cancelled,
+)
+from domain.goods.provider import SberMegaMarketProductProviderUrlSearch
+
+HEDGE_DELAY = 0.1
+
+
+def test_wrong_percentile():
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=1)
+
+
+def test_default_delay_for_short_history():
+    policy = HedgePolicy(default_delay=30)
+    for _ in range(MIN_HISTORY_SIZE - 1):
+        policy.record_latency(1)
+    assert policy.get_delay() == 30
+
+
+def test_delay_is_latency_percentile():
+    policy = HedgePolicy(percentile=0.9)
+    for latency in range(1, 101):
+        policy.record_latency(latency)
+    assert policy.get_delay() == 90
+
+
+def test_hedges_are_capped_by_rate():
+    policy = HedgePolicy(max_hedge_rate=0.1, history_size=100)
+    assert policy.acquire_hedge()
+    hedges = sum(policy.acquire_hedge() for _ in range(1000))
+    assert 90 <= hedges <= 110  # a tenth of requests
+    for _ in range(100):
+        policy.record_request()
+    assert policy.acquire_hedge()
+
+
+def test_check_cancelled():
+    check_cancelled()  # no attempt event outside of hedged scrape
+    cancel_event = threading.Event()
+    token = cancel_event_var.set(cancel_event)
+    try:
+        check_cancelled()
+        cancel_event.set()
+        with pytest.raises(ScrapeCancelledError):
+            check_cancelled()
+    finally:
+        cancel_event_var.reset(token)
+
+
+class SlowPrimaryProvider(SberMegaMarketProductProviderUrlSearch):
+    def __init__(self, hedge_policy: HedgePolicy):
+        super().__init__(
+            SimpleNamespace(available=1),
+            'https://megamarket.ru/',
+            hedge_policy=hedge_policy,
+        )
+        self.scrape_durations = [10 * HEDGE_DELAY, HEDGE_DELAY / 2]
+
+    async def _scrape_product(self, goods_id, raw_data=None, fields=None):
+        await asyncio.sleep(self.scrape_durations.pop(0))
+        return ProductEntity(
+            goods_id=goods_id,
+            name='Phone',
+            price=Decimal('100'),
+            categories=[],
+            images=[],
+            attributes=[],
+        )
+
+
+@pytest.mark.asyncio
+async def test_hedge_won_latency_is_counted_from_first_dispatch():
+    policy = HedgePolicy(default_delay=HEDGE_DELAY)
+    provider = SlowPrimaryProvider(policy)
+    product = await provider.get_product('100001', hedged=True)
+    assert product.goods_id == '100001'
+    assert not provider.scrape_durations  # hedge is launched and won
+    assert len(policy._latencies) == 1
+    assert policy._latencies[0] >= HEDGE_DELAY * 1.5
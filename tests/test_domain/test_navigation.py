@@ -0,0 +1,49 @@
+import pytest
+
+from domain.goods.navigation import (
+    NavigationStrategy,
+    NavigationStrategySelector,
+    StrategyStats,
+)
+
+
+def test_stats_are_exponentially_weighted():
+    stats = StrategyStats(decay=0.5)
+    stats.add(success=True, latency=2)
+    assert (stats.success_rate, stats.latency) == (1.0, 2)
+    stats.add(success=False, latency=4)
+    assert (stats.success_rate, stats.latency) == (0.5, 3)
+    assert stats.cost == 6
+
+
+def test_unexplored_strategies_go_first():
+    selector = NavigationStrategySelector(exploration_rate=0)
+    selector.record(NavigationStrategy.URL, success=True, latency=1)
+    assert selector.choose() == NavigationStrategy.SEARCH_FIELD
+
+
+def test_cheapest_strategy_is_chosen():
+    selector = NavigationStrategySelector(exploration_rate=0, decay=1)
+    selector.record(NavigationStrategy.URL, success=True, latency=5)
+    selector.record(NavigationStrategy.SEARCH_FIELD, success=True, latency=2)
+    assert selector.choose() == NavigationStrategy.SEARCH_FIELD
+    selector.record(NavigationStrategy.SEARCH_FIELD, success=False, latency=2)
+    assert selector.choose() == NavigationStrategy.URL
+    assert selector.get_fallbacks(NavigationStrategy.URL) == [
+        NavigationStrategy.SEARCH_FIELD
+    ]
+
+
+def test_exploration():
+    selector = NavigationStrategySelector(exploration_rate=1, decay=1)
+    selector.record(NavigationStrategy.URL, success=True, latency=1)
+    selector.record(NavigationStrategy.SEARCH_FIELD, success=True, latency=100)
+    chosen = {selector.choose() for _ in range(200)}
+    assert chosen == set(NavigationStrategy)
+
+
+@pytest.mark.parametrize('strategy', list(NavigationStrategy))
+def test_single_strategy(strategy):
+    selector = NavigationStrategySelector(strategies=(strategy,), exploration_rate=0)
+    assert selector.choose() == strategy
+    assert selector.get_fallbacks(strategy) == []
@@ -0,0 +1,117 @@
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+from fastapi import HTTPException
+
+from common.errors import NotFoundError, ProviderError
+from domain.goods import ProductField, ProductInfoService
+from domain.goods.entities import ProductCategory, ProductEntity
+from web.routers.api.endpoints.parser.handler import refresh_product_info
+
+GOODS_ID = '100001'
+
+
+def make_product(**kwargs) -> ProductEntity:
+    product_data = {
+        'goods_id': GOODS_ID,
+        'name': 'Phone',
+        'price': Decimal('100'),
+        'categories': [ProductCategory(name='Phones')],
+        'images': [],
+        'attributes': [],
+    }
+    product_data.update(kwargs)
+    return ProductEntity(**product_data)
+
+
+class FakeProductRepository:
+    def __init__(self, product: Optional[ProductEntity] = None):
+        self.product = product
+        self.updated_fields: list[set[ProductField]] = []
+
+    async def find_by_goods_id(self, goods_id):
+        if self.product and self.product.goods_id == goods_id:
+            return self.product
+        return None
+
+    async def get_by_id(self, instance_id):
+        return self.product
+
+    async def update_fields(self, product, fields):
+        self.product = product
+        self.updated_fields.append(fields)
+
+    async def find_revisit(self, goods_id):
+        return None
+
+    @asynccontextmanager
+    async def atomic(self):
+        yield
+
+
+class FakeProductProvider:
+    def __init__(self, product: Optional[ProductEntity] = None):
+        self.product = product
+        self.fields: list[Optional[set[ProductField]]] = []
+
+    async def get_product(self, goods_id, raw_data=None, hedged=False, fields=None):
+        self.fields.append(fields)
+        if self.product is None:
+            raise ProviderError('Product page is not found')
+        return self.product
+
+
+@pytest.mark.asyncio
+async def test_partial_update_writes_changed_fields():
+    product_repo = FakeProductRepository(make_product(id=1))
+    product_provider = FakeProductProvider(
+        make_product(name='New phone', price=Decimal('90'), categories=[])
+    )
+    service = ProductInfoService(product_repo, product_provider)
+    product = await service.register_provider_product_info(
+        GOODS_ID, fields={ProductField.PRICE, ProductField.NAME}
+    )
+    assert product_provider.fields == [{ProductField.PRICE, ProductField.NAME}]
+    assert product_repo.updated_fields == [{ProductField.PRICE, ProductField.NAME}]
+    assert (product.name, product.price) == ('New phone', Decimal('90'))
+    assert product.categories == [ProductCategory(name='Phones')]  # not requested
+
+
+@pytest.mark.asyncio
+async def test_partial_update_skips_unchanged_fields():
+    product_repo = FakeProductRepository(make_product(id=1))
+    product_provider = FakeProductProvider(make_product(name='New phone'))
+    service = ProductInfoService(product_repo, product_provider)
+    product = await service.register_provider_product_info(
+        GOODS_ID, fields={ProductField.PRICE}
+    )
+    assert product_repo.updated_fields == []
+    assert product.name == 'Phone'
+
+
+@pytest.mark.asyncio
+async def test_refresh_of_missing_product():
+    service = ProductInfoService(FakeProductRepository(), FakeProductProvider())
+    with pytest.raises(NotFoundError):
+        await service.register_provider_product_info(
+            GOODS_ID, fields={ProductField.PRICE}
+        )
+    with pytest.raises(HTTPException) as err:
+        await refresh_product_info(
+            GOODS_ID, fields=[ProductField.PRICE], product_info_service=service
+        )
+    assert err.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_variants_merge_only_card_fields():
+    product_repo = FakeProductRepository(make_product(id=1))
+    service = ProductInfoService(product_repo, FakeProductProvider())
+    variant = make_product(price=Decimal('90'), categories=[])
+    unseen_variant = make_product(goods_id='100002')
+    assert await service.merge_variants([variant, unseen_variant]) == ['100002']
+    assert product_repo.updated_fields == [{ProductField.PRICE}]
+    assert product_repo.product.price == Decimal('90')
+    assert product_repo.product.categories == [ProductCategory(name='Phones')]
@@ -0,0 +1,168 @@
+import math
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from domain.goods import ProductEntity, ProductField, ProductRevisit, RevisitPolicy
+from domain.goods.revisit import (
+    estimate_change_rate,
+    get_changed_fields,
+    get_content_hash,
+)
+
+NOW = datetime(2023, 1, 10, tzinfo=timezone.utc)
+DAY = 24 * 3600.0
+
+
+def make_product(**kwargs) -> ProductEntity:
+    product_data = {
+        'goods_id': '100001',
+        'name': 'Phone',
+        'price': Decimal('100'),
+        'categories': [{'name': 'Phones'}, {'name': 'Electronics'}],
+        'images': [
+            {'name': 'front', 'url': 'https://megamarket.ru/front.jpg'},
+            {'name': 'back', 'url': 'https://megamarket.ru/back.jpg'},
+        ],
+        'attributes': [
+            {'name': 'Color', 'value': 'black'},
+            {'name': 'Memory', 'value': '128 GB'},
+        ],
+    }
+    product_data.update(kwargs)
+    return ProductEntity(**product_data)
+
+
+def make_revisit(
+    checks: int = 0,
+    changes: int = 0,
+    first_checked_at: Optional[datetime] = NOW - timedelta(days=10),
+) -> ProductRevisit:
+    return ProductRevisit(
+        id=1,
+        goods_id='100001',
+        created_at=NOW - timedelta(days=365),
+        modified_at=NOW - timedelta(days=365),
+        first_checked_at=first_checked_at,
+        checks=checks,
+        changes=changes,
+    )
+
+
+@pytest.mark.parametrize(
+    'checks, changes, observed_time', [(0, 0, DAY), (5, 1, 0), (5, 1, -DAY)]
+)
+def test_no_change_rate_without_observations(checks, changes, observed_time):
+    assert estimate_change_rate(checks, changes, observed_time) == 0.0
+
+
+def test_change_rate_of_unchanged_product():
+    assert estimate_change_rate(10, 0, 10 * DAY) == pytest.approx(
+        -math.log(10.5 / 11) / DAY
+    )
+
+
+def test_change_rate_grows_with_changes():
+    rates = [estimate_change_rate(10, changes, 10 * DAY) for changes in range(11)]
+    assert rates == sorted(rates)
+    assert rates[5] > 5 / (10 * DAY)  # missed changes between checks are counted
+
+
+def test_change_rate_is_finite_when_every_check_finds_change():
+    rate = estimate_change_rate(10, 10, 10 * DAY)
+    assert math.isfinite(rate)
+    assert estimate_change_rate(10, 20, 10 * DAY) == rate
+
+
+def test_interval_of_new_product():
+    policy = RevisitPolicy(min_interval=3600, max_interval=30 * DAY)
+    assert policy.get_interval(make_revisit(), NOW) == 3600
+    assert (
+        policy.get_interval(make_revisit(checks=5, first_checked_at=None), NOW) == 3600
+    )
+
+
+def test_interval_is_observed_from_first_check():
+    policy = RevisitPolicy(min_interval=3600, max_interval=30 * DAY)
+    recent = make_revisit(10, 5, first_checked_at=NOW - timedelta(days=1))
+    old = make_revisit(10, 5, first_checked_at=NOW - timedelta(days=10))
+    assert policy.get_interval(recent, NOW) < policy.get_interval(old, NOW)
+    assert policy.get_interval(old, NOW) == pytest.approx(
+        1 / estimate_change_rate(10, 5, 10 * DAY)
+    )
+
+
+def test_interval_is_bounded():
+    policy = RevisitPolicy(min_interval=3600, max_interval=DAY)
+    stable = make_revisit(100, 0, first_checked_at=NOW - timedelta(days=100))
+    volatile = make_revisit(100, 100, first_checked_at=NOW - timedelta(hours=1))
+    assert policy.get_interval(stable, NOW) == DAY
+    assert policy.get_interval(volatile, NOW) == 3600
+
+
+def test_record_check():
+    policy = RevisitPolicy(min_interval=3600, max_interval=30 * DAY)
+    revisit = policy.record_check(make_revisit(4, 1), is_changed=True, now=NOW)
+    assert (revisit.checks, revisit.changes) == (5, 2)
+    assert revisit.checked_at == NOW
+    assert revisit.next_revisit_at == NOW + timedelta(seconds=revisit.revisit_interval)
+
+
+def test_first_check_of_product_stored_before_counting():
+    policy = RevisitPolicy(min_interval=3600, max_interval=30 * DAY)
+    revisit = policy.record_check(
+        make_revisit(4, 1, first_checked_at=None), is_changed=True, now=NOW
+    )
+    assert (revisit.checks, revisit.changes) == (0, 0)
+    assert revisit.first_checked_at == revisit.checked_at == NOW
+    assert revisit.revisit_interval == 3600
+
+
+def test_unchanged_product():
+    product = make_product()
+    assert get_changed_fields(product, make_product()) == set()
+    assert get_content_hash(product) == get_content_hash(make_product())
+
+
+def test_order_of_lists_is_ignored():
+    product = make_product()
+    reordered_product = make_product(
+        categories=product.categories[::-1],
+        images=product.images[::-1],
+        attributes=product.attributes[::-1],
+    )
+    assert get_changed_fields(product, reordered_product) == set()
+    assert get_content_hash(product) == get_content_hash(reordered_product)
+
+
+def test_price_is_normalized():
+    product = make_product(price=Decimal('100'))
+    assert get_content_hash(product) == get_content_hash(
+        make_product(price=Decimal('100.00'))
+    )
+    assert get_content_hash(product) != get_content_hash(
+        make_product(price=Decimal('100.01'))
+    )
+
+
+def test_changed_fields():
+    product = make_product()
+    changed_product = make_product(
+        price=Decimal('90'), attributes=[{'name': 'Color', 'value': 'white'}]
+    )
+    assert get_changed_fields(product, changed_product) == {
+        ProductField.PRICE,
+        ProductField.ATTRIBUTES,
+    }
+    assert get_changed_fields(product, changed_product, {ProductField.PRICE}) == {
+        ProductField.PRICE
+    }
+    assert get_changed_fields(product, changed_product, {ProductField.NAME}) == set()
+    assert get_content_hash(product) != get_content_hash(changed_product)
+
+
+def test_metadata_is_not_hashed():
+    product = make_product(id=1, created_at=NOW)
+    assert get_content_hash(product) == get_content_hash(make_product(id=2))
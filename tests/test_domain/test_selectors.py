@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from clients.parser import By
+from domain.goods.selectors import SelectorRanking, SelectorStats
+
+NAME = (By.CLASS_NAME, 'pdp-header__title')
+NAME_FALLBACK = (By.ID, 'product-title')
+NAME_LEGACY = (By.XPATH, '//h1')
+LOCATORS = [NAME, NAME_FALLBACK, NAME_LEGACY]
+
+
+def test_score_is_smoothed():
+    assert SelectorStats().score == 0.5
+    assert SelectorStats(hits=8, misses=0).score == 0.9
+
+
+def test_declared_order_for_unknown_selectors():
+    assert SelectorRanking().order('name', LOCATORS) == LOCATORS
+
+
+def test_hit_selector_goes_first():
+    ranking = SelectorRanking()
+    ranking.record('name', LOCATORS, hit_index=1)
+    assert ranking.order('name', LOCATORS) == [NAME_FALLBACK, NAME_LEGACY, NAME]
+    assert ranking.order('price', LOCATORS) == LOCATORS  # fields are ranked separately
+
+
+def test_selectors_after_hit_are_not_recorded():
+    ranking = SelectorRanking()
+    ranking.record('name', LOCATORS, hit_index=0)
+    assert set(ranking._dump()['name']) == {ranking.get_key(NAME)}
+
+
+def test_all_tried_selectors_missed():
+    ranking = SelectorRanking()
+    ranking.record('name', LOCATORS, hit_index=None)
+    assert ranking._dump()['name'] == {
+        ranking.get_key(locator): [0, 1] for locator in LOCATORS
+    }
+
+
+def test_save_and_load(tmp_path: Path):
+    stats_file = tmp_path / 'var' / 'selector_stats.json'
+    ranking = SelectorRanking(stats_file=stats_file)
+    ranking.record('name', LOCATORS, hit_index=2)
+    ranking.save()
+    assert not stats_file.with_suffix('.tmp').exists()
+    loaded_ranking = SelectorRanking(stats_file=stats_file)
+    assert loaded_ranking._dump() == ranking._dump()
+    assert loaded_ranking.order('name', LOCATORS) == [NAME_LEGACY, NAME, NAME_FALLBACK]
+
+
+def test_broken_file_is_skipped(tmp_path: Path):
+    stats_file = tmp_path / 'selector_stats.json'
+    stats_file.write_text('{')
+    assert SelectorRanking(stats_file=stats_file)._dump() == {}
+
+
+def test_empty_path_keeps_stats_in_memory():
+    ranking = SelectorRanking(stats_file=Path(''))
+    assert ranking.stats_file is None
+    ranking.record('name', LOCATORS, hit_index=0)
+    ranking.save()
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import HttpUrl, parse_obj_as
+
+from clients import parser_pool
+from clients.sitemap import SitemapReader
+from domain.goods import GoodsID, ProductSitemapService, SberMegaMarketProductProvider
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>https://megamarket.ru/catalog/details/phone-100001/</loc><lastmod>2023-01-05</lastmod></url>
+<url><loc>https://megamarket.ru/catalog/details/ball-100002/</loc><lastmod>2023-01-01</lastmod></url>
+<url><loc>https://megamarket.ru/catalog/details/bike-100003/</loc></url>
+<url><loc>https://megamarket.ru/catalog/sport/</loc></url>
+</urlset>
+"""
+STORED_CHECKED_AT = datetime(2023, 1, 3, tzinfo=timezone.utc)
+
+
+class FakeProductRepository:
+    async def select_checked_at(self, goods_ids):
+        return {
+            goods_id: STORED_CHECKED_AT
+            for goods_id in goods_ids
+            if goods_id in ('100001', '100002')
+        }
+
+
+class FakeSitemapRepository:
+    def __init__(self):
+        self.entities = []
+
+    async def upsert_many(self, entities):
+        self.entities.extend(entities)
+
+
+@pytest.mark.asyncio
+async def test_ingest_local_sitemap(tmp_path):
+    (tmp_path / 'sitemap.xml').write_text(SITEMAP)
+    sitemap_repo = FakeSitemapRepository()
+    service = ProductSitemapService(
+        sitemap_repo=sitemap_repo,
+        product_repo=FakeProductRepository(),
+        product_provider=SberMegaMarketProductProvider(
+            parser_pool=parser_pool,
+            base_url=parse_obj_as(HttpUrl, 'https://megamarket.ru/'),
+        ),
+        sitemap_reader=SitemapReader(),
+    )
+    scheduled: list[GoodsID] = []
+
+    async def schedule(goods_ids):
+        scheduled.extend(goods_ids)
+
+    result = await service.ingest(
+        str(tmp_path / 'sitemap.xml'), schedule=schedule, batch_size=2
+    )
+    assert (result.entries, result.products, result.scheduled) == (4, 3, 2)
+    assert scheduled == ['100001', '100003']  # changed after scrape and new one
+    assert [entity.goods_id for entity in sitemap_repo.entities] == [
+        '100001',
+        '100002',
+        '100003',
+    ]
@@ -0,0 +1,98 @@
+import asyncio
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+from common.errors import NotFoundError
+from domain.goods import GoodsID, ProductEntity
+from scripts.batch_scrape import (
+    DONE_STATUS,
+    FAILED_STATUS,
+    BatchCheckpoint,
+    BatchScraper,
+    read_goods_ids,
+)
+
+
+class FakeScrape:
+    def __init__(self, failed_goods_ids=()):
+        self.failed_goods_ids = set(failed_goods_ids)
+        self.calls = []
+
+    async def __call__(self, goods_id: GoodsID) -> ProductEntity:
+        self.calls.append(goods_id)
+        if goods_id in self.failed_goods_ids:
+            raise NotFoundError(f'Cannot find information for goods_id: {goods_id}')
+        return ProductEntity(
+            goods_id=goods_id,
+            name=f'product {goods_id}',
+            price=Decimal('10'),
+            categories=[],
+            images=[],
+            attributes=[],
+        )
+
+
+def test_read_goods_ids():
+    lines = ['100001\n', '\n', '# header\n', ' 100002  # comment\n']
+    assert list(read_goods_ids(lines)) == ['100001', '100002']
+
+
+@pytest.mark.asyncio
+async def test_batch_scrape_writes_ndjson_and_checkpoint(tmp_path):
+    checkpoint = BatchCheckpoint(tmp_path / 'batch.checkpoint')
+    output = io.StringIO()
+    scrape = FakeScrape(failed_goods_ids={'100002'})
+    counts = await BatchScraper(scrape, checkpoint, output, concurrency=2).run(
+        [GoodsID('100001'), GoodsID('100002'), GoodsID('100003')]
+    )
+    checkpoint.close()
+
+    assert counts == {DONE_STATUS: 2, FAILED_STATUS: 1, 'skipped': 0}
+    products = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(product['goods_id'] for product in products) == ['100001', '100003']
+    assert sorted(checkpoint.path.read_text().splitlines()) == [
+        f'100001\t{DONE_STATUS}',
+        f'100002\t{FAILED_STATUS}',
+        f'100003\t{DONE_STATUS}',
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'has_failed_retry, expected_calls',
+    [(False, ['100003']), (True, ['100002', '100003'])],
+)
+async def test_batch_scrape_resumes_from_checkpoint(
+    tmp_path, has_failed_retry, expected_calls
+):
+    checkpoint_path = tmp_path / 'batch.checkpoint'
+    checkpoint_path.write_text(f'100001\t{DONE_STATUS}\n100002\t{FAILED_STATUS}\n')
+    checkpoint = BatchCheckpoint(checkpoint_path, has_failed_retry=has_failed_retry)
+    assert checkpoint.load() == 2
+    scrape = FakeScrape()
+    await BatchScraper(scrape, checkpoint).run(
+        [GoodsID('100001'), GoodsID('100002'), GoodsID('100003')]
+    )
+    checkpoint.close()
+
+    assert scrape.calls == expected_calls
+    assert checkpoint.path.read_text().splitlines()[-1] == f'100003\t{DONE_STATUS}'
+
+
+class BrokenCheckpoint(BatchCheckpoint):
+    def record(self, goods_id: GoodsID, status: str):
+        raise OSError('No space left on device')
+
+
+@pytest.mark.asyncio
+async def test_batch_scrape_stops_on_checkpoint_error(tmp_path):
+    checkpoint = BrokenCheckpoint(tmp_path / 'batch.checkpoint')
+    scraper = BatchScraper(FakeScrape(), checkpoint, concurrency=2)
+    with pytest.raises(OSError):
+        await asyncio.wait_for(
+            scraper.run(GoodsID(str(goods_id)) for goods_id in range(100000, 100010)),
+            timeout=5,
+        )
@@ -0,0 +1,39 @@
+from common.utils import utc_now
+from domain.jobs import GinoSeedJobRepository, ScrapeTaskStatus
+
+
+async def make_dead_task(goods_id: str):
+    seed_job_repo = GinoSeedJobRepository()
+    await seed_job_repo.add_retry_task(goods_id, 'Timeout', next_attempt_at=utc_now())
+    task = await seed_job_repo.task_model.get(goods_id=goods_id, job_id=None)
+    task.status = ScrapeTaskStatus.FAILED.value
+    await task.save()
+
+
+class TestDeadLetters:
+    prefix = '/api/v1/product_info/dead_letters'
+
+    def test_get_dead_letters(self, test_client_with_auth_token):
+        test_client_with_auth_token.portal.call(make_dead_task, '100101')
+        response = test_client_with_auth_token.get(self.prefix)
+        assert response.status_code == 200
+        dead_letters = response.json()
+        assert dead_letters['total'] >= 1
+        task = next(
+            task for task in dead_letters['data'] if task['goods_id'] == '100101'
+        )
+        assert task['status'] == 'failed'
+        assert task['error'] == 'Timeout'
+
+    def test_requeue_dead_letters(self, test_client_with_auth_token):
+        test_client_with_auth_token.portal.call(make_dead_task, '100102')
+        response = test_client_with_auth_token.post(
+            f'{self.prefix}/requeue', json={'data': {'goods_ids': ['100102']}}
+        )
+        assert response.status_code == 200
+        assert response.json()['requeued'] == 1
+        goods_ids = [
+            task['goods_id']
+            for task in test_client_with_auth_token.get(self.prefix).json()['data']
+        ]
+        assert '100102' not in goods_ids
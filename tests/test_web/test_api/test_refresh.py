@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from common.utils import utc_now
+from domain.factories import get_product_provider
+from domain.goods import (
+    FreshnessPolicy,
+    GinoProductRepository,
+    ProductEntity,
+    ProductInfoService,
+    RefreshScheduler,
+)
+from storages.databases import ProductModel
+
+PRODUCT_AGES = {'100201': 10, '100202': 5, '100203': 1}  # hours
+PRODUCT_CATEGORIES = {'100201': 'Sport', '100202': 'Phones', '100203': 'Sport'}
+
+
+async def make_products():
+    product_repo = GinoProductRepository()
+    for goods_id, age in PRODUCT_AGES.items():
+        await product_repo.insert(
+            ProductEntity(
+                goods_id=goods_id,
+                name=f'Product {goods_id}',
+                price=100,
+                categories=[{'name': PRODUCT_CATEGORIES[goods_id]}],
+                images=[],
+                attributes=[],
+            )
+        )
+        await ProductModel.filter(goods_id=goods_id).update(
+            checked_at=utc_now() - timedelta(hours=age)
+        )
+
+
+def get_scheduler(targets: str = '') -> RefreshScheduler:
+    return RefreshScheduler(
+        product_info_service=ProductInfoService(
+            product_repo=GinoProductRepository(),
+            product_provider=get_product_provider(),
+        ),
+        policy=FreshnessPolicy(max_age=8 * 3600, targets=targets),
+        pool_size=2,
+    )
+
+
+class TestRefreshScheduler:
+    def test_select_stale_by_default_max_age(self, test_client):
+        test_client.portal.call(make_products)
+        products = test_client.portal.call(get_scheduler().select_stale)
+        assert [product.goods_id for product in products] == ['100201']
+
+    def test_select_stale_by_targets_and_priority(self, test_client):
+        test_client.portal.call(make_products)
+        products = test_client.portal.call(
+            get_scheduler('Phones=3600:5,100203=600').select_stale
+        )
+        assert [product.goods_id for product in products] == [
+            '100202',
+            '100203',
+            '100201',
+        ]
+        assert products[0].categories == ['Phones']
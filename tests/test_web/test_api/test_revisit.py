@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from clients.sitemap import SitemapReader
+from common.utils import utc_now
+from domain.factories import get_product_provider
+from domain.goods import (
+    GinoProductRepository,
+    GinoProductSitemapRepository,
+    ProductEntity,
+    ProductInfoService,
+    ProductSitemapService,
+    RevisitPolicy,
+)
+from storages.databases import ProductModel
+
+
+async def rescrape_product(goods_id: str, prices: list[int]):
+    product_info_service = ProductInfoService(
+        product_repo=GinoProductRepository(),
+        product_provider=get_product_provider(),
+        revisit_policy=RevisitPolicy(min_interval=60, max_interval=24 * 3600),
+    )
+    for scrape, price in enumerate(prices):
+        if scrape == 1:  # product is observed for a day
+            await ProductModel.filter(goods_id=goods_id).update(
+                first_checked_at=utc_now() - timedelta(days=1)
+            )
+        await product_info_service.save_products(
+            [
+                ProductEntity(
+                    goods_id=goods_id,
+                    name=f'Product {goods_id}',
+                    price=price,
+                    categories=[],
+                    images=[],
+                    attributes=[],
+                )
+            ]
+        )
+    return await product_info_service.product_repo.find_revisit(goods_id)
+
+
+async def reset_observation(goods_id: str):
+    await rescrape_product(goods_id, [100])
+    await ProductModel.filter(goods_id=goods_id).update(
+        first_checked_at=None, checks=0, changes=0
+    )  # product is stored before checks counting
+    return await rescrape_product(goods_id, [110])
+
+
+async def rescrape_and_ingest_sitemap(goods_id: str, sitemap_path: str) -> tuple:
+    sitemap_service = ProductSitemapService(
+        sitemap_repo=GinoProductSitemapRepository(),
+        product_repo=GinoProductRepository(),
+        product_provider=get_product_provider(),
+        sitemap_reader=SitemapReader(),
+    )
+    scheduled: list[list[str]] = []
+
+    async def schedule(goods_ids):
+        scheduled.append(goods_ids)
+
+    await rescrape_product(goods_id, [100])
+    await ProductModel.filter(goods_id=goods_id).update(
+        modified_at=utc_now() - timedelta(days=2),
+        checked_at=utc_now() - timedelta(days=2),
+    )  # product is changed on marketplace after scrape
+    await sitemap_service.ingest(sitemap_path, schedule=schedule)
+    await rescrape_product(goods_id, [100])  # unchanged scrape keeps modified_at
+    await sitemap_service.ingest(sitemap_path, schedule=schedule)
+    return scheduled
+
+
+class TestRevisit:
+    def test_volatile_product_is_revisited_earlier(self, test_client):
+        stable = test_client.portal.call(rescrape_product, '100301', [100, 100, 100])
+        volatile = test_client.portal.call(rescrape_product, '100302', [100, 110, 120])
+        assert (stable.checks, stable.changes) == (2, 0)
+        assert (volatile.checks, volatile.changes) == (2, 2)
+        assert volatile.revisit_interval < stable.revisit_interval
+        assert 60 <= volatile.revisit_interval <= stable.revisit_interval <= 24 * 3600
+
+    def test_unchanged_product_is_not_rewritten(self, test_client):
+        stable = test_client.portal.call(rescrape_product, '100303', [100, 100])
+        changed = test_client.portal.call(rescrape_product, '100304', [100, 110])
+        assert stable.content_hash
+        assert stable.modified_at < stable.checked_at
+        assert changed.modified_at >= changed.checked_at - timedelta(seconds=1)
+
+    def test_product_stored_before_counting_starts_observation(self, test_client):
+        revisit = test_client.portal.call(reset_observation, '100305')
+        assert revisit.first_checked_at == revisit.checked_at
+        assert (revisit.checks, revisit.changes) == (0, 0)
+        assert revisit.revisit_interval == 60
+
+    def test_unchanged_rescrape_is_not_scheduled_by_sitemap(
+        self, test_client, tmp_path
+    ):
+        sitemap_path = tmp_path / 'sitemap.xml'
+        lastmod = (utc_now() - timedelta(days=1)).isoformat()
+        sitemap_path.write_text(
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"><url>'
+            '<loc>https://megamarket.ru/catalog/details/phone-100306/</loc>'
+            f'<lastmod>{lastmod}</lastmod></url></urlset>'
+        )
+        scheduled = test_client.portal.call(
+            rescrape_and_ingest_sitemap, '100306', str(sitemap_path)
+        )
+        assert scheduled == [['100306']]  # the second ingest schedules nothing
@@ -0,0 +1,39 @@
+class TestSeedJobs:
+    prefix = '/api/v1/product_info/seed_jobs'
+
+    def test_submit_seed_job(self, test_client_with_auth_token):
+        response = test_client_with_auth_token.post(
+            self.prefix, json={'data': {'goods_ids': ['100001', '100002', '100001']}}
+        )
+        assert response.status_code == 202
+        job = response.json()['data']
+        assert job['id']
+        assert job['total'] == 2
+        assert job['status'] == 'pending'
+
+    def test_get_seed_job(self, test_client_with_auth_token):
+        job = test_client_with_auth_token.post(
+            self.prefix, json={'data': {'goods_ids': ['100001', '100002']}}
+        ).json()['data']
+        response = test_client_with_auth_token.get(f'{self.prefix}/{job["id"]}')
+        assert response.status_code == 200
+        job_data = response.json()['data']
+        assert job_data['total'] == 2
+        statuses = ('pending', 'running', 'done', 'failed')
+        assert sum(job_data[status] for status in statuses) == 2
+
+    def test_get_seed_job_results_page(self, test_client_with_auth_token):
+        goods_ids = ['100001', '100002', '100003']
+        job = test_client_with_auth_token.post(
+            self.prefix, json={'data': {'goods_ids': goods_ids}}
+        ).json()['data']
+        response = test_client_with_auth_token.get(
+            f'{self.prefix}/{job["id"]}/results', params={'offset': 1, 'limit': 2}
+        )
+        assert response.status_code == 200
+        results = response.json()['data']
+        assert [result['goods_id'] for result in results] == goods_ids[1:]
+
+    def test_get_unknown_seed_job(self, test_client_with_auth_token):
+        response = test_client_with_auth_token.get(f'{self.prefix}/100000')
+        assert response.status_code == 404
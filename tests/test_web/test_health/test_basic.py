@@ -36,3 +36,12 @@ class TestLiveProbe:
         response = test_client.get(self.prefix)
         assert response.status_code == 200
         assert db_config.driver in response.text.lower()
+
+
+class TestMetrics:
+    prefix = '/health/metrics'
+
+    def test_get_metrics(self, test_client):
+        response = test_client.get(self.prefix)
+        assert response.status_code == 200
+        assert {'counters', 'gauges', 'observations'} <= set(response.json())
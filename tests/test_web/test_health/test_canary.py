@@ -0,0 +1,116 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from pydantic import HttpUrl, parse_obj_as
+
+from clients import parser_pool
+from domain.goods import (
+    GinoProductRepository,
+    GoodsID,
+    ProductInfoService,
+    SberMegaMarketProductProvider,
+    SyntheticCanary,
+)
+from domain.goods.timings import SCRAPE_STAGES
+from web.app import app
+from web.routers.health.endpoints.app_state.deps import get_canary_info
+
+MOCK_GOODS_ID = '100012345678'
+MOCK_HOME_PAGE = """
+<html><head><title>Mock market</title></head><body>
+<form action="/catalog/"><input class="search-field-input" name="q" type="text"></form>
+</body></html>
+"""
+MOCK_PRODUCT_PAGE = """
+<html><head><title>Mock product</title></head><body>
+<ul>
+<li class="breadcrumb-item">Main</li>
+<li class="breadcrumb-item">Sport</li>
+<li class="breadcrumb-item">Mock product</li>
+</ul>
+<h1 class="pdp-header__title">Mock product</h1>
+<div class="product-description">Product of mock market</div>
+<span class="pdp-sales-block__price-final">1 299 ₽</span>
+<img class="slide__image" src="https://example.com/mock-product.jpg" alt="mock-product">
+<div class="pdp-specs__item-name">Color</div>
+<div class="pdp-specs__item-value">Red</div>
+</body></html>
+"""
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        # search redirects to product page like marketplace does
+        if url.path == '/catalog/':
+            goods_id = parse_qs(url.query).get('q', [''])[0]
+            self.send_response(302)
+            self.send_header('Location', f'/catalog/details/mock-product-{goods_id}/')
+            self.end_headers()
+            return
+        page = (
+            MOCK_PRODUCT_PAGE
+            if url.path.startswith('/catalog/details/')
+            else MOCK_HOME_PAGE
+        )
+        body = page.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def mock_site_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockSiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield parse_obj_as(HttpUrl, f'http://127.0.0.1:{server.server_port}/')
+    server.shutdown()
+
+
+@pytest.fixture(scope='function')
+def mock_site_canary(mock_site_url):
+    canary = SyntheticCanary(
+        product_info_service=ProductInfoService(
+            product_repo=GinoProductRepository(),
+            product_provider=SberMegaMarketProductProvider(
+                parser_pool=parser_pool, base_url=mock_site_url
+            ),
+        ),
+        goods_ids=[GoodsID(MOCK_GOODS_ID)],
+    )
+    app.dependency_overrides[get_canary_info] = lambda: canary
+    yield canary
+    app.dependency_overrides.pop(get_canary_info)
+
+
+class TestCanary:
+    prefix = '/health/canary'
+
+    def test_canary_scrapes_mock_site(self, test_client, mock_site_canary):
+        results = test_client.portal.call(mock_site_canary.run_once)
+        assert len(results) == 1
+        result = results[0]
+        assert result.success, result.error
+        assert result.completeness == 1.0
+        assert not result.missing_fields
+        assert {'acquire', 'navigate', 'persist'} <= set(result.stages)
+        assert set(result.stages) <= set(SCRAPE_STAGES)
+
+    def test_get_canary_report(self, test_client, mock_site_canary):
+        test_client.portal.call(mock_site_canary.run_once)
+        response = test_client.get(self.prefix)
+        assert response.status_code == 200
+        report = response.json()
+        assert report['goods_ids'] == [MOCK_GOODS_ID]
+        assert report['checks'] == 1
+        assert report['success_rate'] == 1.0
+        assert {'navigate', 'persist', 'total'} <= set(report['stages'])
+        assert report['results'][0]['goods_id'] == MOCK_GOODS_ID
@@ -0,0 +1,124 @@
+import asyncio
+from typing import Optional
+
+from common.utils import utc_now
+from domain.goods import GoodsID
+from domain.jobs import GinoSeedJobRepository, ScrapeTaskEntity, ScrapeTaskStatus
+
+
+async def take_task_skipping_locked() -> Optional[ScrapeTaskEntity]:
+    seed_job_repo = GinoSeedJobRepository()
+    await seed_job_repo.create([GoodsID('100301'), GoodsID('100302')])
+    is_locked, is_released = asyncio.Event(), asyncio.Event()
+
+    async def lock_first_task():  # own task gets own transaction connection
+        async with seed_job_repo.atomic():
+            await seed_job_repo.task_model.filter(
+                goods_id='100301'
+            ).select_for_update().first()
+            is_locked.set()
+            await is_released.wait()
+
+    lock_task = asyncio.create_task(lock_first_task())
+    await is_locked.wait()
+    try:
+        return await asyncio.wait_for(
+            seed_job_repo.take_task('worker-1', lease_time=60), timeout=10
+        )
+    finally:
+        is_released.set()
+        await lock_task
+
+
+async def take_task_with_expired_lease() -> tuple:
+    seed_job_repo = GinoSeedJobRepository()
+    await seed_job_repo.create([GoodsID('100311')])
+    dead_task = await seed_job_repo.take_task('worker-1', lease_time=-1)
+    task = await seed_job_repo.take_task('worker-2', lease_time=60)
+    return (
+        dead_task,
+        task,
+        await seed_job_repo.take_task('worker-3', lease_time=60),
+        await seed_job_repo.extend_lease(task, 'worker-1', lease_time=60),
+        await seed_job_repo.extend_lease(task, 'worker-2', lease_time=60),
+    )
+
+
+async def fail_task_with_expired_lease() -> tuple:
+    seed_job_repo = GinoSeedJobRepository()
+    job = await seed_job_repo.create([GoodsID('100331')])
+    await seed_job_repo.take_task('worker-1', lease_time=-1)
+    task = await seed_job_repo.take_task('worker-2', lease_time=60, max_attempts=1)
+    return task, await seed_job_repo.select_tasks(job.id)
+
+
+async def release_and_take_again() -> tuple:
+    seed_job_repo = GinoSeedJobRepository()
+    job = await seed_job_repo.create([GoodsID('100321'), GoodsID('100322')])
+    await seed_job_repo.take_task('worker-1', lease_time=60)
+    await seed_job_repo.take_task('worker-1', lease_time=60)
+    released = await seed_job_repo.release_tasks('worker-1')
+    tasks = await seed_job_repo.select_tasks(job.id)
+    task = await seed_job_repo.take_task('worker-2', lease_time=60)
+    return released, tasks, task
+
+
+async def add_retry_task_concurrently() -> tuple:
+    seed_job_repo = GinoSeedJobRepository()
+    is_added = await asyncio.gather(
+        *(
+            seed_job_repo.add_retry_task(
+                GoodsID('100341'), 'Timeout', next_attempt_at=utc_now()
+            )
+            for _ in range(5)
+        )
+    )
+    return (
+        is_added,
+        await seed_job_repo.task_model.filter(job_id=None, goods_id='100341').count(),
+    )
+
+
+class TestSeedJobRepository:
+    def test_take_task_skips_locked(self, test_client):
+        task = test_client.portal.call(take_task_skipping_locked)
+        assert task is not None
+        assert task.goods_id == '100302'
+        assert task.status == ScrapeTaskStatus.RUNNING
+        assert task.worker_id == 'worker-1'
+
+    def test_take_task_with_expired_lease(self, test_client):
+        (
+            dead_task,
+            task,
+            no_task,
+            is_extended_by_dead,
+            is_extended,
+        ) = test_client.portal.call(take_task_with_expired_lease)
+        assert task.id == dead_task.id
+        assert task.worker_id == 'worker-2'
+        assert task.attempts == 1  # dead worker attempt is counted
+        assert no_task is None  # lease of live worker is not taken
+        assert not is_extended_by_dead
+        assert is_extended
+
+    def test_take_task_fails_expired_lease_out_of_attempts(self, test_client):
+        task, (failed_task,) = test_client.portal.call(fail_task_with_expired_lease)
+        assert task is None
+        assert failed_task.status == ScrapeTaskStatus.FAILED
+        assert failed_task.attempts == 1
+        assert failed_task.leased_until is None
+        assert failed_task.error == 'Lease of worker-1 expired'
+
+    def test_release_tasks(self, test_client):
+        released, tasks, task = test_client.portal.call(release_and_take_again)
+        assert released == 2
+        assert [task.status for task in tasks] == [ScrapeTaskStatus.PENDING] * 2
+        assert all(task.leased_until is None for task in tasks)
+        assert task.goods_id == '100321'
+        assert task.attempts == 0  # release is not attempt
+
+    def test_add_retry_task_once(self, test_client):
+        is_added, count = test_client.portal.call(add_retry_task_concurrently)
+        assert sorted(is_added) == [False] * 4 + [True]
+        assert count == 1